@@ -0,0 +1,291 @@
+# Throughput and latency benchmarks on fixed, seeded workloads. Results are
+# written as JSON and compared against a saved baseline; the run fails when a
+# metric regresses by more than the threshold.
+#
+#   poetry run python -m benchmarks.run                     # run and compare
+#   poetry run python -m benchmarks.run --save-baseline     # accept these numbers
+#   poetry run python -m benchmarks.run --require-baseline  # as a CI gate
+from cribbage.card_encoding import NUM_CARDS, id_to_card, ids_to_cards
+from cribbage.discard_analyzer import DiscardAnalyzer, DiscardTable
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage.network import PolicyValueNetwork
+from cribbage.pegging import PeggingState, playout_batch
+from cribbage.simulate import play_game
+from cribbage.training_data import NUM_FEATURES
+from typing import Callable, Dict, List, NamedTuple, Optional
+import argparse
+import json
+import numpy as np
+import os
+import platform
+import random
+import sys
+import time
+
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIRECTORY, "baseline.json")
+DEFAULT_RESULTS_PATH = os.path.join(BENCHMARK_DIRECTORY, "results.json")
+
+# Allowed relative change before a metric counts as a regression
+DEFAULT_THRESHOLD = 0.15
+
+SEED = 2024
+
+
+class Metric(NamedTuple):
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    value: float
+    change: float
+
+
+def _best_rate(operation: Callable[[], int], repeat: int) -> float:
+    """Highest operations per second over several timed runs of a workload."""
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operations = operation()
+        best = max(best, operations / (time.perf_counter() - started))
+    return best
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest rank percentile of the samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_score_hand(scale: float, repeat: int) -> Dict[str, Metric]:
+    rng = random.Random(SEED)
+    deals = [rng.sample(range(NUM_CARDS), 5) for _ in range(int(2000 * scale))]
+    hands = [(Hand(ids_to_cards(deal[:4])), id_to_card(deal[4])) for deal in deals]
+
+    def run() -> int:
+        for hand, cut_card in hands:
+            HandScorer.score_hand(hand, cut_card)
+        return len(hands)
+
+    return {"score_hand.ops_per_second": Metric(_best_rate(run, repeat), "ops/s", True)}
+
+
+def bench_evaluate(scale: float, repeat: int) -> Dict[str, Metric]:
+    """Live DiscardAnalyzer.evaluate, with the discard table out of the way."""
+    rng = random.Random(SEED)
+    hands = [
+        Hand(ids_to_cards(rng.sample(range(NUM_CARDS), 6)))
+        for _ in range(int(200 * scale))
+    ]
+
+    saved = DiscardTable._default, DiscardTable._default_loaded
+    DiscardTable._default, DiscardTable._default_loaded = None, True
+    try:
+        metrics = {}
+        for crib_mode in ("cut", "exact"):
+            latencies = []
+            for _ in range(repeat):
+                for index, hand in enumerate(hands):
+                    started = time.perf_counter()
+                    DiscardAnalyzer.evaluate(hand, index % 2 == 0, crib_mode)
+                    latencies.append((time.perf_counter() - started) * 1000)
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                metrics[f"evaluate.{crib_mode}.{name}_ms"] = Metric(
+                    percentile(latencies, fraction), "ms", False
+                )
+    finally:
+        DiscardTable._default, DiscardTable._default_loaded = saved
+    return metrics
+
+
+def bench_pegging(scale: float, repeat: int) -> Dict[str, Metric]:
+    rng = random.Random(SEED)
+    ranks = [rank for rank in range(13) for _ in range(4)]
+    states = []
+    for _ in range(int(200 * scale)):
+        dealt = rng.sample(ranks, 8)
+        states.append(PeggingState([dealt[:4], dealt[4:]]))
+
+    def run() -> int:
+        playout_rng = random.Random(SEED)
+        for state in states:
+            for _ in range(25):
+                state.copy().playout(playout_rng)
+        return 25 * len(states)
+
+    # The same playouts all at once, as pegging tables and PlayoutLeafEvaluator
+    # play them
+    batch = [state for state in states for _ in range(25)]
+
+    def run_batch() -> int:
+        playout_batch(batch, np.random.default_rng(SEED))
+        return len(batch)
+
+    return {
+        "pegging.playouts_per_second": Metric(
+            _best_rate(run, repeat), "playouts/s", True
+        ),
+        "pegging.batch_playouts_per_second": Metric(
+            _best_rate(run_batch, repeat), "playouts/s", True
+        ),
+    }
+
+
+def bench_games(scale: float, repeat: int) -> Dict[str, Metric]:
+    games = max(1, int(20 * scale))
+
+    def run() -> int:
+        for game_index in range(games):
+            play_game(("heuristic", "random"), SEED, game_index)
+        return games
+
+    return {"games.games_per_second": Metric(_best_rate(run, repeat), "games/s", True)}
+
+
+def bench_network(scale: float, repeat: int) -> Dict[str, Metric]:
+    """Network inference one position per call and in batches of 256."""
+    network = PolicyValueNetwork.random(seed=SEED)
+    positions = max(256, int(4096 * scale))
+    features = (
+        np.random.default_rng(SEED).random((positions, NUM_FEATURES)) < 0.1
+    ).astype(np.uint8)
+
+    metrics = {}
+    for batch_size in (1, 256):
+
+        def run() -> int:
+            for start in range(0, positions, batch_size):
+                network.evaluate_batch(features[start : start + batch_size])
+            return positions
+
+        metrics[f"network.batch_{batch_size}.positions_per_second"] = Metric(
+            _best_rate(run, repeat), "positions/s", True
+        )
+    return metrics
+
+
+BENCHMARKS: Dict[str, Callable[[float, int], Dict[str, Metric]]] = {
+    "score_hand": bench_score_hand,
+    "evaluate": bench_evaluate,
+    "pegging": bench_pegging,
+    "games": bench_games,
+    "network": bench_network,
+}
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, scale: float = 1.0, repeat: int = 3
+) -> Dict:
+    """Run the named benchmarks (all by default) and return the JSON results."""
+    metrics = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name}")
+        metrics.update(BENCHMARKS[name](scale, repeat))
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "metrics": {name: metric._asdict() for name, metric in metrics.items()},
+    }
+
+
+def compare(
+    results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[Regression]:
+    """Metrics that got worse than the baseline by more than the threshold.
+
+    Metrics missing from either side are skipped, so benchmarks can be added
+    or run on their own without failing the comparison.
+    """
+    regressions = []
+    for name, metric in results["metrics"].items():
+        previous = baseline["metrics"].get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = (metric["value"] - previous["value"]) / previous["value"]
+        worse = -change if metric["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append(
+                Regression(name, previous["value"], metric["value"], change)
+            )
+    return regressions
+
+
+def _write_json(path: str, data: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"benchmarks to run, from: {', '.join(BENCHMARKS)} (all by default)",
+    )
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative change that counts as a regression",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every workload's size"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the new baseline",
+    )
+    parser.add_argument(
+        "--require-baseline",
+        action="store_true",
+        help="fail when there is no baseline to compare against",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.benchmarks, args.scale, args.repeat)
+    _write_json(args.output, results)
+    for name, metric in sorted(results["metrics"].items()):
+        print(f"{name:<36} {metric['value']:>12.3f} {metric['unit']}")
+
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline")
+        return 1 if args.require_baseline else 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.baseline:.3f} -> "
+            f"{regression.value:.3f} ({regression.change:+.1%})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
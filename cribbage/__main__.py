@@ -0,0 +1,3 @@
+from cribbage.cli import main
+
+main()
@@ -0,0 +1,201 @@
+from cribbage.cards import Card, Deck
+from cribbage.card_encoding import card_to_id
+from cribbage.hand import Hand
+from cribbage.discard_analyzer import DiscardAnalyzer
+from cribbage.game_engine import Agent, PlayerView, card_value, score_play
+from cribbage.pegging import card_rank, pack_hand
+from cribbage.pegging_table import PeggingTable
+from cribbage.score_distribution import ScoreDistribution
+from cribbage.win_probability import HAND_SIZE, WinProbabilityTable, shift_distribution
+from typing import List, Optional
+import random
+import numpy as np
+
+_RANK_ORDER = {rank: index for index, rank in enumerate(Deck.RANKS)}
+
+
+class RandomAgent(Agent):
+    """Discards and plays uniformly at random."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng if rng else random.Random()
+
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        return self.rng.sample(list(view.hand), 2)
+
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        return self.rng.choice(playable)
+
+
+class HeuristicAgent(Agent):
+    """Discards with DiscardAnalyzer and pegs with simple greedy rules.
+
+    Pegging prefers making 15 or 31, then pairing the last card, then extending
+    a run, and otherwise plays the lowest card. With ``randomness`` above zero
+    that fraction of plays is picked at random instead.
+    """
+
+    def __init__(
+        self,
+        randomness: float = 0.0,
+        rng: Optional[random.Random] = None,
+        crib_mode: str = "cut",
+    ):
+        self.randomness = randomness
+        self.rng = rng if rng else random.Random()
+        self.crib_mode = crib_mode
+
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        discards, _ = DiscardAnalyzer.evaluate(
+            Hand(list(view.hand)), view.dealer == view.player, self.crib_mode
+        )
+        return discards
+
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        if self.randomness and self.rng.random() < self.randomness:
+            return self.rng.choice(playable)
+
+        for card in playable:
+            if view.count + card_value(card) in (15, 31):
+                return card
+
+        if view.sequence:
+            for card in playable:
+                if card.rank == view.sequence[-1].rank:
+                    return card
+
+        if len(view.sequence) >= 2:
+            low, high = sorted(_RANK_ORDER[card.rank] for card in view.sequence[-2:])
+            if high == low + 1:
+                for card in playable:
+                    if _RANK_ORDER[card.rank] in (low - 1, high + 1):
+                        return card
+
+        return min(playable, key=card_value)
+
+
+class PeggingAwareAgent(HeuristicAgent):
+    """Discards for the hand, the crib and the pegging that follows.
+
+    Each discard scores its expected hand and crib points (DiscardAnalyzer,
+    "table" crib mode by default) plus the pegging potential of the 4 kept
+    cards from a PeggingTable. Without a table the default one is used, and
+    without that it discards like a HeuristicAgent. Pegs like a HeuristicAgent.
+    """
+
+    def __init__(
+        self,
+        randomness: float = 0.0,
+        rng: Optional[random.Random] = None,
+        crib_mode: str = "table",
+        table: Optional[PeggingTable] = None,
+    ):
+        super().__init__(randomness, rng, crib_mode)
+        self.table = table
+
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        table = self.table or PeggingTable.default()
+        if table is None:
+            return super().select_discards(view)
+
+        dealer = view.dealer == view.player
+        options = DiscardAnalyzer.rank_discards(
+            Hand(list(view.hand)), dealer, self.crib_mode
+        )
+
+        # Packed hands add up, so each kept hand is the dealt one minus discards
+        dealt = pack_hand(card_rank(card) for card in view.hand)
+
+        def total(option) -> float:
+            discards, score = option
+            kept = dealt - sum(1 << (4 * card_rank(card)) for card in discards)
+            return score + table.packed_value(kept, dealer)
+
+        discards, _ = max(options, key=total)
+        return discards
+
+
+class WinProbabilityAgent(HeuristicAgent):
+    """Plays to win the game rather than to score the most points.
+
+    Each discard is valued by the chance of winning from the end of the round
+    (WinProbabilityTable), with the kept hand's score distributed over every
+    cut and the crib shifted by the discards' expected crib points. Near the
+    target this keeps hands that are sure to count out, and as pone it counts
+    first. In pegging it takes any card that reaches the target, and otherwise
+    pegs like a HeuristicAgent. Without a table the default one is used, and
+    without that it plays like a HeuristicAgent.
+    """
+
+    def __init__(
+        self,
+        randomness: float = 0.0,
+        rng: Optional[random.Random] = None,
+        crib_mode: str = "table",
+        table: Optional[WinProbabilityTable] = None,
+    ):
+        super().__init__(randomness, rng, crib_mode)
+        self.table = table
+
+    def _table(self, view: PlayerView) -> Optional[WinProbabilityTable]:
+        table = self.table or WinProbabilityTable.default()
+        if table is None or table.target_score != view.target_score:
+            return None
+        return table
+
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        table = self._table(view)
+        if table is None:
+            return super().select_discards(view)
+
+        dealer = view.dealer == view.player
+        options = DiscardAnalyzer.rank_discards(
+            Hand(list(view.hand)), dealer, self.crib_mode
+        )
+
+        hands = np.array(
+            [
+                ScoreDistribution.hand(
+                    [card_to_id(card) for card in view.hand if card not in discards],
+                    [card_to_id(card) for card in discards],
+                )
+                for discards, _ in options
+            ]
+        )
+
+        if self.crib_mode == "cut":
+            cribs = np.full(len(options), table.mean_crib)
+        else:
+            option_scores = np.array([score for _, score in options])
+            cribs = option_scores - hands @ np.arange(HAND_SIZE)
+            cribs *= 1 if dealer else -1
+        shifts = np.rint(cribs - table.mean_crib).astype(int)
+
+        mine = view.scores[view.player]
+        theirs = view.scores[1 - view.player]
+        if dealer:
+            shows = [
+                np.convolve(hand, shift_distribution(table.crib, shift))
+                for hand, shift in zip(hands, shifts)
+            ]
+            chances = 1 - table.round_win_probability(
+                theirs, mine, table.pone_hand, shows
+            )
+        else:
+            shows = [shift_distribution(table.dealer_show, shift) for shift in shifts]
+            chances = table.round_win_probability(mine, theirs, hands, shows)
+
+        # Options come best expected score first, which breaks ties
+        discards, _ = options[int(np.argmax(chances))]
+        return discards
+
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        if self._table(view) is not None:
+            needed = view.target_score - view.scores[view.player]
+            for card in playable:
+                count = view.count + card_value(card)
+                scores = score_play(list(view.sequence) + [card], count)
+                points = sum(points for _, points in scores) + 2 * (count == 31)
+                if points >= needed:
+                    return card
+        return super().select_play(view, playable)
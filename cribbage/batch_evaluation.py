@@ -0,0 +1,211 @@
+# Many searches, or whole games, run as generators in one thread. Each yields
+# the leaf it needs valued and waits; the scheduler collects the leaves of all
+# the waiting generators, values them in one vectorized call and resumes each
+# with its value. One call per batch instead of one per leaf keeps a network,
+# or any evaluator with a fixed cost per call, busy.
+from cribbage.game_engine import GameEngine
+from cribbage.mcts import PeggingLeaf
+from cribbage.network import PolicyValueNetwork
+from cribbage.pegging import playout_batch
+from cribbage.pegging_solver import PeggingSolver
+from cribbage.training_data import NUM_FEATURES, view_features
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 1024
+# Generators run at once when run is given more
+DEFAULT_MAX_ACTIVE = 512
+
+
+class SchedulerStats(NamedTuple):
+    batches: int
+    leaves: int
+    max_batch_size: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.leaves / self.batches if self.batches else 0.0
+
+
+class EvaluationScheduler:
+    """Runs generators that yield leaves, valuing the leaves in batches.
+
+    ``evaluate_batch`` takes a list of leaves and returns their values in
+    order, e.g. a PlayoutLeafEvaluator, SolverLeafEvaluator or
+    NetworkLeafEvaluator for searches.
+    """
+
+    def __init__(
+        self,
+        evaluate_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        self.evaluate_batch = evaluate_batch
+        self.max_batch_size = max_batch_size
+        self._batches = 0
+        self._leaves = 0
+        self._max_batch_size = 0
+
+    def run(
+        self, tasks: Iterable[Generator], max_active: int = DEFAULT_MAX_ACTIVE
+    ) -> List[Any]:
+        """Run every generator to the end and return what each returned, in order.
+
+        At most ``max_active`` generators are started at a time; the next is
+        started as soon as one finishes, so ``tasks`` may be a lazy iterable of
+        any length.
+        """
+        pending = enumerate(tasks)
+        results = {}
+        waiting: Deque[Tuple[int, Generator, Any]] = deque()
+
+        def advance(index: int, task: Generator, value: Any = None, start=False):
+            """Step a task; False when it finished instead of yielding a leaf."""
+            try:
+                leaf = next(task) if start else task.send(value)
+            except StopIteration as stop:
+                results[index] = stop.value
+                return False
+            waiting.append((index, task, leaf))
+            return True
+
+        def start_next() -> bool:
+            """Start pending tasks until one waits for a leaf; False when none do.
+
+            A loop rather than recursion, as any number of tasks in a row may
+            finish without yielding.
+            """
+            for index, task in pending:
+                if advance(index, task, start=True):
+                    return True
+            return False
+
+        for _ in range(max_active):
+            if not start_next():
+                break
+
+        while waiting:
+            batch = [
+                waiting.popleft() for _ in range(min(len(waiting), self.max_batch_size))
+            ]
+            values = self.evaluate_batch([leaf for _, _, leaf in batch])
+            self._record(len(batch))
+            for (index, task, _), value in zip(batch, values):
+                if not advance(index, task, value):
+                    start_next()
+
+        return [results[index] for index in range(len(results))]
+
+    def _record(self, batch_size: int):
+        self._batches += 1
+        self._leaves += batch_size
+        self._max_batch_size = max(self._max_batch_size, batch_size)
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(self._batches, self._leaves, self._max_batch_size)
+
+
+def game_task(engine: GameEngine) -> Generator[Any, Any, int]:
+    """Play an engine's game as a generator that yields its agents' leaves.
+
+    Agents with a ``search(view, playable)`` generator, like ISMCTSAgent, pick
+    their plays through it, so their leaves go to the scheduler. Every other
+    decision is answered by the agent directly. Returns the winner.
+    """
+    decisions = engine.decisions()
+    try:
+        decision = next(decisions)
+        while True:
+            agent = engine.agents[decision.player]
+            if decision.playable is None:
+                answer = agent.select_discards(decision.view)
+            elif hasattr(agent, "search"):
+                answer = yield from agent.search(decision.view, decision.playable)
+            else:
+                answer = agent.select_play(decision.view, decision.playable)
+            decision = decisions.send(answer)
+    except StopIteration as stop:
+        return stop.value
+
+
+def play_games(
+    engines: Iterable[GameEngine],
+    scheduler: EvaluationScheduler,
+    max_active: int = DEFAULT_MAX_ACTIVE,
+) -> List[int]:
+    """Play many games at once, valuing their search leaves together."""
+    return scheduler.run((game_task(engine) for engine in engines), max_active)
+
+
+class PlayoutLeafEvaluator:
+    """Values pegging leaves by one random playout each, all in one playout_batch.
+
+    The batched form of ISMCTSAgent's own playouts, from its own generator.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, leaves: List[PeggingLeaf]) -> List[int]:
+        states = [leaf.state for leaf in leaves]
+        movers = np.array([state.turn for state in states])
+        before = np.array([state.scores for state in states]).reshape(-1, 2)
+        gained = playout_batch(states, self.rng) - before
+        rows = np.arange(len(states))
+        return (gained[rows, movers] - gained[rows, 1 - movers]).tolist()
+
+
+class SolverLeafEvaluator:
+    """Values pegging leaves exactly with a PeggingSolver, one after another.
+
+    Not vectorized, but the solver's cache is shared by every search.
+    """
+
+    def __init__(self, solver: Optional[PeggingSolver] = None):
+        self.solver = solver or PeggingSolver()
+
+    def __call__(self, leaves: List[PeggingLeaf]) -> List[int]:
+        return [self.solver.solve(leaf.state) for leaf in leaves]
+
+
+def leaf_features(leaves: Sequence[PeggingLeaf]) -> np.ndarray:
+    """view_features rows for search leaves, from the side of the player to move."""
+    features = np.zeros((len(leaves), NUM_FEATURES), dtype=np.uint8)
+    for row, leaf in enumerate(leaves):
+        view_features(leaf.view(), out=features[row])
+    return features
+
+
+class NetworkLeafEvaluator:
+    """Values pegging leaves with one PolicyValueNetwork call per batch.
+
+    Searches need the pegging point differential for the rest of the hand, so
+    the network's value head must be trained on the pegging_differential
+    target rather than the final point differential. Each leaf is shown to
+    the network as the view_features row of the position the player to move
+    would see there, the same rows it was trained on.
+    """
+
+    def __init__(self, network: PolicyValueNetwork):
+        if network.value_target != "pegging_differential":
+            raise ValueError(
+                "Leaves need a network trained on pegging_differential, not "
+                f"{network.value_target}"
+            )
+        self.network = network
+
+    def __call__(self, leaves: List[PeggingLeaf]) -> List[float]:
+        _, values = self.network.evaluate_batch(leaf_features(leaves))
+        return values.tolist()
@@ -0,0 +1,141 @@
+# Compact integer encoding for cards. Every card is an id in 0..51 and a set of
+# cards is a 52-bit integer with one bit per card id.
+from cribbage.cards import Card, Deck
+from cribbage.hand import Hand
+from typing import Iterable, Iterator, List
+
+NUM_RANKS = len(Deck.RANKS)
+NUM_SUITS = len(Deck.SUITS)
+NUM_CARDS = NUM_RANKS * NUM_SUITS
+
+JACK = Deck.RANKS.index("J") + 1
+
+# Ids follow the order Deck.reset() builds a fresh deck in: suit major, rank minor.
+# CARD_RANK is the ordered rank (A=1 .. K=13) and CARD_VALUE the counting value.
+CARD_SUIT = tuple(card_id // NUM_RANKS for card_id in range(NUM_CARDS))
+CARD_RANK = tuple(card_id % NUM_RANKS + 1 for card_id in range(NUM_CARDS))
+CARD_VALUE = tuple(min(rank, 10) for rank in CARD_RANK)
+
+# Masks of every card in a suit and in the deck, and the jack of each suit (for nobs)
+SUIT_MASKS = tuple(
+    ((1 << NUM_RANKS) - 1) << (suit * NUM_RANKS) for suit in range(NUM_SUITS)
+)
+FULL_DECK_MASK = (1 << NUM_CARDS) - 1
+JACK_IDS = tuple(suit * NUM_RANKS + JACK - 1 for suit in range(NUM_SUITS))
+
+_RANK_INDEX = {rank: index for index, rank in enumerate(Deck.RANKS)}
+_SUIT_INDEX = {suit: index for index, suit in enumerate(Deck.SUITS)}
+
+# Interned Card objects, one per id. Treat them as read only.
+_CARDS = tuple(Card(rank, suit) for suit in Deck.SUITS for rank in Deck.RANKS)
+
+
+def card_id(rank: str, suit: str) -> int:
+    return _SUIT_INDEX[suit] * NUM_RANKS + _RANK_INDEX[rank]
+
+
+def card_to_id(card: Card) -> int:
+    return _SUIT_INDEX[card.suit] * NUM_RANKS + _RANK_INDEX[card.rank]
+
+
+def id_to_card(card_id: int) -> Card:
+    """Return the interned Card for an id. The same object is returned on every call."""
+    return _CARDS[card_id]
+
+
+def cards_to_ids(cards: Iterable[Card]) -> List[int]:
+    """Convert cards to ids, keeping their order."""
+    return [card_to_id(card) for card in cards]
+
+
+def ids_to_cards(card_ids: Iterable[int]) -> List[Card]:
+    return [_CARDS[card_id] for card_id in card_ids]
+
+
+def mask_to_ids(mask: int) -> List[int]:
+    """Ids of the set bits of a mask, in ascending order."""
+    card_ids = []
+    while mask:
+        low_bit = mask & -mask
+        card_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return card_ids
+
+
+class HandMask:
+    """An immutable set of cards stored as a 52-bit integer.
+
+    Bit ``i`` is set when the card with id ``i`` is in the set. Cards are kept
+    in id order, so converting a Hand to a mask and back keeps the cards but not
+    the order they were drawn in.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        if mask < 0 or mask >> NUM_CARDS:
+            raise ValueError(f"Mask has bits outside of the {NUM_CARDS} card range")
+        self.mask = mask
+
+    @classmethod
+    def from_ids(cls, card_ids: Iterable[int]) -> "HandMask":
+        mask = 0
+        for card_id in card_ids:
+            bit = 1 << card_id
+            if mask & bit:
+                raise ValueError(f"Duplicate card: {_CARDS[card_id]}")
+            mask |= bit
+        return cls(mask)
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Card]) -> "HandMask":
+        return cls.from_ids(card_to_id(card) for card in cards)
+
+    @classmethod
+    def from_hand(cls, hand: Hand) -> "HandMask":
+        return cls.from_cards(hand.cards)
+
+    def ids(self) -> List[int]:
+        return mask_to_ids(self.mask)
+
+    def to_cards(self) -> List[Card]:
+        return [_CARDS[card_id] for card_id in mask_to_ids(self.mask)]
+
+    def to_hand(self) -> Hand:
+        return Hand(self.to_cards())
+
+    def add(self, card_id: int) -> "HandMask":
+        return HandMask(self.mask | (1 << card_id))
+
+    def remove(self, card_id: int) -> "HandMask":
+        return HandMask(self.mask & ~(1 << card_id))
+
+    def suit_counts(self) -> List[int]:
+        return [(self.mask & suit_mask).bit_count() for suit_mask in SUIT_MASKS]
+
+    def __contains__(self, card_id: int) -> bool:
+        return bool(self.mask >> card_id & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(mask_to_ids(self.mask))
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __or__(self, other: "HandMask") -> "HandMask":
+        return HandMask(self.mask | other.mask)
+
+    def __and__(self, other: "HandMask") -> "HandMask":
+        return HandMask(self.mask & other.mask)
+
+    def __sub__(self, other: "HandMask") -> "HandMask":
+        return HandMask(self.mask & ~other.mask)
+
+    def __eq__(self, other):
+        return isinstance(other, HandMask) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return f"HandMask({self.to_cards()})"
@@ -1,9 +1,11 @@
 # Objective is to create a deck of cards that understands what's in the deck, it can be shuffled, drawn / delt from, etc.
 import random
-from typing import List
+from typing import List, Optional
 
 
 class Card:
+    __slots__ = ("suit", "rank")
+
     def __init__(self, rank, suit):
         self.suit = suit
         self.rank = rank
@@ -12,7 +14,14 @@ class Card:
         return self.rank + self.suit
 
     def __eq__(self, other):
-        return self.suit == other.suit and self.rank == other.rank
+        return (
+            isinstance(other, Card)
+            and self.suit == other.suit
+            and self.rank == other.rank
+        )
+
+    def __hash__(self):
+        return hash((self.rank, self.suit))
 
     def __repr__(self):
         return f"{self.rank}{self.suit}"
@@ -49,5 +58,9 @@ class Deck:
             for rank in self.RANKS:
                 self.deck.append(Card(rank, suit))
 
-    def shuffle(self):
-        random.shuffle(self.deck)
+    def shuffle(self, rng: Optional[random.Random] = None):
+        """Shuffle with the given generator, or the global one if None."""
+        if rng is None:
+            random.shuffle(self.deck)
+        else:
+            rng.shuffle(self.deck)
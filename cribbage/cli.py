@@ -0,0 +1,248 @@
+# Command line entry point, installed as the `cribbage` script.
+from cribbage.discard_analyzer import DiscardTable
+from cribbage.game_engine import WINNING_SCORE
+from cribbage.game_log import GameLog, decode_game
+from cribbage.hand_report import hand_report
+from cribbage.hand_scorer import BREAKDOWN_CATEGORIES
+from cribbage.pegging_table import DEFAULT_SAMPLES, METHODS, PeggingTable
+from cribbage.replay import replay
+from cribbage.simulate import AGENTS, round_stats, simulate
+from cribbage.training_data import build_dataset
+from cribbage.win_probability import WinProbabilityTable
+from typing import List, Optional
+import argparse
+
+
+def _simulate(args: argparse.Namespace):
+    result = simulate(
+        args.agents,
+        args.games,
+        seed=args.seed,
+        workers=args.workers,
+        target_score=args.target_score,
+        record_path=args.record,
+    )
+
+    print(
+        f"{result.games} games in {result.seconds:.1f}s "
+        f"({result.games_per_second:.1f} games/s)"
+    )
+    for player, name in enumerate(result.agents):
+        low, high = result.confidence_interval(player)
+        print(
+            f"  seat {player} {name:<10} wins {result.wins[player]:>8}  "
+            f"{result.win_rate(player):6.1%}  (95% CI {low:.1%} - {high:.1%})"
+        )
+
+
+def _build_discard_table(args: argparse.Namespace):
+    def progress(done: int, total: int):
+        print(f"\r{done}/{total} chunks", end="", flush=True)
+
+    table = DiscardTable.build(args.path, workers=args.workers, progress=progress)
+    print(f"\n{len(table)} deals written to {args.path}")
+
+
+def _build_pegging_table(args: argparse.Namespace):
+    table = PeggingTable.build(args.samples, args.method, workers=args.workers)
+    table.save(args.path)
+    print(f"Pegging values of {table.values.shape[1]} hands written to {args.path}")
+
+
+def _build_win_table(args: argparse.Namespace):
+    stats = round_stats(args.agents, args.rounds, args.seed, workers=args.workers)
+    table = WinProbabilityTable.build(stats, args.target_score)
+    table.save(args.path)
+    print(
+        f"Win probabilities from {stats.rounds} rounds written to {args.path}; "
+        f"the dealer wins {table.win_probability(0, 0, True):.1%} from 0-0"
+    )
+
+
+def _hand_report(args: argparse.Namespace):
+    def progress(done: int, total: int):
+        print(f"\r{done}/{total} chunks", end="", flush=True)
+
+    report = hand_report(args.crib, args.workers, args.hands, progress)
+    print(
+        f"\n{report.cases} {'cribs' if report.crib else 'hands'} with their cuts "
+        f"in {report.seconds:.1f}s ({report.cases_per_second:,.0f}/s)"
+    )
+    print(f"mean score {report.mean():.4f}")
+    for score, count in enumerate(report.histogram):
+        print(f"  {score:>2} {count:>10} {count / report.cases:8.4%}")
+
+    means = report.category_means()
+    print("points by category (mean, then counts by points scored)")
+    for category, counts in zip(BREAKDOWN_CATEGORIES, report.breakdown):
+        scored = ", ".join(
+            f"{points}: {count}" for points, count in enumerate(counts) if count
+        )
+        print(f"  {category:<8} {means[category]:.4f}  {scored}")
+
+    impossible = ", ".join(map(str, report.impossible_scores())) or "none"
+    print(f"impossible scores: {impossible}")
+    print(
+        f"table scorer and HandScorer.score_breakdown_batch disagree on "
+        f"{report.mismatches} cases"
+    )
+    print(
+        f"HandScorer.score_hand disagrees on {report.reference_mismatches} of "
+        f"{report.reference_cases} cases, one per suit symmetry class"
+    )
+
+
+def _cards(cards) -> str:
+    return " ".join(str(card) for card in cards) or "-"
+
+
+def _replay(args: argparse.Namespace):
+    with GameLog(args.log) as log:
+        payload = log.payload(args.game)
+    events = decode_game(payload).events
+    index = len(events) if args.event is None else args.event
+    engine = replay(payload, index)
+
+    print(
+        f"game {args.game}, before event {index} of {len(events)}, "
+        f"round {engine.round_number}"
+    )
+    print(
+        f"  scores {engine.scores[0]}-{engine.scores[1]}, dealer seat {engine.dealer}"
+    )
+    for player in (0, 1):
+        print(
+            f"  seat {player} hand {_cards(engine.hands[player])}  "
+            f"discarded {_cards(engine.discards[player])}"
+        )
+    starter = engine.starter if engine.starter else "-"
+    print(f"  crib {_cards(engine.crib)}  starter {starter}")
+    print(f"  count {engine.count}  sequence {_cards(engine.sequence)}")
+    if index < len(events):
+        event = events[index]
+        print(f"next: {event.kind} seat {event.player} {_cards(event.cards)}")
+
+
+def _build_training_data(args: argparse.Namespace):
+    dataset = build_dataset(args.logs, args.output, workers=args.workers)
+    print(f"{len(dataset)} positions in {len(dataset.shards)} shards in {args.output}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="cribbage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate_parser = commands.add_parser(
+        "simulate", help="play many games between two agents"
+    )
+    simulate_parser.add_argument(
+        "--agents",
+        nargs=2,
+        choices=sorted(AGENTS),
+        default=["heuristic", "random"],
+        metavar="AGENT",
+        help=f"the two agents to play, from: {', '.join(sorted(AGENTS))}",
+    )
+    simulate_parser.add_argument("--games", type=int, default=1000)
+    simulate_parser.add_argument("--seed", type=int, default=0)
+    simulate_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    simulate_parser.add_argument("--target-score", type=int, default=WINNING_SCORE)
+    simulate_parser.add_argument(
+        "--record", metavar="PATH", help="write every game to a binary game log"
+    )
+    simulate_parser.set_defaults(handler=_simulate)
+
+    replay_parser = commands.add_parser(
+        "replay", help="show the state of a recorded game at any event"
+    )
+    replay_parser.add_argument("log", help="a game log from simulate --record")
+    replay_parser.add_argument("game", type=int, help="the game id")
+    replay_parser.add_argument(
+        "--event", type=int, default=None, help="event index (the end by default)"
+    )
+    replay_parser.set_defaults(handler=_replay)
+
+    table_parser = commands.add_parser(
+        "build-discard-table",
+        help="precompute discard values for every deal (resumable, takes hours)",
+    )
+    table_parser.add_argument("--path", default=DiscardTable.default_path())
+    table_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    table_parser.set_defaults(handler=_build_discard_table)
+
+    pegging_parser = commands.add_parser(
+        "build-pegging-table",
+        help="precompute the pegging potential of every kept hand (takes minutes)",
+    )
+    pegging_parser.add_argument("--path", default=PeggingTable.default_path())
+    pegging_parser.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        help="opponent hands sampled per kept hand",
+    )
+    pegging_parser.add_argument("--method", choices=METHODS, default=METHODS[0])
+    pegging_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    pegging_parser.set_defaults(handler=_build_pegging_table)
+
+    win_parser = commands.add_parser(
+        "build-win-table",
+        help="measure rounds in self-play and compute the chance of winning "
+        "from every score",
+    )
+    win_parser.add_argument("--path", default=WinProbabilityTable.default_path())
+    win_parser.add_argument(
+        "--agents",
+        nargs=2,
+        choices=sorted(AGENTS),
+        default=["heuristic", "heuristic"],
+        metavar="AGENT",
+        help="the two agents whose rounds are measured",
+    )
+    win_parser.add_argument("--rounds", type=int, default=100000)
+    win_parser.add_argument("--seed", type=int, default=0)
+    win_parser.add_argument("--target-score", type=int, default=WINNING_SCORE)
+    win_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    win_parser.set_defaults(handler=_build_win_table)
+
+    report_parser = commands.add_parser(
+        "hand-report",
+        help="score every hand with every cut: histogram, categories and "
+        "impossible scores",
+    )
+    report_parser.add_argument(
+        "--crib", action="store_true", help="score the hands as cribs"
+    )
+    report_parser.add_argument(
+        "--hands", type=int, default=None, help="only the first this many hands"
+    )
+    report_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    report_parser.set_defaults(handler=_hand_report)
+
+    data_parser = commands.add_parser(
+        "build-training-data",
+        help="turn recorded games into sharded NumPy arrays for training",
+    )
+    data_parser.add_argument("logs", nargs="+", help="game logs from --record")
+    data_parser.add_argument("--output", required=True, help="dataset directory")
+    data_parser.add_argument(
+        "--workers", type=int, default=None, help="processes to use (all cores)"
+    )
+    data_parser.set_defaults(handler=_build_training_data)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
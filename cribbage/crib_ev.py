@@ -0,0 +1,191 @@
+# Expected value of the crib for a pair of discarded cards, integrating over the
+# opponent's two discards and the cut card.
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    JACK,
+    NUM_CARDS,
+    NUM_RANKS,
+    NUM_SUITS,
+)
+from cribbage.table_hand_scorer import CARD_KEYS, RANK_KEYS, TableHandScorer
+from cribbage.suit_isomorphism import canonical_suits
+from cribbage.table_file import MappedTable
+from itertools import combinations
+from typing import BinaryIO, Callable, Optional, Sequence, Tuple
+import mmap
+import struct
+import numpy as np
+
+# Relative weight of the opponent discarding the two given card ids. The flag is
+# True when the opponent is the dealer, i.e. discarding into their own crib.
+OpponentModel = Callable[[int, int, bool], float]
+
+NUM_DISCARDS = NUM_CARDS * (NUM_CARDS - 1) // 2
+
+_CARD_KEYS = np.array(CARD_KEYS, dtype=np.int64)
+_RANK_KEYS = np.array(RANK_KEYS, dtype=np.int64)
+_CARD_RANKS = np.array(CARD_RANK, dtype=np.int64) - 1
+_CARD_SUITS = np.array(CARD_SUIT, dtype=np.int64)
+_IS_JACK = _CARD_RANKS == JACK - 1
+
+
+def discard_index(first_id: int, second_id: int) -> int:
+    """Position of an unordered pair of card ids among all 1,326 pairs."""
+    low, high = sorted((first_id, second_id))
+    return high * (high - 1) // 2 + low
+
+
+def expected_crib_scores(
+    unseen_ids: Sequence[int],
+    discards: Sequence[Tuple[int, int]],
+    opponent_is_dealer: bool = False,
+    opponent_model: Optional[OpponentModel] = None,
+) -> np.ndarray:
+    """Exact expected crib score for each pair of discarded card ids.
+
+    The opponent's two discards are drawn from ``unseen_ids`` (uniformly, or
+    weighted by ``opponent_model``) and the cut is drawn uniformly from what is
+    left. Fifteens, pairs and runs only depend on ranks, so for every opponent
+    discard the cuts are grouped by rank and the crib is looked up in the
+    TableHandScorer rank table. Flush and nobs are added from suit counts.
+    """
+    unseen = np.asarray(unseen_ids, dtype=np.int64)
+    discards = np.asarray(discards, dtype=np.int64).reshape(-1, 2)
+    remaining_cuts = len(unseen) - 2
+
+    first, second = np.triu_indices(len(unseen), 1)
+    opponent_first, opponent_second = unseen[first], unseen[second]
+    if opponent_model is None:
+        weights = np.full(len(first), 1.0 / len(first))
+    else:
+        weights = np.array(
+            [
+                opponent_model(int(a), int(b), opponent_is_dealer)
+                for a, b in zip(opponent_first, opponent_second)
+            ]
+        )
+        weights /= weights.sum()
+
+    # Probability of each (opponent discard, cut rank) combination
+    rank_range = np.arange(NUM_RANKS)
+    cut_counts = (
+        np.bincount(_CARD_RANKS[unseen], minlength=NUM_RANKS)[None, :]
+        - (_CARD_RANKS[opponent_first][:, None] == rank_range)
+        - (_CARD_RANKS[opponent_second][:, None] == rank_range)
+    )
+    cut_weights = weights[:, None] * cut_counts / remaining_cuts
+
+    # Merge combinations that leave the same three ranks in the crib
+    keys = (_CARD_KEYS[opponent_first] + _CARD_KEYS[opponent_second])[:, None]
+    keys, inverse = np.unique(keys + _RANK_KEYS, return_inverse=True)
+    key_weights = np.bincount(inverse.ravel(), weights=cut_weights.ravel())
+    possible = key_weights > 0
+    keys, key_weights = keys[possible], key_weights[possible]
+
+    base_scores = np.frombuffer(TableHandScorer.default().table, dtype=np.uint8)
+    discard_keys = _CARD_KEYS[discards].sum(axis=1)
+    expected = base_scores[discard_keys[:, None] + keys] @ key_weights
+
+    # Chance the cut falls in each suit, given each opponent discard
+    suit_range = np.arange(NUM_SUITS)
+    opponent_in_suit = (_CARD_SUITS[opponent_first][:, None] == suit_range).astype(
+        np.int64
+    ) + (_CARD_SUITS[opponent_second][:, None] == suit_range)
+    cut_in_suit = (
+        np.bincount(_CARD_SUITS[unseen], minlength=NUM_SUITS)[None, :]
+        - opponent_in_suit
+    ) / remaining_cuts
+
+    # A five card flush needs both opponent discards and the cut in our suit
+    flush_chance = weights @ ((opponent_in_suit == 2) * cut_in_suit)
+    discard_suits = _CARD_SUITS[discards]
+    same_suit = discard_suits[:, 0] == discard_suits[:, 1]
+    expected += np.where(same_suit, 5 * flush_chance[discard_suits[:, 0]], 0.0)
+
+    # Nobs from our jacks and from any jack the opponent throws in
+    cut_suit_chance = weights @ cut_in_suit
+    expected += (_IS_JACK[discards] * cut_suit_chance[discard_suits]).sum(axis=1)
+    rows = np.arange(len(weights))
+    expected += weights @ (
+        _IS_JACK[opponent_first] * cut_in_suit[rows, _CARD_SUITS[opponent_first]]
+        + _IS_JACK[opponent_second] * cut_in_suit[rows, _CARD_SUITS[opponent_second]]
+    )
+
+    return expected
+
+
+class CribEVTable(MappedTable):
+    """Expected crib score for every pair of discards, for the dealer and pone.
+
+    Built with ``expected_crib_scores`` over the 50 cards the discarder cannot
+    see, ignoring the other four cards they hold. The dealer column is for
+    discards into our own crib, the pone column for discards into the
+    opponent's crib; they only differ when an opponent model is used.
+    ``default()`` is the uniform-opponent table, built on first use and saved
+    to the cache directory.
+    """
+
+    FILE_NAME = "crib_ev_table.bin"
+    MAGIC = b"CRIBEV01"
+    HEADER = struct.Struct("<8sI")
+    DESCRIPTION = "crib EV table"
+    BUILD_ON_DEMAND = True
+
+    def __init__(self, values: np.ndarray, source: Optional[mmap.mmap] = None):
+        if values.shape != (2, NUM_DISCARDS):
+            raise ValueError(
+                f"Expected a table of shape (2, {NUM_DISCARDS}), got {values.shape}"
+            )
+        self.values = values
+        self._source = source
+
+    @classmethod
+    def build(cls, opponent_model: Optional[OpponentModel] = None) -> "CribEVTable":
+        values = np.zeros((2, NUM_DISCARDS))
+        all_cards = range(NUM_CARDS)
+        # Without a model the value does not depend on suits, so each of the
+        # 169 pairs that differ by more than their suits is computed once
+        by_class = {}
+
+        for discard in combinations(all_cards, 2):
+            index = discard_index(*discard)
+            key, _ = canonical_suits(discard)
+            if opponent_model is None and key in by_class:
+                values[:, index] = by_class[key]
+                continue
+
+            unseen = [card_id for card_id in all_cards if card_id not in discard]
+            # The dealer's opponent is the pone, and the other way around
+            for column, opponent_is_dealer in ((0, False), (1, True)):
+                values[column, index] = expected_crib_scores(
+                    unseen, [discard], opponent_is_dealer, opponent_model
+                )[0]
+            by_class[key] = values[:, index]
+
+        return cls(values)
+
+    def _header_fields(self) -> Sequence[int]:
+        return (NUM_DISCARDS,)
+
+    def _write_data(self, file: BinaryIO):
+        file.write(self.values.astype("<f8").tobytes())
+
+    @classmethod
+    def _data_size(cls, size: int) -> Optional[int]:
+        return 2 * NUM_DISCARDS * 8 if size == NUM_DISCARDS else None
+
+    @classmethod
+    def _from_source(cls, source: mmap.mmap, offset: int, size: int) -> "CribEVTable":
+        values = np.frombuffer(
+            source, dtype="<f8", count=2 * NUM_DISCARDS, offset=offset
+        ).reshape(2, NUM_DISCARDS)
+        return cls(values, source)
+
+    def _release(self):
+        self.values = None
+
+    def expected_score(self, first_id: int, second_id: int, dealer: bool) -> float:
+        return float(
+            self.values[0 if dealer else 1, discard_index(first_id, second_id)]
+        )
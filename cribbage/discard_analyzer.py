@@ -1,44 +1,447 @@
 from cribbage.hand import Hand
-from cribbage.cards import Deck, Card
-from cribbage.hand_scorer import HandScorer
-from itertools import combinations
-from typing import Tuple, List
+from cribbage.cards import Card
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    CARD_VALUE,
+    FULL_DECK_MASK,
+    JACK,
+    NUM_CARDS,
+    NUM_RANKS,
+    NUM_SUITS,
+    HandMask,
+    cards_to_ids,
+    mask_to_ids,
+)
+from cribbage.crib_ev import CribEVTable, OpponentModel, expected_crib_scores
+from cribbage.suit_isomorphism import canonical_sets, canonical_suits, relabel
+from cribbage.table_file import MappedTable, atomic_write
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from operator import itemgetter
+from typing import BinaryIO, Callable, Optional, Sequence, Tuple, List
+import mmap
+import os
+import shutil
+import struct
+import numpy as np
+
+# How the discarded cards are valued:
+#   "cut"   - the two discards scored with the cut card only
+#   "table" - expected crib from the precomputed CribEVTable
+#   "exact" - expected crib over every opponent discard and cut of the unseen cards
+CRIB_MODES = ("cut", "table", "exact")
+
+# Ways to discard 2 of 6 cards. For each order the 6 cards can sort into, a
+# getter that picks the values of the sorted cards' options in the order of
+# the unsorted cards' options.
+NUM_OPTIONS = 15
+_PAIRS = list(combinations(range(6), 2))
+_OPTION_GETTERS = {}
+for _order in permutations(range(6)):
+    _positions = {card: position for position, card in enumerate(_order)}
+    _OPTION_GETTERS[_order] = itemgetter(
+        *(
+            _PAIRS.index(tuple(sorted((_positions[first], _positions[second]))))
+            for first, second in _PAIRS
+        )
+    )
+
+# One DiscardTable record per canonical deal: the kept and discarded totals over
+# every cut and the exact expected crib of each option
+_RECORD = np.dtype(
+    [
+        ("keep", "<u2", NUM_OPTIONS),
+        ("discard", "<u2", NUM_OPTIONS),
+        ("crib", "<f8", NUM_OPTIONS),
+    ]
+)
+
+# Deals per task sent to a worker, and per resumable part file
+CHUNK_SIZE = 2000
 
 
 class DiscardAnalyzer:
     @staticmethod
-    def _calculate_missing_cards(hand: Hand) -> Deck:
-        full_deck = Deck()
-        return [card for card in full_deck.deck if card not in hand.cards]
+    def _calculate_missing_cards(hand: Hand) -> List[Card]:
+        return (HandMask(FULL_DECK_MASK) - HandMask.from_hand(hand)).to_cards()
+
+    @staticmethod
+    def _score_runs_from_counts(rank_counts: List[int]) -> int:
+        """Score the longest run in a rank histogram, counting each duplicate run."""
+        best_length = 0
+        best_product = 0
+        length = 0
+        product = 1
+
+        for count in rank_counts + [0]:
+            if count:
+                length += 1
+                product *= count
+                continue
+            if length >= 3 and length > best_length:
+                best_length = length
+                best_product = product
+            length = 0
+            product = 1
+
+        return best_length * best_product
 
     @classmethod
-    def evaluate(cls, hand: Hand, crib: bool = False) -> Tuple[List[Card], float]:
-        possible_cut_cards = cls._calculate_missing_cards(hand)
-        length_of_possible_cut_cards = len(possible_cut_cards)
+    def _total_over_cuts(
+        cls,
+        card_ids: List[int],
+        fifteen_ways: List[int],
+        unseen_ranks: List[int],
+        unseen_suits: List[int],
+    ) -> int:
+        """Sum of HandScorer.score_hand for these cards over every unseen cut.
+
+        Cuts of the same rank only differ in suit, so fifteens, pairs and runs
+        are scored once per rank and weighted by how many of that rank are left.
+        Flush and nobs are then added from the unseen suit counts.
+        """
+        rank_counts = [0] * NUM_RANKS
+        for card_id in card_ids:
+            rank_counts[CARD_RANK[card_id] - 1] += 1
+        pairs = sum(count * (count - 1) for count in rank_counts)
+        base_runs = cls._score_runs_from_counts(rank_counts)
+        padded_counts = [0] + rank_counts + [0]
+
+        total = 0
+        for rank, unseen in enumerate(unseen_ranks):
+            if not unseen:
+                continue
+            value = min(rank + 1, 10)
+
+            # A cut that does not touch any held rank cannot change the runs
+            if (
+                padded_counts[rank]
+                or padded_counts[rank + 1]
+                or padded_counts[rank + 2]
+            ):
+                rank_counts[rank] += 1
+                runs = cls._score_runs_from_counts(rank_counts)
+                rank_counts[rank] -= 1
+            else:
+                runs = base_runs
+
+            fifteens = 2 * (fifteen_ways[15] + fifteen_ways[15 - value])
+            total += unseen * (fifteens + pairs + 2 * rank_counts[rank] + runs)
+
+        suits = {CARD_SUIT[card_id] for card_id in card_ids}
+        if len(card_ids) >= 4 and len(suits) == 1:
+            matching = unseen_suits[suits.pop()]
+            total += 4 * sum(unseen_suits) + matching
+
+        for card_id in card_ids:
+            if CARD_RANK[card_id] == JACK:
+                total += unseen_suits[CARD_SUIT[card_id]]
+
+        return total
+
+    @classmethod
+    def _option_totals(
+        cls, card_ids: List[int], with_discards: bool = True
+    ) -> Tuple[List[int], List[int]]:
+        """Score totals over every unseen cut for each way to discard down to 4.
+
+        Returns the totals of the kept cards and, when asked for, of the
+        discards, both in the order itertools.combinations produces discards in.
+        """
+        size = len(card_ids)
+        unseen_ranks = [4] * NUM_RANKS
+        unseen_suits = [NUM_RANKS] * NUM_SUITS
+        for card_id in card_ids:
+            unseen_ranks[CARD_RANK[card_id] - 1] -= 1
+            unseen_suits[CARD_SUIT[card_id]] -= 1
+
+        # Value total of every subset of the dealt cards, shared by all options
+        subset_sums = [0] * (1 << size)
+        for subset in range(1, 1 << size):
+            low_bit = subset & -subset
+            subset_sums[subset] = (
+                subset_sums[subset ^ low_bit]
+                + CARD_VALUE[card_ids[low_bit.bit_length() - 1]]
+            )
+
+        def fifteen_ways(members: int) -> List[int]:
+            # How many subsets of the members reach each total up to 15
+            ways = [0] * 16
+            subset = members
+            while True:
+                if subset_sums[subset] <= 15:
+                    ways[subset_sums[subset]] += 1
+                if subset == 0:
+                    return ways
+                subset = (subset - 1) & members
+
+        def total_over_cuts(members: int) -> int:
+            ids = [card_ids[i] for i in range(size) if members >> i & 1]
+            return cls._total_over_cuts(
+                ids, fifteen_ways(members), unseen_ranks, unseen_suits
+            )
+
+        all_members = (1 << size) - 1
+        keep_totals, discard_totals = [], []
+        for discard_indices in combinations(range(size), size - 4):
+            discard_members = sum(1 << i for i in discard_indices)
+            keep_totals.append(total_over_cuts(all_members ^ discard_members))
+            if with_discards:
+                discard_totals.append(total_over_cuts(discard_members))
+        return keep_totals, discard_totals
+
+    @staticmethod
+    def deal_values(card_ids: List[int]) -> Tuple[List[int], List[int], List[float]]:
+        """Everything rank_discards needs for a 6 card deal, with a uniform opponent.
+
+        The kept and discarded totals over every cut, and the exact expected
+        crib of each discard, in the order itertools.combinations produces
+        discards in. This is what DiscardTable stores.
+        """
+        keep_totals, discard_totals = DiscardAnalyzer._option_totals(card_ids)
+        unseen = (HandMask(FULL_DECK_MASK) - HandMask.from_ids(card_ids)).ids()
+        crib_scores = expected_crib_scores(unseen, list(combinations(card_ids, 2)))
+        return keep_totals, discard_totals, crib_scores.tolist()
+
+    @classmethod
+    def rank_discards(
+        cls,
+        hand: Hand,
+        crib: bool = False,
+        crib_mode: str = "cut",
+        opponent_model: Optional[OpponentModel] = None,
+    ) -> List[Tuple[List[Card], float]]:
+        """Every way to discard down to 4 cards, best expected score first.
+
+        The expected score is the kept hand's score averaged over every unseen
+        cut, plus (own crib) or minus (opponent's crib) the value of the
+        discards as chosen by ``crib_mode`` (see CRIB_MODES). ``opponent_model``
+        weights the opponent's discards in "exact" mode. Options with equal
+        scores keep the order itertools.combinations produces them in.
+
+        6 card deals are looked up in the default DiscardTable when it has been
+        built, except for "exact" mode with an opponent model.
+        """
+        if crib_mode not in CRIB_MODES:
+            raise ValueError(f"Unknown crib mode: {crib_mode}")
 
-        discard_options_averaged = []
+        card_ids = cards_to_ids(hand.cards)
+        size = len(card_ids)
+        if crib_mode != "cut" and size != 6:
+            raise ValueError("Crib expectations need a hand of 6 cards")
 
-        for i, discard_choices in enumerate(
-            combinations(hand.cards, len(hand.cards) - 4)
-        ):
-            scores = 0
-            discard_choices = list(discard_choices)
+        all_discards = list(combinations(range(size), size - 4))
+        number_of_cuts = NUM_CARDS - size
 
-            keep_cards = [card for card in hand.cards if card not in discard_choices]
+        values = None
+        if size == 6 and (crib_mode != "exact" or opponent_model is None):
+            table = DiscardTable.default()
+            if table is not None:
+                values = table.lookup(card_ids)
 
-            for cut_card in possible_cut_cards:
-                keep_hand = Hand(keep_cards)
-                discard_hand = Hand(discard_choices)
+        if values is not None:
+            keep_totals, discard_totals, crib_scores = values
+        else:
+            keep_totals, discard_totals = cls._option_totals(
+                card_ids, crib_mode == "cut"
+            )
+            if crib_mode == "exact":
+                unseen = (HandMask(FULL_DECK_MASK) - HandMask.from_ids(card_ids)).ids()
+                crib_scores = expected_crib_scores(
+                    unseen,
+                    [[card_ids[i] for i in discard] for discard in all_discards],
+                    opponent_is_dealer=not crib,
+                    opponent_model=opponent_model,
+                )
+        if crib_mode == "table":
+            table = CribEVTable.default()
+            crib_scores = [
+                table.expected_score(card_ids[first], card_ids[second], crib)
+                for first, second in all_discards
+            ]
 
-                keep_score = HandScorer.score_hand(keep_hand, cut_card)
-                discard_score = HandScorer.score_hand(discard_hand, cut_card)
+        options = []
+        for option, discard_indices in enumerate(all_discards):
+            keep_total = keep_totals[option]
+            if crib_mode == "cut":
+                discard_total = discard_totals[option]
+                if not crib:
+                    discard_total *= -1
+                score = (keep_total + discard_total) / number_of_cuts
+            else:
+                crib_score = float(crib_scores[option])
                 if not crib:
-                    discard_score *= -1
+                    crib_score *= -1
+                score = keep_total / number_of_cuts + crib_score
+
+            options.append(([hand.cards[i] for i in discard_indices], score))
+
+        return sorted(options, key=lambda option: option[1], reverse=True)
+
+    @classmethod
+    def evaluate(
+        cls,
+        hand: Hand,
+        crib: bool = False,
+        crib_mode: str = "cut",
+        opponent_model: Optional[OpponentModel] = None,
+    ) -> Tuple[List[Card], float]:
+        return cls.rank_discards(hand, crib, crib_mode, opponent_model)[0]
+
+
+def _build_chunk(chunk: Tuple[Sequence[int], str]) -> str:
+    """Compute the records of some canonical deals and save them to a part file."""
+    keys, part_path = chunk
+    records = np.zeros(len(keys), dtype=_RECORD)
+    for record, key in zip(records, keys):
+        keep, discard, crib_scores = DiscardAnalyzer.deal_values(mask_to_ids(key))
+        record["keep"], record["discard"], record["crib"] = keep, discard, crib_scores
 
-                scores += keep_score + discard_score
+    with atomic_write(part_path) as file:
+        np.save(file, np.asarray(keys, dtype="<u8"))
+        np.save(file, records)
+    return part_path
 
-            discard_options_averaged.append(
-                (discard_choices, scores / length_of_possible_cut_cards)
+
+class DiscardTable(MappedTable):
+    """DiscardAnalyzer.deal_values for every 6 card deal, up to suit symmetry.
+
+    There are 20,358,520 deals but only 962,988 once suits are relabelled into
+    canonical order (see cribbage.suit_isomorphism). The file holds the sorted
+    canonical keys followed by one record per key and is memory mapped, so a
+    lookup is a binary search. The values assume a uniform opponent, which
+    makes the dealer's and pone's crib the same number with opposite signs.
+
+    The table takes hours of CPU time to build, so unlike the hand and crib
+    tables it is never built on demand: ``default()`` is None until
+    ``cribbage build-discard-table`` has been run.
+    """
+
+    FILE_NAME = "discard_table.bin"
+    MAGIC = b"CRIBDT01"
+    HEADER = struct.Struct("<8sQ")
+    DESCRIPTION = "discard table"
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        records: np.ndarray,
+        source: Optional[mmap.mmap] = None,
+    ):
+        if len(keys) != len(records):
+            raise ValueError(f"{len(keys)} keys for {len(records)} records")
+        self.keys = keys
+        self.records = records
+        self._source = source
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        workers: Optional[int] = None,
+        keys: Optional[Sequence[int]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> "DiscardTable":
+        """Compute and save the table, by default for every canonical deal.
+
+        Work is split into chunks that are saved as they finish in a
+        ``<path>.parts`` directory, so an interrupted build picks up where it
+        stopped. ``progress`` is called with (chunks done, chunks in total).
+        """
+        keys = canonical_sets(6) if keys is None else sorted(keys)
+        parts_directory = f"{path}.parts"
+        os.makedirs(parts_directory, exist_ok=True)
+
+        chunks = [
+            (
+                keys[start : start + CHUNK_SIZE],
+                os.path.join(parts_directory, f"{start:08d}.npy"),
             )
+            for start in range(0, len(keys), CHUNK_SIZE)
+        ]
+        missing = [chunk for chunk in chunks if cls._read_part(*chunk) is None]
+        done = len(chunks) - len(missing)
+
+        workers = workers or os.cpu_count() or 1
+        executor = None
+        if workers == 1:
+            finished = map(_build_chunk, missing)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            finished = executor.map(_build_chunk, missing)
+        try:
+            for _ in finished:
+                done += 1
+                if progress:
+                    progress(done, len(chunks))
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+        with atomic_write(path) as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, len(keys)))
+            file.write(np.asarray(keys, dtype="<u8").tobytes())
+            for chunk in chunks:
+                file.write(cls._read_part(*chunk).tobytes())
+        shutil.rmtree(parts_directory)
+        return cls.load(path)
+
+    @staticmethod
+    def _read_part(keys: Sequence[int], part_path: str) -> Optional[np.ndarray]:
+        """Records of a finished part file, or None if it is missing or stale."""
+        if not os.path.exists(part_path):
+            return None
+        with open(part_path, "rb") as file:
+            part_keys = np.load(file)
+            records = np.load(file)
+        if part_keys.tolist() != list(keys) or records.dtype != _RECORD:
+            return None
+        return records
+
+    def _header_fields(self) -> Sequence[int]:
+        return (len(self.keys),)
+
+    def _write_data(self, file: BinaryIO):
+        file.write(self.keys.astype("<u8").tobytes())
+        file.write(self.records.tobytes())
+
+    @classmethod
+    def _data_size(cls, size: int) -> Optional[int]:
+        return size * (8 + _RECORD.itemsize)
+
+    @classmethod
+    def _from_source(cls, source: mmap.mmap, offset: int, size: int) -> "DiscardTable":
+        keys = np.frombuffer(source, dtype="<u8", count=size, offset=offset)
+        records = np.frombuffer(
+            source, dtype=_RECORD, count=size, offset=offset + 8 * size
+        )
+        return cls(keys, records, source)
+
+    def _release(self):
+        self.keys = self.records = None
+
+    def lookup(
+        self, card_ids: Sequence[int]
+    ) -> Optional[Tuple[Sequence[int], Sequence[int], Sequence[float]]]:
+        """deal_values for 6 card ids, or None if the deal is not in the table."""
+        key, suit_map = canonical_suits(card_ids)
+        # A Python int would make NumPy convert every key before searching
+        index = int(self.keys.searchsorted(np.uint64(key)))
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+
+        # The canonical deal's cards are in ascending id order
+        canonical_ids = [relabel(card_id, suit_map) for card_id in card_ids]
+        order = tuple(sorted(range(6), key=canonical_ids.__getitem__))
+        options = _OPTION_GETTERS[order]
 
-        return max(discard_options_averaged, key=lambda x: x[1])
+        record = self.records[index]
+        return (
+            options(record["keep"].tolist()),
+            options(record["discard"].tolist()),
+            options(record["crib"].tolist()),
+        )
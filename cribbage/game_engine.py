@@ -0,0 +1,380 @@
+# Rules of 2 player cribbage with no input or output. Decisions come from agent
+# objects and everything that happens is published as GameEvents, so a terminal
+# UI, a logger or a simulator can all drive the same engine.
+from cribbage.cards import Card, Deck
+from cribbage.hand import Hand
+from cribbage.scoring import score_hand
+from cribbage.pegging import trailing_run
+from abc import ABC, abstractmethod
+from typing import (
+    Callable,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import random
+
+WINNING_SCORE = 121
+
+# Event kinds, in the order they happen during a game
+CUT_FOR_DEAL = "cut_for_deal"
+DEAL = "deal"
+DISCARD = "discard"
+STARTER = "starter"
+PLAY = "play"
+GO = "go"
+RESET = "reset"
+SHOW = "show"
+SCORE = "score"
+ROUND_END = "round_end"
+GAME_OVER = "game_over"
+
+_RANK_ORDER = {rank: index for index, rank in enumerate(Deck.RANKS)}
+
+
+class GameEvent(NamedTuple):
+    """Something that happened in the game.
+
+    ``player`` is the index of the player it concerns, if any. For SCORE events
+    ``points`` is the points just scored, ``reason`` says what for and ``total``
+    is the player's new score. For PLAY events ``count`` is the new count.
+    """
+
+    kind: str
+    player: Optional[int] = None
+    cards: Tuple[Card, ...] = ()
+    points: int = 0
+    reason: str = ""
+    count: int = 0
+    total: int = 0
+
+
+class PlayerView(NamedTuple):
+    """What a player is allowed to know when making a decision."""
+
+    player: int
+    dealer: int
+    scores: Tuple[int, int]
+    target_score: int
+    # The 6 dealt cards while discarding, the unplayed cards while pegging
+    hand: Tuple[Card, ...]
+    kept: Tuple[Card, ...]
+    discards: Tuple[Card, ...]
+    starter: Optional[Card]
+    count: int
+    # Cards played since the count was last reset
+    sequence: Tuple[Card, ...]
+    # Every (player, card) played so far this round
+    played: Tuple[Tuple[int, Card], ...]
+    opponent_cards_left: int
+
+
+class Decision(NamedTuple):
+    """A choice the engine is waiting for, yielded by GameEngine.decisions."""
+
+    player: int
+    view: PlayerView
+    # The cards that may be played, or None when the player must discard
+    playable: Optional[List[Card]] = None
+
+
+# What a decisions generator yields, is sent and returns
+Decisions = Generator[Decision, Union[List[Card], Card], int]
+
+
+class Agent(ABC):
+    """Makes the decisions for one player."""
+
+    @abstractmethod
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        """Return the 2 cards from view.hand to put in the crib."""
+
+    @abstractmethod
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        """Return one of the playable cards to peg."""
+
+
+class GameOver(Exception):
+    """Raised inside the engine once a player reaches the target score."""
+
+
+def card_value(card: Card) -> int:
+    return min(_RANK_ORDER[card.rank] + 1, 10)
+
+
+def score_play(sequence: Sequence[Card], count: int) -> List[Tuple[str, int]]:
+    """Points for the last card of a pegging sequence, as (reason, points) pairs."""
+    scores = []
+    if count == 15:
+        scores.append(("fifteen", 2))
+
+    matching = 1
+    for card in reversed(sequence[:-1]):
+        if card.rank != sequence[-1].rank:
+            break
+        matching += 1
+    if matching > 1:
+        scores.append(("pair", matching * (matching - 1)))
+
+    run = trailing_run([_RANK_ORDER[card.rank] for card in sequence])
+    if run:
+        scores.append(("run", run))
+
+    return scores
+
+
+class GameEngine:
+    def __init__(
+        self,
+        agents: Sequence[Agent],
+        target_score: int = WINNING_SCORE,
+        rng: Optional[random.Random] = None,
+        dealer: Optional[int] = None,
+    ):
+        if len(agents) != 2:
+            raise ValueError("Cribbage is played by exactly 2 agents")
+
+        self.agents = list(agents)
+        self.target_score = target_score
+        self.rng = rng if rng else random.Random()
+        self.subscribers: List[Callable[[GameEvent], None]] = []
+
+        self.scores = [0, 0]
+        self.dealer = dealer
+        self.round_number = 0
+        self.winner: Optional[int] = None
+        self._reset_round()
+
+    def subscribe(self, callback: Callable[[GameEvent], None]):
+        self.subscribers.append(callback)
+
+    def _emit(self, event: GameEvent):
+        for callback in self.subscribers:
+            callback(event)
+
+    def _reset_round(self):
+        self.deck: Optional[Deck] = None
+        self.hands: List[List[Card]] = [[], []]
+        self.kept: List[List[Card]] = [[], []]
+        self.discards: List[List[Card]] = [[], []]
+        self.crib: List[Card] = []
+        self.starter: Optional[Card] = None
+        self.count = 0
+        self.sequence: List[Card] = []
+        self.played: List[Tuple[int, Card]] = []
+
+    def _add_score(self, player: int, points: int, reason: str):
+        if points <= 0 or self.winner is not None:
+            return
+
+        self.scores[player] += points
+        self._emit(
+            GameEvent(
+                SCORE, player, points=points, reason=reason, total=self.scores[player]
+            )
+        )
+        if self.scores[player] >= self.target_score:
+            self.winner = player
+            raise GameOver()
+
+    def view(self, player: int) -> PlayerView:
+        return PlayerView(
+            player=player,
+            dealer=self.dealer,
+            scores=tuple(self.scores),
+            target_score=self.target_score,
+            hand=tuple(self.hands[player]),
+            kept=tuple(self.kept[player]),
+            discards=tuple(self.discards[player]),
+            starter=self.starter,
+            count=self.count,
+            sequence=tuple(self.sequence),
+            played=tuple(self.played),
+            opponent_cards_left=len(self.hands[1 - player]),
+        )
+
+    def play_game(self) -> int:
+        """Play until a player reaches the target score and return the winner."""
+        return self._drive(self.decisions())
+
+    def decisions(self) -> Decisions:
+        """Play the game as a generator of the decisions it needs.
+
+        Send each Decision's answer back: the 2 cards to discard, or the card
+        to play. The generator returns the winner. This lets one thread step
+        through many games at once, where play_game asks the agents and blocks.
+        """
+        try:
+            if self.dealer is None:
+                self._cut_for_deal()
+            while True:
+                yield from self._round_decisions()
+                self.dealer = 1 - self.dealer
+        except GameOver:
+            pass
+
+        self._emit(GameEvent(GAME_OVER, self.winner, total=self.scores[self.winner]))
+        return self.winner
+
+    def _drive(self, decisions: Decisions):
+        """Answer every decision with the agents and return what the generator does."""
+        try:
+            decision = next(decisions)
+            while True:
+                agent = self.agents[decision.player]
+                if decision.playable is None:
+                    answer = agent.select_discards(decision.view)
+                else:
+                    answer = agent.select_play(decision.view, decision.playable)
+                decision = decisions.send(answer)
+        except StopIteration as stop:
+            return stop.value
+
+    def _new_deck(self) -> Deck:
+        deck = Deck()
+        deck.shuffle(self.rng)
+        return deck
+
+    def _cut_for_deal(self):
+        """Both players cut the deck and the lower card deals, re-cutting on ties."""
+        while True:
+            deck = self._new_deck()
+            cuts = (deck.draw(), deck.draw())
+            self._emit(GameEvent(CUT_FOR_DEAL, cards=cuts))
+            ranks = [_RANK_ORDER[card.rank] for card in cuts]
+            if ranks[0] != ranks[1]:
+                self.dealer = 0 if ranks[0] < ranks[1] else 1
+                return
+
+    def play_round(self):
+        self._drive(self._round_decisions())
+
+    def _round_decisions(self) -> Decisions:
+        self._reset_round()
+        self.round_number += 1
+        pone = 1 - self.dealer
+
+        self.deck = self._new_deck()
+        for _ in range(6):
+            for player in (pone, self.dealer):
+                self.hands[player].append(self.deck.draw())
+        for player in (pone, self.dealer):
+            self._emit(GameEvent(DEAL, player, tuple(self.hands[player])))
+
+        yield from self._discard_decisions()
+
+        self.starter = self.deck.draw()
+        self._emit(GameEvent(STARTER, self.dealer, (self.starter,)))
+        if self.starter.rank == "J":
+            self._add_score(self.dealer, 2, "his heels")
+
+        yield from self._play_decisions()
+        self._show_phase()
+        self._emit(GameEvent(ROUND_END, self.dealer))
+
+    def _discard_decisions(self) -> Decisions:
+        for player in (1 - self.dealer, self.dealer):
+            hand = self.hands[player]
+            discards = yield Decision(player, self.view(player))
+
+            if any(card not in hand for card in discards):
+                raise ValueError(f"Player {player} cannot discard {discards}")
+            indices = sorted({hand.index(card) for card in discards})
+            if len(indices) != 2 or len(discards) != 2:
+                raise ValueError(f"Player {player} must discard exactly 2 cards")
+
+            self.discards[player] = [hand[i] for i in indices]
+            self.crib.extend(self.discards[player])
+            self.kept[player] = [
+                card for i, card in enumerate(hand) if i not in indices
+            ]
+            self.hands[player] = list(self.kept[player])
+            self._emit(GameEvent(DISCARD, player, tuple(self.discards[player])))
+
+    def _can_play(self, player: int) -> bool:
+        return any(self.count + card_value(card) <= 31 for card in self.hands[player])
+
+    def _reset_count(self):
+        self.count = 0
+        self.sequence = []
+        self._emit(GameEvent(RESET))
+
+    def _play_phase(self):
+        self._drive(self._play_decisions())
+
+    def _play_decisions(self) -> Decisions:
+        turn = 1 - self.dealer
+        last_player = None
+        said_go = [False, False]
+
+        while self.hands[0] or self.hands[1]:
+            if self._can_play(turn):
+                yield from self._play_card(turn)
+                last_player = turn
+
+                if self.count == 31:
+                    self._add_score(turn, 2, "thirty-one")
+                    self._reset_count()
+                    said_go = [False, False]
+                turn = 1 - turn
+                continue
+
+            if self._can_play(1 - turn):
+                # The other player keeps playing until they cannot either
+                if not said_go[turn] and self.hands[turn]:
+                    said_go[turn] = True
+                    self._emit(GameEvent(GO, turn))
+                turn = 1 - turn
+                continue
+
+            # Neither player can play: the last card played scores a go
+            if self.hands[turn] and not said_go[turn]:
+                self._emit(GameEvent(GO, turn))
+            self._add_score(last_player, 1, "go")
+            self._reset_count()
+            said_go = [False, False]
+            turn = 1 - last_player
+
+        if self.count > 0:
+            self._add_score(last_player, 1, "last card")
+
+    def _play_card(self, player: int) -> Decisions:
+        hand = self.hands[player]
+        playable = [card for card in hand if self.count + card_value(card) <= 31]
+        card = yield Decision(player, self.view(player), playable)
+        if card not in playable:
+            raise ValueError(f"Player {player} cannot play {card}")
+
+        hand.pop(hand.index(card))
+        self.count += card_value(card)
+        self.sequence.append(card)
+        self.played.append((player, card))
+        self._emit(GameEvent(PLAY, player, (card,), count=self.count))
+
+        for reason, points in score_play(self.sequence, self.count):
+            self._add_score(player, points, reason)
+
+    def _show_phase(self):
+        pone = 1 - self.dealer
+        shows = [
+            (pone, self.kept[pone], False),
+            (self.dealer, self.kept[self.dealer], False),
+        ]
+        shows.append((self.dealer, self.crib, True))
+
+        for player, cards, is_crib in shows:
+            points = score_hand(Hand(list(cards)), self.starter, is_crib)
+            self._emit(
+                GameEvent(
+                    SHOW,
+                    player,
+                    tuple(cards),
+                    points=points,
+                    reason="crib" if is_crib else "hand",
+                )
+            )
+            self._add_score(player, points, "crib" if is_crib else "hand")
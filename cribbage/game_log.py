@@ -0,0 +1,435 @@
+# Compact binary log of played games. Every GameEvent is stored as a few bytes
+# using the integer card ids, and each game is a length prefixed frame, so logs
+# of millions of games can be written and read back one game at a time.
+#
+# File layout: MAGIC, then one frame per game. A frame is a varint length and a
+# payload of varint game id, varint target score, the round snapshots and the
+# encoded events. An event is one byte of (kind index << 2 | player, with 3 for
+# no player) and then the fields of its kind:
+#   cut_for_deal 2 cards, deal 6 cards, discard 2 cards, starter 1 card,
+#   play 1 card, show 4 cards + points + reason, score points + reason.
+# Counts and score totals are not stored; the reader recomputes them.
+#
+# Only the scores, the dealer and the round number carry over from one round to
+# the next, so a snapshot of them is stored for the start of every round: a
+# varint count, then per round the varint event index and byte offset (each as
+# a difference from the previous round), both scores as varints and the dealer
+# byte. Decoding can then start at any round instead of the first event.
+#
+# After the last game come a zero length frame, the (game id, offset) of every
+# INDEX_INTERVAL-th frame as "<QQ" pairs and the INDEX_TRAILER, which GameLog
+# uses to find a game without reading the ones before it.
+from cribbage.card_encoding import card_to_id, id_to_card
+from cribbage.game_engine import (
+    CUT_FOR_DEAL,
+    DEAL,
+    DISCARD,
+    GAME_OVER,
+    GO,
+    PLAY,
+    RESET,
+    ROUND_END,
+    SCORE,
+    SHOW,
+    STARTER,
+    GameEvent,
+    card_value,
+)
+from bisect import bisect_right
+from typing import (
+    BinaryIO,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import os
+import struct
+
+MAGIC = b"CRIBLOG2"
+
+# Frames between entries of the index at the end of a log
+INDEX_INTERVAL = 1024
+INDEX_TRAILER = struct.Struct("<Q8s")
+INDEX_MAGIC = b"CRIBIDX1"
+_INDEX_ENTRY = struct.Struct("<QQ")
+
+EVENT_KINDS = (
+    CUT_FOR_DEAL,
+    DEAL,
+    DISCARD,
+    STARTER,
+    PLAY,
+    GO,
+    RESET,
+    SHOW,
+    SCORE,
+    ROUND_END,
+    GAME_OVER,
+)
+SCORE_REASONS = (
+    "his heels",
+    "fifteen",
+    "pair",
+    "run",
+    "thirty-one",
+    "go",
+    "last card",
+    "hand",
+    "crib",
+)
+
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+_REASON_CODES = {reason: code for code, reason in enumerate(SCORE_REASONS)}
+_CARD_COUNTS = {CUT_FOR_DEAL: 2, DEAL: 6, DISCARD: 2, STARTER: 1, PLAY: 1, SHOW: 4}
+_NO_PLAYER = 3
+
+
+class GameRecord(NamedTuple):
+    game_id: int
+    target_score: int
+    events: Tuple[GameEvent, ...]
+
+    @property
+    def winner(self) -> int:
+        return self.events[-1].player
+
+
+class GameRecorder:
+    """Engine subscriber that collects the events of the game being played."""
+
+    def __init__(self):
+        self.events: List[GameEvent] = []
+
+    def __call__(self, event: GameEvent):
+        self.events.append(event)
+
+    def record(self, game_id: int, target_score: int) -> GameRecord:
+        return GameRecord(game_id, target_score, tuple(self.events))
+
+
+def _append_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """The varint at position and the position after it."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class Snapshot(NamedTuple):
+    """The state carried into a round, stored for its first DEAL event."""
+
+    event_index: int
+    round_number: int
+    dealer: int
+    scores: Tuple[int, int]
+    # Offset of the DEAL event in the encoded game
+    position: int
+
+
+class GameHeader(NamedTuple):
+    game_id: int
+    target_score: int
+    snapshots: Tuple[Snapshot, ...]
+    # Offset of the first event in the encoded game
+    events_start: int
+
+
+def encode_game(record: GameRecord) -> bytes:
+    """The payload of one game's frame."""
+    events = bytearray()
+    rounds = []
+    scores = [0, 0]
+    previous_kind = None
+
+    for index, event in enumerate(record.events):
+        if event.kind == DEAL and previous_kind != DEAL:
+            rounds.append((index, len(events), tuple(scores), 1 - event.player))
+        previous_kind = event.kind
+
+        player = _NO_PLAYER if event.player is None else event.player
+        events.append(_KIND_CODES[event.kind] << 2 | player)
+        if event.kind in _CARD_COUNTS:
+            if len(event.cards) != _CARD_COUNTS[event.kind]:
+                raise ValueError(
+                    f"A {event.kind} event needs "
+                    f"{_CARD_COUNTS[event.kind]} cards: {event}"
+                )
+            events.extend(card_to_id(card) for card in event.cards)
+        if event.kind in (SHOW, SCORE):
+            events.append(event.points)
+            events.append(_REASON_CODES[event.reason])
+        if event.kind == SCORE:
+            scores[event.player] = event.total
+
+    payload = bytearray()
+    _append_varint(payload, record.game_id)
+    _append_varint(payload, record.target_score)
+    _append_varint(payload, len(rounds))
+    last_index = last_position = 0
+    for index, position, round_scores, dealer in rounds:
+        _append_varint(payload, index - last_index)
+        _append_varint(payload, position - last_position)
+        _append_varint(payload, round_scores[0])
+        _append_varint(payload, round_scores[1])
+        payload.append(dealer)
+        last_index, last_position = index, position
+    payload.extend(events)
+    return bytes(payload)
+
+
+def read_header(payload: bytes) -> GameHeader:
+    """The game id, target score and round snapshots of an encoded game."""
+    game_id, position = _read_varint(payload, 0)
+    target_score, position = _read_varint(payload, position)
+    rounds, position = _read_varint(payload, position)
+
+    fields = []
+    index = offset = 0
+    for _ in range(rounds):
+        index_step, position = _read_varint(payload, position)
+        offset_step, position = _read_varint(payload, position)
+        first_score, position = _read_varint(payload, position)
+        second_score, position = _read_varint(payload, position)
+        dealer = payload[position]
+        position += 1
+        index += index_step
+        offset += offset_step
+        fields.append((index, dealer, (first_score, second_score), offset))
+
+    snapshots = tuple(
+        Snapshot(index, round_number, dealer, scores, position + offset)
+        for round_number, (index, dealer, scores, offset) in enumerate(fields, 1)
+    )
+    return GameHeader(game_id, target_score, snapshots, position)
+
+
+def decode_events(
+    payload: bytes, position: int, scores: Sequence[int] = (0, 0)
+) -> Iterator[GameEvent]:
+    """Decode the events of a game from ``position`` to the end.
+
+    ``position`` is the header's events_start, or a snapshot's position with
+    the snapshot's scores.
+    """
+    count = 0
+    totals = list(scores)
+    while position < len(payload):
+        header = payload[position]
+        position += 1
+        kind = EVENT_KINDS[header >> 2]
+        player = None if header & 3 == _NO_PLAYER else header & 3
+
+        cards = ()
+        if kind in _CARD_COUNTS:
+            end = position + _CARD_COUNTS[kind]
+            cards = tuple(id_to_card(card_id) for card_id in payload[position:end])
+            position = end
+
+        if kind in (SHOW, SCORE):
+            points, reason = payload[position], SCORE_REASONS[payload[position + 1]]
+            position += 2
+            if kind == SCORE:
+                totals[player] += points
+                yield GameEvent(
+                    kind, player, points=points, reason=reason, total=totals[player]
+                )
+            else:
+                yield GameEvent(kind, player, cards, points=points, reason=reason)
+        elif kind == PLAY:
+            count += card_value(cards[0])
+            yield GameEvent(kind, player, cards, count=count)
+        elif kind == GAME_OVER:
+            yield GameEvent(kind, player, total=totals[player])
+        else:
+            if kind in (DEAL, RESET):
+                count = 0
+            yield GameEvent(kind, player, cards)
+
+
+def decode_game(payload: bytes) -> GameRecord:
+    header = read_header(payload)
+    return GameRecord(
+        header.game_id,
+        header.target_score,
+        tuple(decode_events(payload, header.events_start)),
+    )
+
+
+class GameLogWriter:
+    """Appends games to a log file; use as a context manager.
+
+    The index is only written when the game ids are in ascending order, as they
+    are from simulate. Logs without one can still be read, only more slowly.
+    """
+
+    def __init__(self, path: str, index_interval: int = INDEX_INTERVAL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file: BinaryIO = open(path, "wb")
+        self.file.write(MAGIC)
+        self.games = 0
+        self.index_interval = index_interval
+        self._offset = len(MAGIC)
+        self._index: List[Tuple[int, int]] = []
+        self._last_game_id = -1
+        self._ascending = True
+
+    def write(self, record: GameRecord):
+        self.write_encoded(encode_game(record))
+
+    def write_encoded(self, payload: bytes):
+        """Write a payload from encode_game, e.g. one made in a worker process."""
+        game_id, _ = _read_varint(payload, 0)
+        self._ascending = self._ascending and game_id > self._last_game_id
+        self._last_game_id = game_id
+        if self.games % self.index_interval == 0:
+            self._index.append((game_id, self._offset))
+
+        frame = bytearray()
+        _append_varint(frame, len(payload))
+        self.file.write(frame)
+        self.file.write(payload)
+        self.games += 1
+        self._offset += len(frame) + len(payload)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.write(b"\0")
+        index_start = self._offset + 1
+        if self._ascending:
+            for game_id, offset in self._index:
+                self.file.write(_INDEX_ENTRY.pack(game_id, offset))
+        self.file.write(INDEX_TRAILER.pack(index_start, INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_games(path: str, records: Iterable[GameRecord]) -> int:
+    """Write every record from an iterable (e.g. a generator) and return how many."""
+    with GameLogWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+        return writer.games
+
+
+def _read_frame(file: BinaryIO) -> Optional[bytes]:
+    """The next frame's payload, or None at the end of the games."""
+    length = 0
+    shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Game log ends inside a frame length")
+            return None
+        length |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            break
+        shift += 7
+    if length == 0:
+        return None
+
+    payload = file.read(length)
+    if len(payload) != length:
+        raise ValueError("Game log ends inside a game")
+    return payload
+
+
+def read_frames(file: Union[str, BinaryIO]) -> Iterator[bytes]:
+    """The encoded payload of each game in a log, one at a time."""
+    if isinstance(file, str):
+        with open(file, "rb") as opened:
+            yield from read_frames(opened)
+        return
+
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a cribbage game log")
+    while True:
+        payload = _read_frame(file)
+        if payload is None:
+            return
+        yield payload
+
+
+def read_games(file: Union[str, BinaryIO]) -> Iterator[GameRecord]:
+    """Decode the games of a log lazily, so only one is in memory at a time."""
+    for payload in read_frames(file):
+        yield decode_game(payload)
+
+
+class GameLog:
+    """Random access to the games of a log file by game id.
+
+    With the index at the end of the log, finding a game reads at most
+    INDEX_INTERVAL frames. A log without one, e.g. from a run that was killed,
+    is searched from the start.
+    """
+
+    def __init__(self, path: str):
+        self.file: BinaryIO = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            self.file.close()
+            raise ValueError(f"Not a cribbage game log: {path}")
+
+        self.index_ids: List[int] = []
+        self.index_offsets: List[int] = []
+        size = self.file.seek(0, os.SEEK_END)
+        if size >= len(MAGIC) + INDEX_TRAILER.size:
+            self.file.seek(size - INDEX_TRAILER.size)
+            index_start, magic = INDEX_TRAILER.unpack(self.file.read())
+            if magic == INDEX_MAGIC:
+                self.file.seek(index_start)
+                entries = self.file.read(size - INDEX_TRAILER.size - index_start)
+                for game_id, offset in _INDEX_ENTRY.iter_unpack(entries):
+                    self.index_ids.append(game_id)
+                    self.index_offsets.append(offset)
+
+    def payload(self, game_id: int) -> bytes:
+        """The encoded game with this id; raises KeyError if there is none."""
+        block = bisect_right(self.index_ids, game_id) - 1
+        self.file.seek(self.index_offsets[block] if block >= 0 else len(MAGIC))
+        while True:
+            payload = _read_frame(self.file)
+            if payload is None:
+                raise KeyError(game_id)
+            frame_id, _ = _read_varint(payload, 0)
+            if frame_id == game_id:
+                return payload
+            if self.index_ids and frame_id > game_id:
+                raise KeyError(game_id)
+
+    def game(self, game_id: int) -> GameRecord:
+        return decode_game(self.payload(game_id))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "GameLog":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
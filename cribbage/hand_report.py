@@ -0,0 +1,176 @@
+# Statistics of every possible hand: each of the 270,725 sets of 4 cards with
+# each of its 48 cuts, 12,994,800 cases in all. Every case is scored by the
+# fast table scorer and broken down into categories by the vectorized
+# HandScorer, and one case of each of the 652,353 classes of hand and cut that
+# only differ by suits is also scored by the reference HandScorer.score_hand.
+# So the job doubles as a check of the fast scorers and as a benchmark.
+from cribbage.card_encoding import NUM_CARDS, id_to_card, ids_to_cards
+from cribbage.hand import Hand
+from cribbage.hand_scorer import BREAKDOWN_CATEGORIES, HandScorer
+from cribbage.scoring import get_backend
+from cribbage.suit_isomorphism import canonical_hand_and_cut_batch
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import os
+import time
+import numpy as np
+
+NUM_HANDS = 270725
+NUM_CASES = NUM_HANDS * (NUM_CARDS - 4)
+
+# Scores run from 0 to 29, and no category scores more than that either
+NUM_SCORES = 30
+
+# Hands per task sent to a worker
+CHUNK_SIZE = 5000
+
+
+@lru_cache(maxsize=1)
+def _all_hands() -> np.ndarray:
+    """Every 4 card hand as sorted card ids, in itertools.combinations order."""
+    return np.array(list(combinations(range(NUM_CARDS), 4)), dtype=np.intp)
+
+
+class HandReport(NamedTuple):
+    """Counts over the cases scored; each array is indexed by points.
+
+    ``breakdown`` has a row per category in BREAKDOWN_CATEGORIES.
+    ``mismatches`` counts cases where the table scorer's total differs from
+    the sum of the categories. ``reference_cases`` is how many cases were
+    also scored by HandScorer.score_hand, one per suit symmetry class, and
+    ``reference_mismatches`` how many of those it scored differently.
+    """
+
+    crib: bool
+    histogram: np.ndarray
+    breakdown: np.ndarray
+    mismatches: int
+    reference_cases: int
+    reference_mismatches: int
+    seconds: float
+
+    @property
+    def cases(self) -> int:
+        return int(self.histogram.sum())
+
+    @property
+    def cases_per_second(self) -> float:
+        return self.cases / self.seconds if self.seconds else 0.0
+
+    def impossible_scores(self) -> List[int]:
+        """Scores below the highest one that no case reaches."""
+        highest = int(np.flatnonzero(self.histogram).max())
+        return [score for score in range(highest) if not self.histogram[score]]
+
+    def mean(self) -> float:
+        return float(self.histogram @ np.arange(NUM_SCORES)) / self.cases
+
+    def category_means(self) -> Dict[str, float]:
+        points = self.breakdown @ np.arange(NUM_SCORES) / self.cases
+        return dict(zip(BREAKDOWN_CATEGORIES, points.tolist()))
+
+
+def _canonical_cases(hands: np.ndarray, cut_ids: np.ndarray) -> np.ndarray:
+    """Rows that are their class's canonical case, so each class of hand and
+    cut that only differ by suits is picked exactly once over all cases."""
+    _, suit_maps = canonical_hand_and_cut_batch(hands, cut_ids)
+    rows = np.arange(len(hands))[:, None]
+    relabelled = suit_maps[rows, hands // 13] * 13 + hands % 13
+    relabelled_cuts = suit_maps[rows[:, 0], cut_ids // 13] * 13 + cut_ids % 13
+    return np.flatnonzero(
+        (np.sort(relabelled, axis=1) == hands).all(axis=1)
+        & (relabelled_cuts == cut_ids)
+    )
+
+
+def _reference_mismatches(
+    hands: np.ndarray, cut_ids: np.ndarray, totals: np.ndarray, crib: bool
+) -> int:
+    return sum(
+        HandScorer.score_hand(Hand(ids_to_cards(hand)), id_to_card(cut_id), crib)
+        != total
+        for hand, cut_id, total in zip(hands.tolist(), cut_ids.tolist(), totals)
+    )
+
+
+def _chunk_report(
+    chunk: Tuple[int, int, bool],
+) -> Tuple[np.ndarray, np.ndarray, int, int, int]:
+    start, stop, crib = chunk
+    hands = _all_hands()[start:stop]
+    cuts = np.arange(NUM_CARDS)
+    # Each hand with every card as the cut, then the cuts it holds are dropped
+    in_hand = (hands[:, :, None] == cuts).any(axis=1)
+    rows, cut_ids = np.nonzero(~in_hand)
+    hands = hands[rows]
+
+    totals = get_backend("table").score_batch(hands, cut_ids, crib)
+    breakdown = HandScorer.score_breakdown_batch(hands, cut_ids, crib)
+    mismatches = int((breakdown.sum(axis=1) != totals).sum())
+
+    canonical = _canonical_cases(hands, cut_ids)
+    reference_mismatches = _reference_mismatches(
+        hands[canonical], cut_ids[canonical], totals[canonical].tolist(), crib
+    )
+
+    histogram = np.bincount(totals, minlength=NUM_SCORES)
+    categories = np.stack(
+        [np.bincount(column, minlength=NUM_SCORES) for column in breakdown.T]
+    )
+    return histogram, categories, mismatches, len(canonical), reference_mismatches
+
+
+def hand_report(
+    crib: bool = False,
+    workers: Optional[int] = None,
+    hands: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> HandReport:
+    """Score every hand with every cut, as hands or as cribs.
+
+    ``hands`` limits the report to the first that many hands, for a quick
+    run. ``progress`` is called with (chunks done, chunks in total).
+    """
+    hands = NUM_HANDS if hands is None else min(hands, NUM_HANDS)
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        (start, min(start + CHUNK_SIZE, hands), crib)
+        for start in range(0, hands, CHUNK_SIZE)
+    ]
+
+    started = time.perf_counter()
+    histogram = np.zeros(NUM_SCORES, dtype=np.int64)
+    breakdown = np.zeros((len(BREAKDOWN_CATEGORIES), NUM_SCORES), dtype=np.int64)
+    # Mismatches, reference cases and reference mismatches
+    counts = np.zeros(3, dtype=np.int64)
+    executor = None
+    if workers == 1:
+        finished = map(_chunk_report, chunks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        finished = executor.map(_chunk_report, chunks)
+    try:
+        for done, (chunk_histogram, chunk_breakdown, *chunk_counts) in enumerate(
+            finished, 1
+        ):
+            histogram += chunk_histogram
+            breakdown += chunk_breakdown
+            counts += chunk_counts
+            if progress:
+                progress(done, len(chunks))
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    mismatches, reference_cases, reference_mismatches = counts.tolist()
+    return HandReport(
+        crib,
+        histogram,
+        breakdown,
+        mismatches,
+        reference_cases,
+        reference_mismatches,
+        time.perf_counter() - started,
+    )
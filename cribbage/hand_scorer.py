@@ -1,11 +1,71 @@
 from cribbage.hand import Hand
 from cribbage.cards import Card
-from typing import List
-from itertools import combinations
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    CARD_VALUE,
+    FULL_DECK_MASK,
+    JACK,
+    NUM_RANKS,
+)
+from cribbage.lru_cache import CacheInfo, LRUCache
+from cribbage.suit_isomorphism import canonical_hand
+from typing import Dict, List, Optional, Sequence, Tuple
 from collections import Counter
+from numpy.lib.stride_tricks import sliding_window_view
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+# The keys of score_breakdown, in the column order of score_breakdown_batch
+BREAKDOWN_CATEGORIES = ("fifteens", "pairs", "runs", "flush", "nobs")
+
+_CARD_VALUES = np.array(CARD_VALUE, dtype=np.int16)
+_CARD_RANKS = np.array(CARD_RANK, dtype=np.int16) - 1
+_CARD_SUITS = np.array(CARD_SUIT, dtype=np.int16)
+
+
+def count_fifteens(values: Sequence[int]) -> int:
+    """How many subsets of the card values add up to 15, for any number of cards.
+
+    Subset-sum DP over the totals 0..15: adding a card of value v adds the
+    ways to reach t - v to the ways to reach t. The count for each total is
+    kept in its own bit field of one int, so a card is a single shift and add.
+    """
+    # n cards reach a total in at most 2**n ways, so n + 1 bits never overflow
+    width = len(values) + 1
+    fields = (1 << (16 * width)) - 1
+    ways = 1
+    for value in values:
+        ways = (ways + (ways << (value * width))) & fields
+    return ways >> (15 * width)
+
+
+def count_fifteens_batch(values: np.ndarray) -> np.ndarray:
+    """count_fifteens for each row of an (N, k) array of card values."""
+    values = np.asarray(values)
+    if values.shape[1] <= 5:
+        # Any 5 values reach a total in at most 10 ways, so the 16 totals fit
+        # in 4 bit fields of one uint64. Totals over 15 are shifted out.
+        ways = np.ones(len(values), dtype=np.uint64)
+        for column in values.T.astype(np.uint64):
+            ways += ways << (column * np.uint64(4))
+        return (ways >> np.uint64(60)).astype(np.int64)
+
+    ways = np.zeros((len(values), 16), dtype=np.int64)
+    ways[:, 0] = 1
+    for column in values.T.astype(np.int64):
+        # Ways to reach t - v, with the totals below zero padded with zeros
+        padded = np.concatenate([np.zeros((len(values), 10), np.int64), ways], axis=1)
+        ways = ways + np.take_along_axis(
+            padded, np.arange(16) + 10 - column[:, None], axis=1
+        )
+    return ways[:, 15]
 
 
 class HandScorer:
+    _cache: Optional[LRUCache] = None
+
     @classmethod
     def _rank_to_ordered_numerical(cls, rank: str):
         match rank:
@@ -30,13 +90,7 @@ class HandScorer:
 
     @classmethod
     def _score_15s(cls, cards: List[Card]) -> int:
-        total = 0
-
-        for r in range(2, len(cards) + 1):
-            for combo in combinations(cards, r):
-                if sum(cls._rank_to_value(card.rank) for card in combo) == 15:
-                    total += 2
-        return total
+        return 2 * count_fifteens([cls._rank_to_value(card.rank) for card in cards])
 
     @classmethod
     def _score_runs(cls, cards: List[Card]) -> int:
@@ -94,8 +148,7 @@ class HandScorer:
             return total
 
         suits_found_just_hand = set([card.suit for card in hand.cards])
-        suits_found_with_cut = set(
-            [card.suit for card in hand.cards + [cut_card]])
+        suits_found_with_cut = set([card.suit for card in hand.cards + [cut_card]])
 
         if len(suits_found_just_hand) == 1:
             total = 4
@@ -114,8 +167,40 @@ class HandScorer:
 
         return 0
 
+    @classmethod
+    def enable_cache(cls, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Memoize score_hand from now on, in a new cache of up to maxsize hands.
+
+        Hands are keyed on their canonical form under suit symmetry (see
+        cribbage.suit_isomorphism), so hands that only differ by suits share
+        an entry.
+        """
+        cls._cache = LRUCache(maxsize)
+
+    @classmethod
+    def disable_cache(cls):
+        cls._cache = None
+
+    @classmethod
+    def cache_info(cls) -> Optional[CacheInfo]:
+        """Hit, miss and eviction counts, or None when caching is off."""
+        return cls._cache.info() if cls._cache is not None else None
+
     @classmethod
     def score_hand(cls, hand: Hand, cut_card: Card, crib: bool = False) -> int:
+        if cls._cache is None:
+            return cls._score_hand(hand, cut_card, crib)
+
+        key, _ = canonical_hand(hand, cut_card)
+        # The key is a set of cards, so a hand holding a card twice bypasses it
+        if (key & FULL_DECK_MASK).bit_count() != len(hand.cards):
+            return cls._score_hand(hand, cut_card, crib)
+        return cls._cache.get_or_compute(
+            (key, crib), lambda: cls._score_hand(hand, cut_card, crib)
+        )
+
+    @classmethod
+    def _score_hand(cls, hand: Hand, cut_card: Card, crib: bool = False) -> int:
         return (
             cls._score_15s(hand.cards + [cut_card])
             + cls._score_runs(hand.cards + [cut_card])
@@ -123,3 +208,102 @@ class HandScorer:
             + cls._score_flush(hand, cut_card, crib)
             + cls._score_nobs(hand, cut_card)
         )
+
+    @classmethod
+    def score_breakdown(
+        cls, hand: Hand, cut_card: Card, crib: bool = False
+    ) -> Dict[str, int]:
+        """Points from each scoring category; the values add up to score_hand."""
+        return {
+            "fifteens": cls._score_15s(hand.cards + [cut_card]),
+            "pairs": cls._score_pairs(hand.cards + [cut_card]),
+            "runs": cls._score_runs(hand.cards + [cut_card]),
+            "flush": cls._score_flush(hand, cut_card, crib),
+            "nobs": cls._score_nobs(hand, cut_card),
+        }
+
+    @classmethod
+    def score_batch(
+        cls, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        """Score many 4 card hands at once.
+
+        ``hands`` is an (N, 4) array of card ids and ``cuts`` an (N,) array of
+        cut card ids, using the ids from cribbage.card_encoding. Returns an (N,)
+        array of scores matching score_hand for each row.
+        """
+        return cls.score_breakdown_batch(hands, cuts, crib).sum(axis=1)
+
+    @classmethod
+    def score_breakdown_batch(
+        cls, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        """score_breakdown for many hands: an (N, 5) array of the points from
+        fifteens, pairs, runs, flush and nobs, in BREAKDOWN_CATEGORIES order."""
+        hands, cuts = cls.batch_arrays(hands, cuts)
+        cards = np.concatenate([hands, cuts[:, None]], axis=1)
+        values = _CARD_VALUES[cards]
+        ranks = _CARD_RANKS[cards]
+
+        fifteens = 2 * count_fifteens_batch(values)
+
+        histogram = (ranks[:, :, None] == np.arange(NUM_RANKS)).sum(axis=1)
+        pairs = (histogram * (histogram - 1)).sum(axis=1)
+
+        # A window of consecutive ranks with no gaps is a run, and the product of
+        # its counts is the number of distinct runs it contains. Only the longest
+        # run length present is scored.
+        runs = np.zeros(len(cards), dtype=np.int64)
+        for length in (5, 4, 3):
+            products = sliding_window_view(histogram, length, axis=1).prod(axis=2)
+            run_count = products.sum(axis=1)
+            runs = np.where((runs == 0) & (run_count > 0), length * run_count, runs)
+
+        flush, nobs = cls._batch_flush_and_nobs(hands, cuts, crib)
+        return np.stack([fifteens, pairs, runs, flush, nobs], axis=1)
+
+    @staticmethod
+    def batch_arrays(hands, cuts) -> Tuple[np.ndarray, np.ndarray]:
+        """Check and convert the (N, 4) hands and (N,) cuts given to score_batch.
+
+        Returns them as intp arrays, or raises ValueError for other shapes.
+        Backends with their own score_batch use it to accept the same input.
+        """
+        hands = np.asarray(hands, dtype=np.intp)
+        cuts = np.asarray(cuts, dtype=np.intp)
+        if hands.ndim != 2 or hands.shape[1] != 4:
+            raise ValueError(f"Expected hands of shape (N, 4), got {hands.shape}")
+        if cuts.shape != (hands.shape[0],):
+            raise ValueError(
+                f"Expected cuts of shape ({hands.shape[0]},), got {cuts.shape}"
+            )
+        return hands, cuts
+
+    @classmethod
+    def score_batch_suits(
+        cls, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        """Flush and nobs points for (N, 4) hands and (N,) cuts from batch_arrays.
+
+        The only points that depend on suits, so a backend that scores rank
+        patterns from a table adds these to get the full score.
+        """
+        flush, nobs = cls._batch_flush_and_nobs(hands, cuts, crib)
+        return flush + nobs
+
+    @staticmethod
+    def _batch_flush_and_nobs(
+        hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        hand_suits = _CARD_SUITS[hands]
+        cut_suits = _CARD_SUITS[cuts]
+        hand_flush = (hand_suits == hand_suits[:, :1]).all(axis=1)
+        five_card_flush = hand_flush & (cut_suits == hand_suits[:, 0])
+        if crib:
+            flush = np.where(five_card_flush, 5, 0)
+        else:
+            flush = np.where(five_card_flush, 5, np.where(hand_flush, 4, 0))
+
+        jacks = _CARD_RANKS[hands] == JACK - 1
+        nobs = (jacks & (hand_suits == cut_suits[:, None])).any(axis=1)
+        return flush, nobs.astype(np.int64)
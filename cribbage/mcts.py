@@ -0,0 +1,305 @@
+# Information set Monte Carlo tree search (single observer ISMCTS) for the play.
+# Every iteration deals the opponent a hand consistent with what we have seen,
+# walks the shared tree for that deal and finishes with a random playout.
+from cribbage.agents import HeuristicAgent
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_VALUE,
+    NUM_CARDS,
+    card_to_id,
+    ids_to_cards,
+)
+from cribbage.cards import Card
+from cribbage.game_engine import PlayerView
+from cribbage.pegging import PeggingState, card_rank
+from cribbage.pegging_solver import PeggingSolver
+from typing import Dict, Generator, List, NamedTuple, Optional, Tuple
+import math
+import random
+import time
+
+
+class _Node:
+    __slots__ = ("player", "children", "visits", "reward", "available")
+
+    def __init__(self, player: Optional[int]):
+        # The player whose play led to this node; rewards are from their side
+        self.player = player
+        self.children: Dict[int, "_Node"] = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.available = 0
+
+
+class PeggingLeaf(NamedTuple):
+    """A new leaf of a search, as handed out to be valued.
+
+    ``root`` is the searching player's view, ``opponent_hand`` the cards the
+    opponent was dealt for this iteration and ``state`` the position reached,
+    with the searching player as player 0 and the plays since the root in its
+    undo history.
+    """
+
+    root: PlayerView
+    opponent_hand: Tuple[Card, ...]
+    state: PeggingState
+
+    def view(self) -> PlayerView:
+        """What the player to move at the leaf would see, with real cards.
+
+        Each rank played is taken from its player's cards in hand order.
+        """
+        root = self.root
+        searcher = root.player
+        hands = [list(root.hand), list(self.opponent_hand)]
+        played = list(root.played)
+        for move in self.state._history:
+            rank, turn = move[0], move[1]
+            hand = hands[turn]
+            card = next(card for card in hand if card_rank(card) == rank)
+            hand.remove(card)
+            played.append((searcher if turn == 0 else 1 - searcher, card))
+
+        turn = self.state.turn
+        player = searcher if turn == 0 else 1 - searcher
+        sequence = tuple(
+            card for _, card in played[len(played) - len(self.state.sequence) :]
+        )
+        if turn == 0:
+            kept, discards = root.kept, root.discards
+        else:
+            kept = tuple(card for who, card in root.played if who == player)
+            kept += self.opponent_hand
+            discards = ()
+        scores = list(root.scores)
+        scores[searcher] += self.state.scores[0]
+        scores[1 - searcher] += self.state.scores[1]
+        return root._replace(
+            player=player,
+            scores=tuple(scores),
+            hand=tuple(hands[turn]),
+            kept=kept,
+            discards=discards,
+            count=self.state.count,
+            sequence=sequence,
+            played=tuple(played),
+            opponent_cards_left=len(hands[1 - turn]),
+        )
+
+
+class ISMCTSAgent(HeuristicAgent):
+    """Pegs with ISMCTS and discards like HeuristicAgent.
+
+    Each search runs ``iterations`` iterations, or as many as fit in
+    ``time_limit`` seconds when that is given. The reward is the pegging point
+    differential for the rest of the hand. The tree is kept between plays of
+    the same hand and re-rooted at the position reached. With a ``leaf_solver``
+    new leaves are valued exactly for their deal instead of by a random playout.
+    """
+
+    def __init__(
+        self,
+        iterations: int = 1000,
+        time_limit: Optional[float] = None,
+        exploration: float = 2.0,
+        rng: Optional[random.Random] = None,
+        crib_mode: str = "cut",
+        leaf_solver: Optional[PeggingSolver] = None,
+    ):
+        super().__init__(rng=rng, crib_mode=crib_mode)
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.leaf_solver = leaf_solver
+
+        self._root: Optional[_Node] = None
+        self._root_key: Optional[Tuple] = None
+        self._root_history: Tuple[Tuple[int, int], ...] = ()
+
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        search = self.search(view, playable)
+        try:
+            leaf = next(search)
+            while True:
+                leaf = search.send(self._leaf_value(leaf))
+        except StopIteration as stop:
+            return stop.value
+
+    def search(
+        self, view: PlayerView, playable: List[Card]
+    ) -> Generator[PeggingLeaf, int, Card]:
+        """select_play as a generator that hands out its new leaves to be valued.
+
+        Send back each yielded leaf's pegging point differential for the rest
+        of the hand, from the side of the player to move at the leaf (what
+        PeggingSolver.solve gives for its state). The generator returns the card to play, so
+        an EvaluationScheduler can run many searches and value their leaves
+        together.
+        """
+        by_rank = {card_rank(card): card for card in playable}
+        if len(by_rank) == 1:
+            return playable[0]
+
+        root = self._find_root(view)
+        my_ranks = [card_rank(card) for card in view.hand]
+        pool = self._opponent_pool(view)
+        sequence = [card_rank(card) for card in view.sequence]
+        last = None
+        if view.sequence:
+            last = 0 if view.played[-1][0] == view.player else 1
+
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        iteration = 0
+        while iteration < self.iterations or deadline is not None:
+            if deadline is not None and iteration % 16 == 0:
+                if time.perf_counter() >= deadline:
+                    break
+            opponent = self.rng.sample(pool, view.opponent_cards_left)
+            hands = [my_ranks, [CARD_RANK[card_id] - 1 for card_id in opponent]]
+            state = PeggingState(hands, 0, view.count, sequence, last)
+
+            path = self._descend(root, state)
+            points = list(state.scores)
+            if not state.is_over():
+                points[state.turn] += yield PeggingLeaf(
+                    view, tuple(ids_to_cards(opponent)), state
+                )
+            self._backpropagate(path, points)
+            iteration += 1
+
+        best = max(
+            by_rank,
+            key=lambda rank: root.children[rank].visits if rank in root.children else 0,
+        )
+        return by_rank[best]
+
+    def _leaf_value(self, leaf: PeggingLeaf) -> int:
+        state = leaf.state
+        if self.leaf_solver is not None:
+            return self.leaf_solver.solve(state)
+
+        mover = state.turn
+        before = state.scores[mover] - state.scores[1 - mover]
+        state.playout(self.rng)
+        return state.scores[mover] - state.scores[1 - mover] - before
+
+    def _descend(self, root: _Node, state: PeggingState) -> List[_Node]:
+        """Walk the tree for this deal, adding at most one node.
+
+        Returns the path of nodes walked. ``state`` is left at the new leaf, or
+        at the end of the hand if that came first.
+        """
+        rng = self.rng
+        node = root
+        path = []
+        while not state.is_over():
+            legal = state.legal_moves()
+            children = node.children
+            untried = []
+            for rank in legal:
+                child = children.get(rank)
+                if child is None:
+                    untried.append(rank)
+                else:
+                    child.available += 1
+
+            if untried:
+                rank = rng.choice(untried)
+                child = children[rank] = _Node(state.turn)
+                child.available = 1
+                state.apply(rank)
+                path.append(child)
+                break
+
+            exploration = self.exploration
+            best_rank = None
+            best_score = -math.inf
+            for rank in legal:
+                child = children[rank]
+                score = child.reward / child.visits + exploration * math.sqrt(
+                    math.log(child.available) / child.visits
+                )
+                if score > best_score:
+                    best_rank = rank
+                    best_score = score
+            node = children[best_rank]
+            state.apply(best_rank)
+            path.append(node)
+        return path
+
+    @staticmethod
+    def _backpropagate(path: List[_Node], points: List[int]):
+        for node in path:
+            node.visits += 1
+            node.reward += points[node.player] - points[1 - node.player]
+
+    def _find_root(self, view: PlayerView) -> _Node:
+        """Reuse the subtree for this position if an earlier search reached it."""
+        key = (view.kept, view.starter)
+        history = tuple(
+            (0 if player == view.player else 1, card_rank(card))
+            for player, card in view.played
+        )
+
+        node = None
+        old_history = self._root_history
+        if (
+            self._root is not None
+            and key == self._root_key
+            and history[: len(old_history)] == old_history
+        ):
+            node = self._root
+            for _, rank in history[len(old_history) :]:
+                node = node.children.get(rank)
+                if node is None:
+                    break
+
+        if node is None:
+            node = _Node(None)
+        self._root = node
+        self._root_key = key
+        self._root_history = history
+        return node
+
+    @staticmethod
+    def _opponent_pool(view: PlayerView) -> List[int]:
+        """Ids of the cards the opponent could still be holding.
+
+        Whenever the opponent passed (a go, or us playing twice in a row) they
+        had no card that fitted under 31, which rules out the low cards.
+        """
+        seen = {card_to_id(card) for card in view.kept + view.discards}
+        if view.starter is not None:
+            seen.add(card_to_id(view.starter))
+
+        lowest_pass = 32
+        count = 0
+        previous = None
+        for player, card in view.played:
+            if player != view.player:
+                seen.add(card_to_id(card))
+
+            value = CARD_VALUE[card_to_id(card)]
+            if count + value > 31:
+                # Neither player could play at this count
+                lowest_pass = min(lowest_pass, count)
+                count = 0
+                previous = None
+            elif previous == player == view.player:
+                lowest_pass = min(lowest_pass, count)
+
+            count += value
+            previous = player
+            if count == 31:
+                count = 0
+                previous = None
+        if view.sequence and previous == view.player:
+            lowest_pass = min(lowest_pass, view.count)
+
+        unseen = [card_id for card_id in range(NUM_CARDS) if card_id not in seen]
+        pool = [card_id for card_id in unseen if CARD_VALUE[card_id] > 31 - lowest_pass]
+        if len(pool) < view.opponent_cards_left:
+            pool = unseen
+        return pool
@@ -0,0 +1,263 @@
+# A small policy/value network (a multilayer perceptron) evaluated with NumPy
+# alone, so agents can use a trained model without a deep learning framework.
+# Positions are encoded with training_data.view_features, and a whole batch of
+# them goes through each layer as one matrix multiply.
+from cribbage.card_encoding import NUM_CARDS, card_to_id
+from cribbage.discard_analyzer import NUM_OPTIONS
+from cribbage.game_engine import PlayerView, card_value
+from cribbage.training_data import (
+    FEATURE_SCALE,
+    NUM_FEATURES,
+    VALUE_TARGETS,
+    view_features,
+)
+from collections import deque
+from itertools import combinations
+from typing import Deque, List, NamedTuple, Optional, Sequence, Tuple
+import os
+import time
+import numpy as np
+
+# Policy outputs: a card to play by card id, then a discard by its index in
+# itertools.combinations order of the 6 dealt cards sorted by card id
+PLAY_POLICY = slice(0, NUM_CARDS)
+DISCARD_POLICY = slice(NUM_CARDS, NUM_CARDS + NUM_OPTIONS)
+POLICY_SIZE = NUM_CARDS + NUM_OPTIONS
+
+DEFAULT_HIDDEN_SIZES = (256, 128)
+
+# Calls kept for the latency percentiles in InferenceStats
+STATS_WINDOW = 10000
+
+
+class InferenceStats(NamedTuple):
+    calls: int
+    positions: int
+    seconds: float
+    max_batch_size: int
+    # Per call, over the last STATS_WINDOW calls
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.positions / self.calls if self.calls else 0.0
+
+    @property
+    def positions_per_second(self) -> float:
+        return self.positions / self.seconds if self.seconds else 0.0
+
+
+def legal_mask(view: PlayerView) -> np.ndarray:
+    """The policy outputs a player may choose from, as a boolean mask."""
+    mask = np.zeros(POLICY_SIZE, dtype=bool)
+    if len(view.hand) == 6 and not view.kept:
+        mask[DISCARD_POLICY] = True
+        return mask
+    for card in view.hand:
+        if view.count + card_value(card) <= 31:
+            mask[PLAY_POLICY.start + card_to_id(card)] = True
+    return mask
+
+
+def discard_options(hand_ids: Sequence[int]) -> List[Tuple[int, int]]:
+    """The discards of 6 cards in the order of the DISCARD_POLICY outputs."""
+    return list(combinations(sorted(hand_ids), 2))
+
+
+def _check_layer(
+    name: str,
+    weights: np.ndarray,
+    biases: np.ndarray,
+    inputs: int,
+    outputs: Optional[int] = None,
+):
+    if weights.ndim != 2 or weights.shape[0] != inputs:
+        raise ValueError(f"{name} takes {weights.shape[:1]} inputs, not {inputs}")
+    if outputs is not None and weights.shape[1] != outputs:
+        raise ValueError(f"{name} has {weights.shape[1]} outputs, not {outputs}")
+    if biases.shape != weights.shape[1:]:
+        raise ValueError(f"{name} has {biases.shape} biases")
+
+
+class PolicyValueNetwork:
+    """ReLU hidden layers with a softmax policy head and a linear value head.
+
+    The value predicts the training_data target named by ``value_target``,
+    from the deciding player's side: by default the final point differential,
+    or the pegging point differential for the rest of the hand.
+    """
+
+    def __init__(
+        self,
+        hidden: Sequence[Tuple[np.ndarray, np.ndarray]],
+        policy: Tuple[np.ndarray, np.ndarray],
+        value: Tuple[np.ndarray, np.ndarray],
+        value_target: str = "point_differential",
+    ):
+        if value_target not in VALUE_TARGETS:
+            raise ValueError(
+                f"Unknown value target {value_target!r}, expected one of "
+                f"{VALUE_TARGETS}"
+            )
+        self.value_target = value_target
+        self.hidden = [
+            (np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32))
+            for w, b in hidden
+        ]
+        self.policy = tuple(np.asarray(a, dtype=np.float32) for a in policy)
+        self.value = tuple(np.asarray(a, dtype=np.float32) for a in value)
+
+        size = NUM_FEATURES
+        for number, (weights, biases) in enumerate(self.hidden):
+            _check_layer(f"Hidden layer {number}", weights, biases, size)
+            size = weights.shape[1]
+        _check_layer("The policy head", *self.policy, size, POLICY_SIZE)
+        _check_layer("The value head", *self.value, size, 1)
+
+        self._latencies: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self.reset_stats()
+
+    @classmethod
+    def random(
+        cls,
+        hidden_sizes: Sequence[int] = DEFAULT_HIDDEN_SIZES,
+        seed: Optional[int] = None,
+        value_target: str = "point_differential",
+    ) -> "PolicyValueNetwork":
+        """An untrained network with He initialised weights."""
+        rng = np.random.default_rng(seed)
+
+        def layer(inputs: int, outputs: int) -> Tuple[np.ndarray, np.ndarray]:
+            weights = rng.normal(0, np.sqrt(2 / inputs), (inputs, outputs))
+            return weights, np.zeros(outputs)
+
+        sizes = [NUM_FEATURES] + list(hidden_sizes)
+        hidden = [layer(inputs, outputs) for inputs, outputs in zip(sizes, sizes[1:])]
+        return cls(
+            hidden,
+            layer(sizes[-1], POLICY_SIZE),
+            layer(sizes[-1], 1),
+            value_target,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyValueNetwork":
+        """Load weights saved by save (or by a training script) from a .npz file.
+
+        The file holds hidden_weights_<i> and hidden_biases_<i> for each hidden
+        layer, then policy_weights, policy_biases, value_weights, value_biases,
+        and optionally value_target (point_differential when it is missing).
+        """
+        with np.load(path) as arrays:
+            hidden = []
+            while f"hidden_weights_{len(hidden)}" in arrays:
+                number = len(hidden)
+                hidden.append(
+                    (
+                        arrays[f"hidden_weights_{number}"],
+                        arrays[f"hidden_biases_{number}"],
+                    )
+                )
+            try:
+                policy = arrays["policy_weights"], arrays["policy_biases"]
+                value = arrays["value_weights"], arrays["value_biases"]
+            except KeyError as error:
+                raise ValueError(f"Not a network file, missing {error}: {path}")
+            value_target = (
+                str(arrays["value_target"])
+                if "value_target" in arrays
+                else "point_differential"
+            )
+        return cls(hidden, policy, value, value_target)
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        arrays = {}
+        for number, (weights, biases) in enumerate(self.hidden):
+            arrays[f"hidden_weights_{number}"] = weights
+            arrays[f"hidden_biases_{number}"] = biases
+        arrays["policy_weights"], arrays["policy_biases"] = self.policy
+        arrays["value_weights"], arrays["value_biases"] = self.value
+        arrays["value_target"] = np.array(self.value_target)
+
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_path, path)
+
+    def evaluate_batch(
+        self, features: np.ndarray, legal: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The (N, POLICY_SIZE) policy and (N,) value of N positions.
+
+        ``features`` are view_features rows, as uint8 or already scaled by
+        FEATURE_SCALE (as TrainingDataset batches are). With a ``legal`` mask,
+        e.g. stacked legal_mask rows, the policy is spread over legal outputs
+        only.
+        """
+        started = time.perf_counter()
+        features = np.asarray(features)
+        if features.ndim != 2 or features.shape[1] != NUM_FEATURES:
+            raise ValueError(f"Features must be (N, {NUM_FEATURES}): {features.shape}")
+        if features.dtype == np.uint8:
+            activations = features * FEATURE_SCALE
+        else:
+            activations = features.astype(np.float32, copy=False)
+
+        for weights, biases in self.hidden:
+            activations = activations @ weights
+            activations += biases
+            np.maximum(activations, 0, out=activations)
+
+        logits = activations @ self.policy[0]
+        logits += self.policy[1]
+        if legal is not None:
+            logits[~np.asarray(legal, dtype=bool)] = -np.inf
+        logits -= logits.max(axis=1, keepdims=True)
+        policy = np.exp(logits, out=logits)
+        policy /= policy.sum(axis=1, keepdims=True)
+
+        value = (activations @ self.value[0])[:, 0] + self.value[1][0]
+
+        self._record(len(features), time.perf_counter() - started)
+        return policy, value
+
+    def evaluate(self, view: PlayerView) -> Tuple[np.ndarray, float]:
+        """Policy (over legal outputs) and value of one position."""
+        policy, value = self.evaluate_batch(
+            view_features(view)[None], legal_mask(view)[None]
+        )
+        return policy[0], float(value[0])
+
+    def _record(self, batch_size: int, seconds: float):
+        self._calls += 1
+        self._positions += batch_size
+        self._seconds += seconds
+        self._max_batch_size = max(self._max_batch_size, batch_size)
+        self._latencies.append(seconds * 1000)
+
+    def stats(self) -> InferenceStats:
+        """Batch size and latency of the evaluate_batch calls since the last reset."""
+        percentiles = (
+            np.percentile(self._latencies, [50, 90, 99]).tolist()
+            if self._latencies
+            else [0.0, 0.0, 0.0]
+        )
+        return InferenceStats(
+            self._calls,
+            self._positions,
+            self._seconds,
+            self._max_batch_size,
+            *percentiles,
+        )
+
+    def reset_stats(self):
+        self._calls = 0
+        self._positions = 0
+        self._seconds = 0.0
+        self._max_batch_size = 0
+        self._latencies.clear()
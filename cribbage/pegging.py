@@ -0,0 +1,479 @@
+# Compact pegging position for search. Pegging only depends on ranks, so cards
+# are rank indices 0..12 and each hand is an int holding a 4 bit count per rank.
+# playout_batch plays many positions out at once with NumPy, for callers that
+# need playouts in bulk.
+from cribbage.card_encoding import CARD_RANK, NUM_RANKS, card_to_id
+from cribbage.cards import Card
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import random
+import numpy as np
+
+RANK_VALUES = tuple(min(rank + 1, 10) for rank in range(NUM_RANKS))
+
+# The low bit of every rank's count, and for each room left under 31 the low
+# bits of the ranks that fit
+_LOW_BITS = sum(1 << (4 * rank) for rank in range(NUM_RANKS))
+_PLAYABLE = tuple(
+    sum(1 << (4 * rank) for rank in range(NUM_RANKS) if RANK_VALUES[rank] <= room)
+    for room in range(32)
+)
+# The ranks whose low bits are set in a mask of playable ranks, ascending,
+# filled in as masks are met. Hands hold at most 4 distinct ranks, so only a
+# thousand or so masks ever occur.
+_MOVES: Dict[int, Tuple[int, ...]] = {}
+
+
+# Runs longer than 7 cards are worth more than 31
+_MAX_RUN = 7
+# Pads playout_batch's recent cards: no card has it, and it is never in a run
+_NO_RANK = 15
+_RANK_VALUES = np.array(RANK_VALUES, dtype=np.int64)
+_RANK_SHIFTS = 4 * np.arange(NUM_RANKS, dtype=np.int64)
+
+
+def _moves(playable: int) -> Tuple[int, ...]:
+    moves = []
+    bits = playable
+    while bits:
+        low_bit = bits & -bits
+        moves.append((low_bit.bit_length() - 1) >> 2)
+        bits ^= low_bit
+    _MOVES[playable] = moves = tuple(moves)
+    return moves
+
+
+def card_rank(card: Card) -> int:
+    return CARD_RANK[card_to_id(card)] - 1
+
+
+def pack_hand(ranks: Iterable[int]) -> int:
+    hand = 0
+    for rank in ranks:
+        hand += 1 << (4 * rank)
+    return hand
+
+
+def unpack_hand(hand: int) -> List[int]:
+    """Ranks in a packed hand, ascending, with repeats."""
+    ranks = []
+    for rank in range(NUM_RANKS):
+        ranks.extend([rank] * ((hand >> (4 * rank)) & 15))
+    return ranks
+
+
+def trailing_run(ranks: Sequence[int]) -> int:
+    """Length of the run made by the last cards played, or 0 if there is none.
+
+    Walks back from the last card only while the ranks stay distinct, keeping a
+    rank bitmask and the lowest and highest rank seen.
+    """
+    length = len(ranks)
+    if length < 3:
+        return 0
+
+    low = high = ranks[-1]
+    seen = 1 << low
+    size = 1
+    run = 0
+    for index in range(length - 2, -1, -1):
+        rank = ranks[index]
+        bit = 1 << rank
+        if seen & bit:
+            break
+        seen |= bit
+        size += 1
+        if rank < low:
+            low = rank
+        elif rank > high:
+            high = rank
+        if size >= 3 and high - low == size - 1:
+            run = size
+    return run
+
+
+class PeggingState:
+    """Position in the play for players 0 and 1, with apply and undo.
+
+    ``turn`` is always a player who can play: after every card the state scores
+    any go or last card and passes the turn on, so ``legal_moves`` is only empty
+    once the hand is over. ``streak`` is how many cards of the last rank were
+    played in a row. Equality and hashing ignore the points already scored, so
+    equal states have the same future.
+    """
+
+    __slots__ = (
+        "hands",
+        "count",
+        "sequence",
+        "streak",
+        "turn",
+        "last",
+        "scores",
+        "_history",
+    )
+
+    def __init__(
+        self,
+        hands: Sequence[Iterable[int]],
+        turn: int = 0,
+        count: int = 0,
+        sequence: Sequence[int] = (),
+        last: Optional[int] = None,
+        scores: Tuple[int, int] = (0, 0),
+    ):
+        if count and last not in (0, 1):
+            raise ValueError(f"A count of {count} needs the last player, not {last}")
+        self.hands = [pack_hand(hands[0]), pack_hand(hands[1])]
+        self.count = count
+        self.sequence = tuple(sequence)
+        self.streak = 0
+        for rank in reversed(self.sequence):
+            if rank != self.sequence[-1]:
+                break
+            self.streak += 1
+        self.turn = turn
+        self.last = last
+        self.scores = list(scores)
+        self._history: List[Tuple] = []
+        self._settle()
+
+    @classmethod
+    def from_cards(
+        cls,
+        hands: Sequence[Iterable[Card]],
+        turn: int = 0,
+        count: int = 0,
+        sequence: Sequence[Card] = (),
+        last: Optional[int] = None,
+    ) -> "PeggingState":
+        return cls(
+            [[card_rank(card) for card in hand] for hand in hands],
+            turn,
+            count,
+            [card_rank(card) for card in sequence],
+            last,
+        )
+
+    def copy(self) -> "PeggingState":
+        """A copy without the undo history."""
+        state = PeggingState.__new__(PeggingState)
+        state.hands = list(self.hands)
+        state.count = self.count
+        state.sequence = self.sequence
+        state.streak = self.streak
+        state.turn = self.turn
+        state.last = self.last
+        state.scores = list(self.scores)
+        state._history = []
+        return state
+
+    def key(self) -> Tuple:
+        return (
+            self.hands[0],
+            self.hands[1],
+            self.count,
+            self.sequence,
+            self.turn,
+            self.last,
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PeggingState) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return (
+            f"PeggingState({unpack_hand(self.hands[0])}, {unpack_hand(self.hands[1])}"
+            f", turn={self.turn}, count={self.count}, sequence={list(self.sequence)})"
+        )
+
+    def is_over(self) -> bool:
+        return not (self.hands[0] or self.hands[1])
+
+    def legal_moves(self) -> List[int]:
+        """Ranks the player to move can play, ascending."""
+        hand = self.hands[self.turn]
+        playable = (hand | hand >> 1 | hand >> 2) & _PLAYABLE[31 - self.count]
+        return list(_MOVES.get(playable) or _moves(playable))
+
+    def apply(self, rank: int) -> int:
+        """Play a card of this rank for the player to move.
+
+        Returns the points the card itself scored (fifteen, 31, pairs, runs).
+        Any go or last card that follows is added to ``scores`` as well.
+        """
+        turn = self.turn
+        sequence = self.sequence
+        self._history.append(
+            (
+                rank,
+                turn,
+                self.count,
+                sequence,
+                self.streak,
+                self.last,
+                self.scores[0],
+                self.scores[1],
+            )
+        )
+
+        self.hands[turn] -= 1 << (4 * rank)
+        count = self.count + RANK_VALUES[rank]
+        if sequence and sequence[-1] == rank:
+            self.streak += 1
+        else:
+            self.streak = 1
+        sequence += (rank,)
+
+        points = 2 if count == 15 or count == 31 else 0
+        if self.streak > 1:
+            points += self.streak * (self.streak - 1)
+        elif len(sequence) >= 3:
+            points += trailing_run(sequence)
+        self.scores[turn] += points
+
+        self.last = turn
+        self.turn = 1 - turn
+        if count == 31:
+            count = 0
+            sequence = ()
+            self.streak = 0
+        self.count = count
+        self.sequence = sequence
+        self._settle()
+        return points
+
+    def undo(self):
+        (
+            rank,
+            self.turn,
+            self.count,
+            self.sequence,
+            self.streak,
+            self.last,
+            self.scores[0],
+            self.scores[1],
+        ) = self._history.pop()
+        self.hands[self.turn] += 1 << (4 * rank)
+
+    def _settle(self):
+        """Score any go or last card and give the turn to a player who can play."""
+        hands = self.hands
+        while True:
+            if not (hands[0] or hands[1]):
+                if self.count:
+                    self.scores[self.last] += 1
+                    self.count = 0
+                    self.sequence = ()
+                    self.streak = 0
+                return
+
+            playable = _PLAYABLE[31 - self.count]
+            hand = hands[self.turn]
+            if (hand | hand >> 1 | hand >> 2) & playable:
+                return
+            hand = hands[1 - self.turn]
+            if (hand | hand >> 1 | hand >> 2) & playable:
+                self.turn = 1 - self.turn
+                return
+
+            # Neither player can play: a go to the last player and a new count
+            self.scores[self.last] += 1
+            self.count = 0
+            self.sequence = ()
+            self.streak = 0
+            self.turn = 1 - self.last
+
+    def playout(self, rng: random.Random) -> Tuple[int, int]:
+        """Play the rest of the hand at random, without undo history.
+
+        Returns the final scores. The moves and points are those of apply and
+        _settle, inlined on local variables as this is the hot loop of
+        searches and of building pegging tables.
+        """
+        hands = self.hands
+        count = self.count
+        sequence = self.sequence
+        streak = self.streak
+        turn = self.turn
+        last = self.last
+        scores = self.scores
+        uniform = rng.random
+        moves_for = _MOVES
+        playable_under = _PLAYABLE
+        values = RANK_VALUES
+
+        while hands[0] or hands[1]:
+            # _settle left the turn with a player who can play
+            hand = hands[turn]
+            playable = (hand | hand >> 1 | hand >> 2) & playable_under[31 - count]
+            moves = moves_for.get(playable) or _moves(playable)
+            rank = moves[int(uniform() * len(moves))]
+
+            hands[turn] = hand - (1 << (4 * rank))
+            count += values[rank]
+            if sequence and sequence[-1] == rank:
+                streak += 1
+            else:
+                streak = 1
+            sequence += (rank,)
+
+            points = 2 if count == 15 or count == 31 else 0
+            if streak > 1:
+                points += streak * (streak - 1)
+            elif len(sequence) >= 3:
+                points += trailing_run(sequence)
+            scores[turn] += points
+
+            last = turn
+            turn = 1 - turn
+            if count == 31:
+                count = 0
+                sequence = ()
+                streak = 0
+
+            while True:
+                if not (hands[0] or hands[1]):
+                    if count:
+                        scores[last] += 1
+                        count = 0
+                        sequence = ()
+                        streak = 0
+                    break
+                room = playable_under[31 - count]
+                hand = hands[turn]
+                if (hand | hand >> 1 | hand >> 2) & room:
+                    break
+                hand = hands[1 - turn]
+                if (hand | hand >> 1 | hand >> 2) & room:
+                    turn = 1 - turn
+                    break
+                # Neither player can play: a go to the last player
+                scores[last] += 1
+                count = 0
+                sequence = ()
+                streak = 0
+                turn = 1 - last
+
+        self.count = count
+        self.sequence = sequence
+        self.streak = streak
+        self.turn = turn
+        self.last = last
+        return scores[0], scores[1]
+
+
+def playout_batch(
+    states: Sequence[PeggingState], rng: np.random.Generator
+) -> np.ndarray:
+    """Play the rest of many hands at random at once, as playout does.
+
+    Every position plays one card per step, with the moves and points of
+    PeggingState.apply and _settle computed with NumPy over all of them. The
+    random numbers come from ``rng``, so the games differ from playout's for
+    the same seed. The states are left as they were. Returns an (N, 2) array
+    of the final scores.
+    """
+    size = len(states)
+    rows = np.arange(size)
+    packed = np.array([state.hands for state in states], dtype=np.int64)
+    held = ((packed.reshape(size, 2, 1) >> _RANK_SHIFTS) & 15).astype(np.int8)
+    count = np.array([state.count for state in states], dtype=np.int64)
+    turn = np.array([state.turn for state in states], dtype=np.int64)
+    # Only read once a card has been played, which sets it
+    last = np.array([state.last or 0 for state in states], dtype=np.int64)
+    streak = np.array([state.streak for state in states], dtype=np.int64)
+    scores = np.array([state.scores for state in states], dtype=np.int64)
+    scores = scores.reshape(size, 2)
+    # The last cards of the count, newest first, padded with a rank no card has
+    recent = np.full((size, _MAX_RUN), _NO_RANK, dtype=np.int64)
+    for row, state in enumerate(states):
+        cards = state.sequence[::-1][:_MAX_RUN]
+        recent[row, : len(cards)] = cards
+
+    left = held.sum(axis=(1, 2), dtype=np.int64)
+    while True:
+        playing = left > 0
+        if not playing.any():
+            return scores
+
+        # _settle left the turn with a player who can play
+        hand = np.where(turn[:, None] == 0, held[:, 0], held[:, 1])
+        playable = (hand > 0) & (_RANK_VALUES <= 31 - count[:, None])
+        choice = (rng.random(size) * playable.sum(axis=1)).astype(np.int64)
+        rank = (playable.cumsum(axis=1) > choice[:, None]).argmax(axis=1)
+        held[rows, turn, rank] -= playing
+        left -= playing
+
+        count += np.where(playing, _RANK_VALUES[rank], 0)
+        streak = np.where(
+            playing, np.where(recent[:, 0] == rank, streak + 1, 1), streak
+        )
+        recent = np.where(
+            playing[:, None],
+            np.concatenate([rank[:, None], recent[:, :-1]], axis=1),
+            recent,
+        )
+
+        points = 2 * ((count == 15) | (count == 31)) + streak * (streak - 1)
+        points += np.where(streak == 1, _trailing_run_batch(recent), 0)
+        scores[rows, turn] += np.where(playing, points, 0)
+
+        last = np.where(playing, turn, last)
+        turn = np.where(playing, 1 - turn, turn)
+        _reset_count(count == 31, count, streak, recent)
+        _settle_batch(held, left, count, turn, last, streak, recent, scores)
+
+
+def _trailing_run_batch(recent: np.ndarray) -> np.ndarray:
+    """trailing_run of each row of newest first ranks, from rank bitmasks.
+
+    The last n cards are a run when they are distinct and their ranks are n
+    bits in a row.
+    """
+    mask = np.zeros(len(recent), dtype=np.int64)
+    distinct = np.ones(len(recent), dtype=bool)
+    run = np.zeros(len(recent), dtype=np.int64)
+    for cards in range(1, _MAX_RUN + 1):
+        bit = np.left_shift(1, recent[:, cards - 1])
+        distinct &= (mask & bit) == 0
+        mask |= bit
+        if cards >= 3:
+            low_bit = mask & -mask
+            in_run = distinct & (mask == low_bit * ((1 << cards) - 1))
+            run = np.where(in_run, cards, run)
+    return run
+
+
+def _reset_count(reset, count, streak, recent):
+    count[reset] = 0
+    streak[reset] = 0
+    recent[reset] = _NO_RANK
+
+
+def _settle_batch(held, left, count, turn, last, streak, recent, scores):
+    """PeggingState._settle for every row of playout_batch's arrays."""
+    rows = np.arange(len(left))
+    # The last card played
+    finished = (left == 0) & (count > 0)
+    scores[rows[finished], last[finished]] += 1
+    _reset_count(finished, count, streak, recent)
+
+    while True:
+        can_play = ((held > 0) & (_RANK_VALUES <= 31 - count[:, None, None])).any(
+            axis=2
+        )
+        mover_can = can_play[rows, turn]
+        other_can = can_play[rows, 1 - turn]
+        playing = left > 0
+        turn[playing & ~mover_can & other_can] ^= 1
+
+        # Neither player can play: a go to the last player and a new count
+        go = playing & ~mover_can & ~other_can
+        if not go.any():
+            return
+        scores[rows[go], last[go]] += 1
+        _reset_count(go, count, streak, recent)
+        turn[go] = 1 - last[go]
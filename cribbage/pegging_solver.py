@@ -0,0 +1,88 @@
+# Exact minimax for pegging when both hands are known, memoized on a canonical
+# position key. Used as ground truth for pegging agents and as a leaf evaluator
+# for determinized search.
+from cribbage.pegging import PeggingState
+from typing import Dict, Tuple
+
+
+def canonical_key(state: PeggingState) -> Tuple:
+    """Key on everything that can still change the points scored.
+
+    A future run can only reach back over the trailing cards of distinct rank,
+    so the sequence is cut at the latest repeat; the pair streak is kept
+    separately. Who played last only matters while the count is running.
+    """
+    sequence = state.sequence
+    seen = 0
+    start = len(sequence)
+    while start > 0:
+        bit = 1 << sequence[start - 1]
+        if seen & bit:
+            break
+        seen |= bit
+        start -= 1
+    return (
+        state.hands[0],
+        state.hands[1],
+        state.count,
+        sequence[start:],
+        state.streak,
+        state.turn,
+        state.last if state.count else None,
+    )
+
+
+class PeggingSolver:
+    """Minimax pegging values with a transposition table.
+
+    ``solve`` returns the point differential the player to move can guarantee
+    for the rest of the hand, counting their points minus the opponent's.
+    """
+
+    def __init__(self):
+        self.table: Dict[Tuple, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, state: PeggingState) -> int:
+        return self._solve(state.copy())
+
+    def move_values(self, state: PeggingState) -> Dict[int, int]:
+        """Value of each legal rank for the player to move."""
+        state = state.copy()
+        return {rank: self._move_value(state, rank) for rank in state.legal_moves()}
+
+    def best_move(self, state: PeggingState) -> int:
+        values = self.move_values(state)
+        return max(values, key=values.get)
+
+    def _move_value(self, state: PeggingState, rank: int) -> int:
+        player = state.turn
+        mine, theirs = state.scores[player], state.scores[1 - player]
+        state.apply(rank)
+        value = (state.scores[player] - mine) - (state.scores[1 - player] - theirs)
+        if not state.is_over():
+            future = self._solve(state)
+            value += future if state.turn == player else -future
+        state.undo()
+        return value
+
+    def _solve(self, state: PeggingState) -> int:
+        if state.is_over():
+            return 0
+
+        key = canonical_key(state)
+        value = self.table.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = max(self._move_value(state, rank) for rank in state.legal_moves())
+        self.table[key] = value
+        return value
@@ -0,0 +1,147 @@
+# Pegging potential of every kept 4 card hand: the expected pegging point
+# differential against a random opponent hand, as dealer and as pone. Pegging
+# only depends on ranks, so there are just 1,820 hands to cover.
+from cribbage.pegging import PeggingState, pack_hand, playout_batch
+from cribbage.pegging_solver import PeggingSolver
+from cribbage.table_file import MappedTable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Tuple
+import mmap
+import os
+import random
+import struct
+import numpy as np
+
+# How the sampled deals are played out:
+#   "playout" - both players play at random. Cheap enough for many samples,
+#               and it played better than "solver" against HeuristicAgent
+#   "solver"  - both players play perfectly, seeing each other's cards
+#               (PeggingSolver); about 5ms per deal
+METHODS = ("playout", "solver")
+
+# Every sorted 4 rank hand, with rank 0 for aces
+HANDS: List[Tuple[int, ...]] = list(combinations_with_replacement(range(13), 4))
+NUM_HANDS = len(HANDS)
+_HAND_INDEX = {pack_hand(hand): index for index, hand in enumerate(HANDS)}
+
+DEFAULT_SAMPLES = 1024
+# Hands per task sent to a worker
+CHUNK_SIZE = 20
+
+
+def hand_index(ranks: Iterable[int]) -> int:
+    return _HAND_INDEX[pack_hand(ranks)]
+
+
+def _hand_values(hand: Sequence[int], samples: int, method: str, seed: int):
+    """Mean pegging differential of a hand as dealer and as pone."""
+    rng = random.Random(f"{seed}/{hand}")
+    deck = [rank for rank in range(13) for _ in range(4)]
+    for rank in hand:
+        deck.remove(rank)
+    opponents = [rng.sample(deck, 4) for _ in range(samples)]
+    # The pone leads, so the hand is player 1 as dealer and player 0 as pone
+    dealer = [PeggingState([opponent, hand]) for opponent in opponents]
+    pone = [PeggingState([hand, opponent]) for opponent in opponents]
+
+    if method == "solver":
+        solver = PeggingSolver()
+        return (
+            -sum(solver.solve(state) for state in dealer) / samples,
+            sum(solver.solve(state) for state in pone) / samples,
+        )
+
+    scores = playout_batch(dealer + pone, np.random.default_rng(rng.getrandbits(64)))
+    differentials = scores[:, 0] - scores[:, 1]
+    return (
+        -differentials[:samples].mean(),
+        differentials[samples:].mean(),
+    )
+
+
+def _build_chunk(chunk: Tuple[Sequence[int], int, str, int]) -> np.ndarray:
+    indices, samples, method, seed = chunk
+    return np.array(
+        [_hand_values(HANDS[index], samples, method, seed) for index in indices]
+    ).T.reshape(2, len(indices))
+
+
+class PeggingTable(MappedTable):
+    """Expected pegging differential of each kept hand, for the dealer and pone.
+
+    Row 0 is for the dealer and row 1 for the pone, as in CribEVTable. Values
+    come from ``samples`` random opponent hands per kept hand, drawn from the
+    48 cards the hand leaves, and played out with ``method`` (see METHODS).
+    ``default()`` is None until ``cribbage build-pegging-table`` has been run.
+    """
+
+    FILE_NAME = "pegging_table.bin"
+    MAGIC = b"CRIBPG01"
+    HEADER = struct.Struct("<8sII")
+    DESCRIPTION = "pegging table"
+
+    def __init__(
+        self, values: np.ndarray, samples: int, source: Optional[mmap.mmap] = None
+    ):
+        if values.shape != (2, NUM_HANDS):
+            raise ValueError(
+                f"Expected a table of shape (2, {NUM_HANDS}), got {values.shape}"
+            )
+        self.values = values
+        self.samples = samples
+        self._source = source
+
+    @classmethod
+    def build(
+        cls,
+        samples: int = DEFAULT_SAMPLES,
+        method: str = "playout",
+        workers: Optional[int] = None,
+        seed: int = 0,
+    ) -> "PeggingTable":
+        """Compute the table; the defaults take a few minutes of CPU time."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+
+        chunks = [
+            (range(start, min(start + CHUNK_SIZE, NUM_HANDS)), samples, method, seed)
+            for start in range(0, NUM_HANDS, CHUNK_SIZE)
+        ]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            parts = list(map(_build_chunk, chunks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = list(executor.map(_build_chunk, chunks))
+        return cls(np.concatenate(parts, axis=1), samples)
+
+    def _header_fields(self) -> Sequence[int]:
+        return (NUM_HANDS, self.samples)
+
+    def _write_data(self, file: BinaryIO):
+        file.write(self.values.astype("<f8").tobytes())
+
+    @classmethod
+    def _data_size(cls, size: int, samples: int) -> Optional[int]:
+        return 2 * NUM_HANDS * 8 if size == NUM_HANDS else None
+
+    @classmethod
+    def _from_source(
+        cls, source: mmap.mmap, offset: int, size: int, samples: int
+    ) -> "PeggingTable":
+        values = np.frombuffer(
+            source, dtype="<f8", count=2 * NUM_HANDS, offset=offset
+        ).reshape(2, NUM_HANDS)
+        return cls(values, samples, source)
+
+    def _release(self):
+        self.values = None
+
+    def value(self, ranks: Iterable[int], dealer: bool) -> float:
+        """Expected pegging differential of 4 kept ranks (0 for aces)."""
+        return self.packed_value(pack_hand(ranks), dealer)
+
+    def packed_value(self, hand: int, dealer: bool) -> float:
+        """``value`` of 4 ranks already packed with pegging.pack_hand."""
+        return float(self.values[0 if dealer else 1, _HAND_INDEX[hand]])
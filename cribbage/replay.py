@@ -0,0 +1,133 @@
+# Rebuilds the engine state of a recorded game at any point from its events,
+# without the agents or the random draws. Encoded games carry a snapshot of the
+# state at the start of every round, so at most one round of events is replayed.
+# The terminal CribbageGame (cribbage_claude.ai.py) keeps no game state of its
+# own beyond the GameEngine it draws, so the engine is what gets rebuilt.
+from cribbage.cards import Card, Deck
+from cribbage.game_engine import (
+    CUT_FOR_DEAL,
+    DEAL,
+    DISCARD,
+    GAME_OVER,
+    PLAY,
+    RESET,
+    ROUND_END,
+    SCORE,
+    STARTER,
+    Agent,
+    GameEngine,
+    GameEvent,
+    PlayerView,
+)
+from cribbage.game_log import GameRecord, decode_events, read_header
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Union
+
+
+class ReplayAgent(Agent):
+    """Stands in for a player whose decisions are read from a record."""
+
+    def select_discards(self, view: PlayerView) -> List[Card]:
+        raise RuntimeError("A replayed player makes no decisions")
+
+    def select_play(self, view: PlayerView, playable: List[Card]) -> Card:
+        raise RuntimeError("A replayed player makes no decisions")
+
+
+def apply_event(engine: GameEngine, event: GameEvent):
+    """Change the engine's state the way the engine did when it emitted the event."""
+    kind = event.kind
+    player = event.player
+
+    if kind == CUT_FOR_DEAL:
+        first, second = (Deck.RANKS.index(card.rank) for card in event.cards)
+        if first != second:
+            engine.dealer = 0 if first < second else 1
+    elif kind == DEAL:
+        # The pone is dealt to first, which starts a round
+        if player != engine.dealer:
+            engine._reset_round()
+            engine.round_number += 1
+            engine.dealer = 1 - player
+        engine.hands[player] = list(event.cards)
+    elif kind == DISCARD:
+        discards = list(event.cards)
+        engine.discards[player] = discards
+        engine.crib.extend(discards)
+        engine.kept[player] = [
+            card for card in engine.hands[player] if card not in discards
+        ]
+        engine.hands[player] = list(engine.kept[player])
+    elif kind == STARTER:
+        engine.starter = event.cards[0]
+    elif kind == PLAY:
+        card = event.cards[0]
+        engine.hands[player].remove(card)
+        engine.count = event.count
+        engine.sequence.append(card)
+        engine.played.append((player, card))
+    elif kind == RESET:
+        engine.count = 0
+        engine.sequence = []
+    elif kind == SCORE:
+        engine.scores[player] = event.total
+        if event.total >= engine.target_score:
+            engine.winner = player
+    elif kind == ROUND_END:
+        engine.dealer = 1 - engine.dealer
+    elif kind == GAME_OVER:
+        engine.winner = player
+
+
+def replay_events(
+    events: Iterable[GameEvent],
+    target_score: int,
+    agents: Optional[Sequence[Agent]] = None,
+) -> GameEngine:
+    """A GameEngine in the state left by these events, from the start of a game."""
+    engine = GameEngine(agents or [ReplayAgent(), ReplayAgent()], target_score)
+    for event in events:
+        apply_event(engine, event)
+    return engine
+
+
+def replay(
+    game: Union[bytes, GameRecord],
+    index: int,
+    agents: Optional[Sequence[Agent]] = None,
+) -> GameEngine:
+    """The engine state just before event ``index`` of a recorded game.
+
+    ``game`` is an encoded game (e.g. from GameLog.payload) or a GameRecord.
+    An index of len(events) gives the final state. engine.view(player) is what
+    the player saw if event ``index`` is their decision, and ``agents`` (by
+    default ones that decide nothing) can be asked to decide it again. The
+    order of the undealt cards is not recorded, so ``deck`` is None.
+    """
+    if isinstance(game, GameRecord):
+        if not 0 <= index <= len(game.events):
+            raise IndexError(f"Event {index} is outside the game")
+        return replay_events(game.events[:index], game.target_score, agents)
+
+    if index < 0:
+        raise IndexError(f"Event {index} is outside the game")
+    header = read_header(game)
+    engine = GameEngine(agents or [ReplayAgent(), ReplayAgent()], header.target_score)
+    position, replayed = header.events_start, 0
+    # The state before a round's DEAL still holds the previous round's cards,
+    # so a snapshot only helps for the events after it
+    for snapshot in header.snapshots:
+        if snapshot.event_index >= index:
+            break
+        engine.scores = list(snapshot.scores)
+        engine.dealer = snapshot.dealer
+        engine.round_number = snapshot.round_number - 1
+        position, replayed = snapshot.position, snapshot.event_index
+
+    events = decode_events(game, position, tuple(engine.scores))
+    for event in islice(events, index - replayed):
+        apply_event(engine, event)
+        replayed += 1
+    if replayed != index:
+        raise IndexError(f"Event {index} is outside the game")
+    return engine
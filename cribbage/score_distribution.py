@@ -0,0 +1,131 @@
+# Full probability distributions of hand and crib scores, not just their means.
+# Every cut (and for a crib, every pair the opponent can throw) is enumerated
+# exactly and scored in one batch with the table scorer. Sets of cards that only
+# differ by suits share a cache entry.
+from cribbage.card_encoding import NUM_CARDS
+from cribbage.lru_cache import CacheInfo, LRUCache
+from cribbage.scoring import get_backend
+from cribbage.suit_isomorphism import canonical_suits, relabel
+from typing import Sequence, Tuple
+import numpy as np
+
+# Scores run from 0 to 29, so a distribution has 30 entries
+NUM_SCORES = 30
+
+DEFAULT_CACHE_SIZE = 1 << 14
+
+_SCORES = np.arange(NUM_SCORES)
+
+
+def _key(
+    cards: Sequence[int], seen: Sequence[int]
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Both sets relabelled by the suits of their union, so that most sets
+    which only differ by suits give the same key."""
+    _, suit_map = canonical_suits(list(cards) + list(seen))
+    return (
+        tuple(sorted(relabel(card_id, suit_map) for card_id in cards)),
+        tuple(sorted(relabel(card_id, suit_map) for card_id in seen)),
+    )
+
+
+def _unseen(cards: Sequence[int], seen: Sequence[int]) -> np.ndarray:
+    known = set(cards) | set(seen)
+    if len(known) != len(cards) + len(seen):
+        raise ValueError(f"Cards are repeated: {list(cards)} and {list(seen)}")
+    return np.array(
+        [card_id for card_id in range(NUM_CARDS) if card_id not in known],
+        dtype=np.int64,
+    )
+
+
+def expected_score(distribution: Sequence[float]) -> float:
+    return float(np.dot(distribution, _SCORES[: len(distribution)]))
+
+
+def score_variance(distribution: Sequence[float]) -> float:
+    scores = _SCORES[: len(distribution)]
+    mean = np.dot(distribution, scores)
+    return float(np.dot(distribution, (scores - mean) ** 2))
+
+
+def probability_at_least(distribution: Sequence[float], points: int) -> float:
+    """Chance of scoring ``points`` or more."""
+    return float(np.sum(distribution[max(points, 0) :]))
+
+
+class ScoreDistribution:
+    """Exact score distributions of kept hands and of cribs, by card ids."""
+
+    _hand_cache = LRUCache(DEFAULT_CACHE_SIZE)
+    _crib_cache = LRUCache(DEFAULT_CACHE_SIZE)
+
+    @classmethod
+    def hand(
+        cls, hand_ids: Sequence[int], seen_ids: Sequence[int] = (), crib: bool = False
+    ) -> np.ndarray:
+        """Chance of each score of a 4 card hand over every cut.
+
+        The cut is any card that is not in the hand or ``seen_ids``, e.g. the
+        two discards of a 6 card deal, leaving 46 cuts.
+        """
+        if len(hand_ids) != 4:
+            raise ValueError(f"A hand has 4 cards, not {len(hand_ids)}")
+        key = _key(hand_ids, seen_ids) + (crib,)
+        return cls._hand_cache.get_or_compute(
+            key, lambda: cls._hand(key[0], key[1], crib)
+        )
+
+    @staticmethod
+    def _hand(hand_ids: Sequence[int], seen_ids: Sequence[int], crib: bool):
+        cuts = _unseen(hand_ids, seen_ids)
+        scores = get_backend("table").score_batch(
+            np.tile(hand_ids, (len(cuts), 1)), cuts, crib
+        )
+        distribution = np.bincount(scores, minlength=NUM_SCORES) / len(cuts)
+        distribution.flags.writeable = False
+        return distribution
+
+    @classmethod
+    def crib(
+        cls, discard_ids: Sequence[int], seen_ids: Sequence[int] = ()
+    ) -> np.ndarray:
+        """Chance of each score of a crib holding these 2 discards.
+
+        The opponent throws any 2 of the cards not in ``discard_ids`` or
+        ``seen_ids`` (usually the 4 kept cards), all equally likely, and the
+        cut is any card left. With 46 unseen cards that is 45,540 cribs.
+        """
+        if len(discard_ids) != 2:
+            raise ValueError(f"A discard has 2 cards, not {len(discard_ids)}")
+        key = _key(discard_ids, seen_ids)
+        return cls._crib_cache.get_or_compute(key, lambda: cls._crib(*key))
+
+    @staticmethod
+    def _crib(discard_ids: Sequence[int], seen_ids: Sequence[int]):
+        unseen = _unseen(discard_ids, seen_ids)
+        first, second = np.triu_indices(len(unseen), 1)
+        # Every opponent pair with every unseen card as the cut, then the cuts
+        # that are one of the pair are dropped
+        pairs = np.repeat(
+            np.stack([unseen[first], unseen[second]], axis=1), len(unseen), 0
+        )
+        cuts = np.tile(unseen, len(first))
+        valid = (cuts != pairs[:, 0]) & (cuts != pairs[:, 1])
+        hands = np.concatenate(
+            [np.tile(discard_ids, (int(valid.sum()), 1)), pairs[valid]], axis=1
+        )
+        scores = get_backend("table").score_batch(hands, cuts[valid], crib=True)
+        distribution = np.bincount(scores, minlength=NUM_SCORES) / len(scores)
+        distribution.flags.writeable = False
+        return distribution
+
+    @classmethod
+    def cache_info(cls) -> Tuple[CacheInfo, CacheInfo]:
+        """Hit, miss and eviction counts of the hand and the crib caches."""
+        return cls._hand_cache.info(), cls._crib_cache.info()
+
+    @classmethod
+    def clear_cache(cls):
+        cls._hand_cache.clear()
+        cls._crib_cache.clear()
@@ -0,0 +1,132 @@
+# One entry point for scoring a hand with the cut, over interchangeable backends.
+# Every backend must agree with the reference HandScorer; see scoring_test.py.
+from cribbage.hand import Hand
+from cribbage.cards import Card
+from cribbage.hand_scorer import HandScorer
+from cribbage.table_hand_scorer import CARD_KEYS, TableHandScorer
+from cribbage.card_encoding import card_to_id, id_to_card, ids_to_cards
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+DEFAULT_BACKEND = "table"
+
+
+class ScoringBackend(ABC):
+    """Scores 4 card hands given as card ids (see cribbage.card_encoding)."""
+
+    name = ""
+
+    @abstractmethod
+    def score_ids(
+        self, hand_ids: Sequence[int], cut_id: int, crib: bool = False
+    ) -> int:
+        """Score one hand of 4 card ids with the cut's id."""
+
+    def score_batch(
+        self, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        """Score (N, 4) hands with (N,) cuts. Backends override this to go faster."""
+        hands, cuts = HandScorer.batch_arrays(hands, cuts)
+        return np.array(
+            [self.score_ids(hand, cut, crib) for hand, cut in zip(hands, cuts)],
+            dtype=np.int64,
+        )
+
+
+class ReferenceBackend(ScoringBackend):
+    """HandScorer.score_hand, the rules as written."""
+
+    name = "reference"
+
+    def score_ids(
+        self, hand_ids: Sequence[int], cut_id: int, crib: bool = False
+    ) -> int:
+        return HandScorer.score_hand(
+            Hand(ids_to_cards(hand_ids)), id_to_card(cut_id), crib
+        )
+
+
+class TableBackend(ScoringBackend):
+    """TableHandScorer lookups, vectorized with NumPy for batches."""
+
+    name = "table"
+
+    def __init__(self, scorer: Optional[TableHandScorer] = None):
+        self._scorer = scorer
+
+    @property
+    def scorer(self) -> TableHandScorer:
+        # The default is looked up every time, as it can be closed and reloaded
+        return self._scorer or TableHandScorer.default()
+
+    def score_ids(
+        self, hand_ids: Sequence[int], cut_id: int, crib: bool = False
+    ) -> int:
+        return self.scorer.score_ids(hand_ids, cut_id, crib)
+
+    def score_batch(
+        self, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        hands, cuts = HandScorer.batch_arrays(hands, cuts)
+        card_keys = np.array(CARD_KEYS, dtype=np.int64)
+        keys = card_keys[hands].sum(axis=1) + card_keys[cuts]
+        table = np.frombuffer(self.scorer.table, dtype=np.uint8)
+        return table[keys].astype(np.int64) + HandScorer.score_batch_suits(
+            hands, cuts, crib
+        )
+
+
+class NumpyBackend(ScoringBackend):
+    """HandScorer.score_batch; only worth it for large batches."""
+
+    name = "numpy"
+
+    def score_ids(
+        self, hand_ids: Sequence[int], cut_id: int, crib: bool = False
+    ) -> int:
+        return int(HandScorer.score_batch([hand_ids], [cut_id], crib)[0])
+
+    def score_batch(
+        self, hands: np.ndarray, cuts: np.ndarray, crib: bool = False
+    ) -> np.ndarray:
+        return HandScorer.score_batch(hands, cuts, crib).astype(np.int64)
+
+
+BACKENDS = {
+    backend.name: backend for backend in (ReferenceBackend, TableBackend, NumpyBackend)
+}
+
+_instances: Dict[str, ScoringBackend] = {}
+_default_name = DEFAULT_BACKEND
+
+
+def get_backend(name: Optional[str] = None) -> ScoringBackend:
+    """The shared instance of a backend, or of the default one."""
+    name = name or _default_name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {name}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def set_default_backend(name: str):
+    global _default_name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {name}")
+    _default_name = name
+
+
+def score_hand(
+    hand: Hand, cut_card: Card, crib: bool = False, backend: Optional[str] = None
+) -> int:
+    """Score a hand with the given backend, or the default one.
+
+    Hands that are not 4 cards are scored by the reference HandScorer.
+    """
+    if len(hand.cards) != 4:
+        return HandScorer.score_hand(hand, cut_card, crib)
+    return get_backend(backend).score_ids(
+        [card_to_id(card) for card in hand.cards], card_to_id(cut_card), crib
+    )
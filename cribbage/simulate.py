@@ -0,0 +1,225 @@
+# Self-play between two agents over many games, spread across processes. Every
+# game draws its randomness from a generator seeded with (seed, game_index), so
+# any single game can be replayed exactly with play_game.
+from cribbage.agents import (
+    HeuristicAgent,
+    PeggingAwareAgent,
+    RandomAgent,
+    WinProbabilityAgent,
+)
+from cribbage.game_engine import SCORE, SHOW, WINNING_SCORE, GameEngine
+from cribbage.game_log import GameLogWriter, GameRecorder, encode_game
+from cribbage.mcts import ISMCTSAgent
+from cribbage.win_probability import RoundStats
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import math
+import os
+import random
+import time
+
+# Agent constructors by name. Each is called with a seeded random.Random.
+AGENTS: Dict[str, Callable[..., object]] = {
+    "random": lambda rng: RandomAgent(rng),
+    "heuristic": lambda rng: HeuristicAgent(rng=rng),
+    "ismcts": lambda rng: ISMCTSAgent(rng=rng),
+    "pegging": lambda rng: PeggingAwareAgent(rng=rng),
+    "win": lambda rng: WinProbabilityAgent(rng=rng),
+}
+
+# Games per task sent to a worker; large enough to hide the pickling overhead
+CHUNK_SIZE = 50
+# Rounds per task in round_stats
+ROUND_CHUNK_SIZE = 500
+
+# Target score for rounds played on their own, which nobody can reach
+_UNREACHABLE_SCORE = 1 << 30
+
+
+def game_rng(seed: int, game_index: int) -> random.Random:
+    return random.Random(f"{seed}/{game_index}")
+
+
+def wilson_interval(
+    successes: int, trials: int, z: float = 1.96
+) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+
+    proportion = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (proportion + z * z / (2 * trials)) / denominator
+    spread = (
+        z
+        * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials**2))
+        / denominator
+    )
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+class SimulationResult(NamedTuple):
+    agents: Tuple[str, str]
+    games: int
+    wins: Tuple[int, int]
+    seconds: float
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds else float("inf")
+
+    def win_rate(self, player: int) -> float:
+        return self.wins[player] / self.games if self.games else 0.0
+
+    def confidence_interval(self, player: int, z: float = 1.96) -> Tuple[float, float]:
+        return wilson_interval(self.wins[player], self.games, z)
+
+
+def play_game(
+    agent_names: Sequence[str],
+    seed: int,
+    game_index: int,
+    target_score: int = WINNING_SCORE,
+    subscriber: Optional[Callable] = None,
+) -> int:
+    """Play (or replay) one game of a simulation and return the winner."""
+    rng = game_rng(seed, game_index)
+    agents = [AGENTS[name](random.Random(rng.getrandbits(64))) for name in agent_names]
+    engine = GameEngine(agents, target_score, rng=rng)
+    if subscriber:
+        engine.subscribe(subscriber)
+    return engine.play_game()
+
+
+def _play_games(
+    chunk: Tuple[Tuple[str, str], int, int, int, int, bool],
+) -> Tuple[List[int], List[bytes]]:
+    """Wins of a range of games and, when recording, their encoded game logs."""
+    agent_names, seed, start, stop, target_score, record = chunk
+    wins = [0, 0]
+    games = []
+    for game_index in range(start, stop):
+        recorder = GameRecorder() if record else None
+        wins[play_game(agent_names, seed, game_index, target_score, recorder)] += 1
+        if record:
+            games.append(encode_game(recorder.record(game_index, target_score)))
+    return wins, games
+
+
+def simulate(
+    agent_names: Sequence[str],
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    target_score: int = WINNING_SCORE,
+    chunk_size: int = CHUNK_SIZE,
+    record_path: Optional[str] = None,
+) -> SimulationResult:
+    """Play games between two named agents, the first in seat 0.
+
+    The result only depends on the seed, never on the number of workers. With
+    ``record_path`` every game is written to a game log (see game_log), in
+    game index order, as the chunks finish.
+    """
+    agent_names = tuple(agent_names)
+    if len(agent_names) != 2:
+        raise ValueError("A simulation needs exactly 2 agents")
+    for name in agent_names:
+        if name not in AGENTS:
+            raise ValueError(f"Unknown agent: {name}")
+
+    workers = workers or os.cpu_count() or 1
+    record = record_path is not None
+    chunks = [
+        (agent_names, seed, start, min(start + chunk_size, games), target_score, record)
+        for start in range(0, games, chunk_size)
+    ]
+
+    started = time.perf_counter()
+    wins = [0, 0]
+    writer = GameLogWriter(record_path) if record else None
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor:
+            results = executor.map(_play_games, chunks)
+        else:
+            results = map(_play_games, chunks)
+        for chunk_wins, encoded_games in results:
+            wins[0] += chunk_wins[0]
+            wins[1] += chunk_wins[1]
+            for payload in encoded_games:
+                writer.write_encoded(payload)
+    finally:
+        if executor:
+            executor.shutdown()
+        if writer:
+            writer.close()
+
+    return SimulationResult(
+        agent_names, games, tuple(wins), time.perf_counter() - started
+    )
+
+
+def _round_stats(chunk: Tuple[Tuple[str, str], int, int, int]) -> RoundStats:
+    agent_names, seed, start, stop = chunk
+    stats = RoundStats()
+    for round_index in range(start, stop):
+        rng = game_rng(seed, round_index)
+        agents = [
+            AGENTS[name](random.Random(rng.getrandbits(64))) for name in agent_names
+        ]
+        dealer = round_index % 2
+        engine = GameEngine(agents, _UNREACHABLE_SCORE, rng=rng, dealer=dealer)
+        pegging = [0, 0]
+        shows = {}
+
+        def tally(event):
+            if event.kind == SHOW:
+                shows[event.reason, event.player] = event.points
+            elif event.kind == SCORE and event.reason not in ("hand", "crib"):
+                pegging[event.player] += event.points
+
+        engine.subscribe(tally)
+        engine.play_round()
+        pone = 1 - dealer
+        stats.record(
+            pegging[pone],
+            pegging[dealer],
+            shows["hand", pone],
+            shows["hand", dealer],
+            shows["crib", dealer],
+        )
+    return stats
+
+
+def round_stats(
+    agent_names: Sequence[str],
+    rounds: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = ROUND_CHUNK_SIZE,
+) -> RoundStats:
+    """Points scored in each part of single rounds between two named agents.
+
+    The agents take turns to deal. Like simulate, the result only depends on
+    the seed.
+    """
+    agent_names = tuple(agent_names)
+    for name in agent_names:
+        if name not in AGENTS:
+            raise ValueError(f"Unknown agent: {name}")
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        (agent_names, seed, start, min(start + chunk_size, rounds))
+        for start in range(0, rounds, chunk_size)
+    ]
+    stats = RoundStats()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_stats in executor.map(_round_stats, chunks):
+                stats.update(chunk_stats)
+    else:
+        for chunk_stats in map(_round_stats, chunks):
+            stats.update(chunk_stats)
+    return stats
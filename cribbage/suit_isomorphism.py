@@ -0,0 +1,189 @@
+# Suit symmetry. Relabelling the suits of every card the same way never changes
+# a score, so sets of cards that only differ by such a relabelling can share one
+# entry in any table or cache.
+from cribbage.cards import Card
+from cribbage.hand import Hand
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    NUM_CARDS,
+    NUM_RANKS,
+    NUM_SUITS,
+    card_to_id,
+)
+from bisect import bisect_right
+from itertools import permutations
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# Keys of a hand with a cut hold the canonical cut id above the 52 card bits
+CUT_SHIFT = NUM_CARDS
+
+_RANK_BITS = tuple(1 << (rank - 1) for rank in CARD_RANK)
+_RANK_MASKS_BY_SIZE = [[] for _ in range(NUM_RANKS + 1)]
+for _mask in range(1 << NUM_RANKS):
+    _RANK_MASKS_BY_SIZE[_mask.bit_count()].append(_mask)
+
+# Relabelling for each order the suits can be sorted into, by that order
+_SUIT_MAPS = {
+    order: tuple(order.index(suit) for suit in range(NUM_SUITS))
+    for order in permutations(range(NUM_SUITS))
+}
+
+_BATCH_RANK_BITS = np.array(_RANK_BITS, dtype=np.int64)
+_BATCH_SUITS = np.array(CARD_SUIT, dtype=np.int64)
+_BATCH_RANKS = np.array(CARD_RANK, dtype=np.int64) - 1
+_SUIT_SHIFTS = np.arange(NUM_SUITS, dtype=np.int64) * NUM_RANKS
+
+
+def canonical_suits(card_ids: Sequence[int]) -> Tuple[int, Tuple[int, ...]]:
+    """Canonical card mask of a hand or deal and the suit relabelling used.
+
+    The suits are ordered by the mask of ranks held in them, largest first, so
+    any two sets that only differ by suits get the same mask. The relabelling
+    maps each original suit to its canonical suit.
+    """
+    masks = [0, 0, 0, 0]
+    for card_id in card_ids:
+        masks[CARD_SUIT[card_id]] |= _RANK_BITS[card_id]
+
+    # The suit sits in the low bits so ties sort without a key function
+    first, second, third, fourth = sorted(
+        (masks[0] << 2, masks[1] << 2 | 1, masks[2] << 2 | 2, masks[3] << 2 | 3),
+        reverse=True,
+    )
+    key = (
+        first >> 2
+        | (second >> 2) << NUM_RANKS
+        | (third >> 2) << 2 * NUM_RANKS
+        | (fourth >> 2) << 3 * NUM_RANKS
+    )
+    return key, _SUIT_MAPS[first & 3, second & 3, third & 3, fourth & 3]
+
+
+def canonical_hand_and_cut(
+    hand_ids: Sequence[int], cut_id: int
+) -> Tuple[int, Tuple[int, ...]]:
+    """Like canonical_suits, but the cut stays apart from the hand.
+
+    Suits that hold the same ranks are ordered by whether the cut is in them.
+    The key is the canonical hand mask with the canonical cut id shifted above
+    it by CUT_SHIFT.
+    """
+    masks = [0, 0, 0, 0]
+    for card_id in hand_ids:
+        masks[CARD_SUIT[card_id]] |= _RANK_BITS[card_id]
+    cut_suit = CARD_SUIT[cut_id]
+
+    ordered = [masks[suit] << 3 | suit for suit in range(NUM_SUITS)]
+    ordered[cut_suit] |= 4
+    first, second, third, fourth = sorted(ordered, reverse=True)
+    suit_map = _SUIT_MAPS[first & 3, second & 3, third & 3, fourth & 3]
+    key = (
+        first >> 3
+        | (second >> 3) << NUM_RANKS
+        | (third >> 3) << 2 * NUM_RANKS
+        | (fourth >> 3) << 3 * NUM_RANKS
+    )
+    return key | relabel(cut_id, suit_map) << CUT_SHIFT, suit_map
+
+
+def canonical_hand(
+    hand: Hand, cut_card: Optional[Card] = None
+) -> Tuple[int, Tuple[int, ...]]:
+    """canonical_suits, or canonical_hand_and_cut when given a cut, for Cards."""
+    hand_ids = [card_to_id(card) for card in hand.cards]
+    if cut_card is None:
+        return canonical_suits(hand_ids)
+    return canonical_hand_and_cut(hand_ids, card_to_id(cut_card))
+
+
+def relabel(card_id: int, suit_map: Sequence[int]) -> int:
+    return suit_map[CARD_SUIT[card_id]] * NUM_RANKS + CARD_RANK[card_id] - 1
+
+
+def invert(suit_map: Sequence[int]) -> Tuple[int, ...]:
+    """The relabelling that maps canonical suits back to the original ones."""
+    inverse = [0] * NUM_SUITS
+    for suit, new_suit in enumerate(suit_map):
+        inverse[new_suit] = suit
+    return tuple(inverse)
+
+
+def restore(card_ids: Sequence[int], suit_map: Sequence[int]) -> List[int]:
+    """Map canonical card ids, e.g. a discard found for a canonical deal, back
+    to the suits of the set that ``suit_map`` was computed for."""
+    inverse = invert(suit_map)
+    return [relabel(card_id, inverse) for card_id in card_ids]
+
+
+def canonical_suits_batch(card_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """canonical_suits for each row of an (N, k) array of card ids.
+
+    Returns the (N,) keys and the (N, 4) relabellings. This is the fast path:
+    per hand it costs a fraction of a call to canonical_suits.
+    """
+    card_ids = np.asarray(card_ids, dtype=np.int64)
+    masks = _suit_masks(card_ids)
+    return _sorted_keys(masks << 2 | np.arange(NUM_SUITS), 2)
+
+
+def canonical_hand_and_cut_batch(
+    hand_ids: np.ndarray, cut_ids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """canonical_hand_and_cut for (N, k) hands and (N,) cuts."""
+    hand_ids = np.asarray(hand_ids, dtype=np.int64)
+    cut_ids = np.asarray(cut_ids, dtype=np.int64)
+    masks = _suit_masks(hand_ids)
+    cut_suits = _BATCH_SUITS[cut_ids]
+    is_cut_suit = cut_suits[:, None] == np.arange(NUM_SUITS)
+    keys, suit_maps = _sorted_keys(
+        masks << 3 | is_cut_suit << 2 | np.arange(NUM_SUITS), 3
+    )
+    canonical_cuts = (
+        suit_maps[np.arange(len(cut_ids)), cut_suits] * NUM_RANKS
+        + _BATCH_RANKS[cut_ids]
+    )
+    return keys | canonical_cuts << CUT_SHIFT, suit_maps
+
+
+def _suit_masks(card_ids: np.ndarray) -> np.ndarray:
+    masks = np.zeros((len(card_ids), NUM_SUITS), dtype=np.int64)
+    rows = np.arange(len(card_ids))
+    # Each column adds one card per row, so no row is written twice at once
+    for column in card_ids.T:
+        masks[rows, _BATCH_SUITS[column]] |= _BATCH_RANK_BITS[column]
+    return masks
+
+
+def _sorted_keys(ordered: np.ndarray, shift: int) -> Tuple[np.ndarray, np.ndarray]:
+    ordered = -np.sort(-ordered, axis=1)
+    keys = ((ordered >> shift) << _SUIT_SHIFTS).sum(axis=1)
+    suit_maps = np.empty_like(ordered)
+    rows = np.arange(len(ordered))[:, None]
+    suit_maps[rows, ordered & 3] = np.arange(NUM_SUITS)
+    return keys, suit_maps
+
+
+def canonical_sets(size: int) -> List[int]:
+    """Canonical masks of every set of ``size`` cards, in ascending order."""
+    keys = []
+
+    def extend(prefix: int, max_mask: int, left: int, suit: int):
+        if suit == NUM_SUITS - 1:
+            masks = _RANK_MASKS_BY_SIZE[left]
+            shift = suit * NUM_RANKS
+            keys.extend(
+                prefix | mask << shift
+                for mask in masks[: bisect_right(masks, max_mask)]
+            )
+            return
+        for count in range(min(left, NUM_RANKS) + 1):
+            masks = _RANK_MASKS_BY_SIZE[count]
+            for mask in masks[: bisect_right(masks, max_mask)]:
+                extend(
+                    prefix | mask << (suit * NUM_RANKS), mask, left - count, suit + 1
+                )
+
+    extend(0, (1 << NUM_RANKS) - 1, size, 0)
+    return sorted(keys)
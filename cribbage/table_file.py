@@ -0,0 +1,169 @@
+# File handling shared by the precomputed tables. A table is saved as one file,
+# a struct header that starts with the table's magic bytes and then the data,
+# written through a temporary file so readers never see half a table. Files
+# are memory mapped when loaded, and each table class keeps one shared default
+# instance loaded from the user's cache directory (or CRIBBAGE_CACHE_DIR).
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Sequence, Tuple
+import mmap
+import os
+import struct
+
+# Environment variable that overrides the cache directory
+CACHE_DIRECTORY_VARIABLE = "CRIBBAGE_CACHE_DIR"
+
+
+def cache_directory() -> str:
+    """Where default tables are kept: $CRIBBAGE_CACHE_DIR or ~/.cache/cribbage."""
+    return os.environ.get(CACHE_DIRECTORY_VARIABLE) or os.path.join(
+        os.path.expanduser("~"), ".cache", "cribbage"
+    )
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    """A file to write that replaces ``path`` only once it is complete."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            yield file
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+class MappedTable(ABC):
+    """Base of the tables saved to a file and loaded back memory mapped.
+
+    Subclasses set FILE_NAME (the default table's name in the cache
+    directory), MAGIC, HEADER (a struct starting with the 8 magic bytes) and
+    DESCRIPTION, and implement the hooks below to lay out their data.
+    """
+
+    FILE_NAME = ""
+    MAGIC = b""
+    HEADER = struct.Struct("<8s")
+    DESCRIPTION = "table"
+    # Whether default() builds and saves the table when the file is unusable
+    BUILD_ON_DEMAND = False
+
+    _default: Optional["MappedTable"] = None
+    _default_loaded = False
+    _source: Optional[mmap.mmap] = None
+
+    def _header_fields(self) -> Sequence:
+        """Header values after the magic bytes."""
+        return ()
+
+    @abstractmethod
+    def _write_data(self, file: BinaryIO):
+        """Write the data that follows the header."""
+
+    @classmethod
+    @abstractmethod
+    def _data_size(cls, *fields) -> Optional[int]:
+        """Bytes of data a file with these header values holds, or None if the
+        values are not ones this version can read."""
+
+    @classmethod
+    @abstractmethod
+    def _from_source(cls, source: mmap.mmap, offset: int, *fields) -> "MappedTable":
+        """The table whose data starts at ``offset`` of the mapped file."""
+
+    def _release(self):
+        """Drop every view of the mapped file, so that it can be closed."""
+
+    def save(self, path: str):
+        with atomic_write(path) as file:
+            file.write(self.HEADER.pack(self.MAGIC, *self._header_fields()))
+            self._write_data(file)
+
+    @classmethod
+    def load(cls, path: str) -> "MappedTable":
+        source, fields = cls._map(path)
+        return cls._from_source(source, cls.HEADER.size, *fields)
+
+    @classmethod
+    def _map(cls, path: str) -> Tuple[mmap.mmap, Tuple]:
+        """Map a table file and check its header and length."""
+        with open(path, "rb") as file:
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(source) >= cls.HEADER.size:
+            magic, *fields = cls.HEADER.unpack_from(source)
+            size = cls._data_size(*fields) if magic == cls.MAGIC else None
+            if size is not None and len(source) == cls.HEADER.size + size:
+                return source, tuple(fields)
+        source.close()
+        raise ValueError(f"{path} is not a compatible {cls.DESCRIPTION}")
+
+    @classmethod
+    def load_or_build(cls, path: str) -> "MappedTable":
+        """Load the table, or build it and try to save it for next time.
+
+        For tables that are cheap to build, with a ``build()`` that takes no
+        arguments.
+        """
+        if os.path.exists(path):
+            try:
+                return cls.load(path)
+            except ValueError:
+                pass
+
+        table = cls.build()
+        try:
+            table.save(path)
+        except OSError:
+            # The table is cheap to rebuild, so a read only disk is not fatal
+            pass
+        return table
+
+    @classmethod
+    def default_path(cls) -> str:
+        return os.path.join(cache_directory(), cls.FILE_NAME)
+
+    @classmethod
+    def default(cls) -> Optional["MappedTable"]:
+        """Shared table from the cache directory, loaded on first use.
+
+        If the file is missing or from another version, the table is built
+        when BUILD_ON_DEMAND is set and None otherwise.
+        """
+        if cls._default is None and not cls._default_loaded:
+            cls._default_loaded = True
+            path = cls.default_path()
+            if cls.BUILD_ON_DEMAND:
+                cls._default = cls.load_or_build(path)
+            else:
+                try:
+                    cls._default = cls.load(path)
+                except (OSError, ValueError):
+                    cls._default = None
+        return cls._default
+
+    @classmethod
+    def reset_default(cls):
+        """Close the shared table, so that the next default() reads it again."""
+        if cls._default is not None:
+            cls._default.close()
+        cls._default = None
+        cls._default_loaded = False
+
+    def close(self):
+        """Unmap the file; a loaded table cannot be used afterwards."""
+        if self._source is not None:
+            self._release()
+            self._source.close()
+            self._source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,124 @@
+from cribbage.hand import Hand
+from cribbage.cards import Card
+from cribbage.hand_scorer import HandScorer
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    JACK_IDS,
+    NUM_RANKS,
+    card_to_id,
+    id_to_card,
+)
+from itertools import combinations_with_replacement
+from cribbage.table_file import MappedTable
+from typing import BinaryIO, Optional, Sequence
+import mmap
+import struct
+
+# Additive key per rank (A..K). Every multiset of 5 ranks with at most 4 of a
+# rank sums to a different key, so the sum of the five card keys indexes the
+# table directly without sorting the hand.
+RANK_KEYS = (0, 1, 5, 22, 94, 312, 992, 2422, 5624, 12522, 19998, 43258, 79415)
+TABLE_SIZE = 4 * RANK_KEYS[-1] + RANK_KEYS[-2] + 1
+
+CARD_KEYS = tuple(RANK_KEYS[rank - 1] for rank in CARD_RANK)
+
+
+class TableHandScorer(MappedTable):
+    """Scores a 4 card hand plus cut with a single table lookup.
+
+    Fifteens, pairs and runs only depend on the ranks of the five cards, so the
+    table holds that part of the score for every rank multiset. Flush and nobs
+    are the only suit dependent parts and are added on top. ``default()``
+    builds the table on first use and saves it to the cache directory.
+    """
+
+    FILE_NAME = "hand_table.bin"
+    MAGIC = b"CRIBHT01"
+    HEADER = struct.Struct(f"<8s{NUM_RANKS}II")
+    DESCRIPTION = "hand score table"
+    BUILD_ON_DEMAND = True
+
+    def __init__(self, table, source: Optional[mmap.mmap] = None):
+        if len(table) != TABLE_SIZE:
+            raise ValueError(
+                f"Expected a table of {TABLE_SIZE} entries, got {len(table)}"
+            )
+        self.table = table
+        self._source = source
+
+    @staticmethod
+    def rank_key(card_ids: Sequence[int]) -> int:
+        return sum(CARD_KEYS[card_id] for card_id in card_ids)
+
+    @classmethod
+    def build(cls) -> "TableHandScorer":
+        table = bytearray(TABLE_SIZE)
+
+        for ranks in combinations_with_replacement(range(NUM_RANKS), 5):
+            if any(ranks.count(rank) > 4 for rank in ranks):
+                continue
+            # Suits are irrelevant for the rank only components of the score
+            cards = [id_to_card(rank) for rank in ranks]
+            key = sum(RANK_KEYS[rank] for rank in ranks)
+            table[key] = (
+                HandScorer._score_15s(cards)
+                + HandScorer._score_runs(cards)
+                + HandScorer._score_pairs(cards)
+            )
+
+        return cls(bytes(table))
+
+    def _header_fields(self) -> Sequence[int]:
+        return (*RANK_KEYS, TABLE_SIZE)
+
+    def _write_data(self, file: BinaryIO):
+        file.write(self.table)
+
+    @classmethod
+    def _data_size(cls, *header: int) -> Optional[int]:
+        rank_keys, size = tuple(header[:-1]), header[-1]
+        if rank_keys != RANK_KEYS or size != TABLE_SIZE:
+            return None
+        return TABLE_SIZE
+
+    @classmethod
+    def _from_source(
+        cls, source: mmap.mmap, offset: int, *header: int
+    ) -> "TableHandScorer":
+        return cls(memoryview(source)[offset : offset + TABLE_SIZE], source)
+
+    def _release(self):
+        self.table.release()
+
+    def score_ids(
+        self, hand_ids: Sequence[int], cut_id: int, crib: bool = False
+    ) -> int:
+        first, second, third, fourth = hand_ids
+        score = self.table[
+            CARD_KEYS[first]
+            + CARD_KEYS[second]
+            + CARD_KEYS[third]
+            + CARD_KEYS[fourth]
+            + CARD_KEYS[cut_id]
+        ]
+
+        suit = CARD_SUIT[first]
+        if suit == CARD_SUIT[second] == CARD_SUIT[third] == CARD_SUIT[fourth]:
+            if suit == CARD_SUIT[cut_id]:
+                score += 5
+            elif not crib:
+                score += 4
+
+        if JACK_IDS[CARD_SUIT[cut_id]] in hand_ids:
+            score += 1
+
+        return score
+
+    def score_hand(self, hand: Hand, cut_card: Card, crib: bool = False) -> int:
+        if len(hand.cards) != 4:
+            return HandScorer.score_hand(hand, cut_card, crib)
+
+        return self.score_ids(
+            [card_to_id(card) for card in hand.cards], card_to_id(cut_card), crib
+        )
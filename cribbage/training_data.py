@@ -0,0 +1,350 @@
+# Training data for a network from recorded self-play games. Every discard and
+# every card played becomes a position: a fixed size feature vector of what the
+# deciding player could see, the expected score of each way to discard (for
+# discards), the final point differential from that player's side and (for
+# cards played) the pegging point differential for the rest of the hand.
+#
+# A dataset is a directory of .npy shards and a manifest. TrainingDataset memory
+# maps the shards and streams shuffled mini-batches, so datasets far larger
+# than memory can be trained on.
+from cribbage.card_encoding import NUM_CARDS, card_to_id, ids_to_cards
+from cribbage.discard_analyzer import NUM_OPTIONS, DiscardAnalyzer
+from cribbage.game_engine import (
+    DISCARD,
+    PLAY,
+    ROUND_END,
+    SCORE,
+    GameEngine,
+    PlayerView,
+)
+from cribbage.game_log import decode_game, read_frames
+from cribbage.hand import Hand
+from cribbage.replay import ReplayAgent, apply_event
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import json
+import os
+import numpy as np
+
+# Layout of a feature vector. Card blocks are one-hot over the 52 card ids.
+HAND = 0  # the 6 dealt cards when discarding, the unplayed ones when pegging
+STARTER = HAND + NUM_CARDS
+OWN_PLAYED = STARTER + NUM_CARDS  # this round, by the deciding player
+OPPONENT_PLAYED = OWN_PLAYED + NUM_CARDS
+SEQUENCE = OPPONENT_PLAYED + NUM_CARDS  # played since the count was reset
+IS_DEALER = SEQUENCE + NUM_CARDS  # 1 when the crib is the deciding player's
+OWN_POINTS_NEEDED = IS_DEALER + 1
+OPPONENT_POINTS_NEEDED = OWN_POINTS_NEEDED + 1
+COUNT = OPPONENT_POINTS_NEEDED + 1
+DISCARDING = COUNT + 1  # 1 for a discard, 0 for a card played
+NUM_FEATURES = DISCARDING + 1
+
+# Features are stored as uint8 and scaled to about [0, 1] as batches are read
+FEATURE_SCALE = np.ones(NUM_FEATURES, dtype=np.float32)
+FEATURE_SCALE[[OWN_POINTS_NEEDED, OPPONENT_POINTS_NEEDED]] = 1 / 121
+FEATURE_SCALE[COUNT] = 1 / 31
+
+# Positions per shard file
+SHARD_SIZE = 1 << 18
+# Games per task sent to a worker
+CHUNK_SIZE = 200
+
+MANIFEST = "manifest.json"
+ARRAYS = ("features", "discard_ev", "point_differential", "pegging_differential")
+# The targets a network's value head can be trained on
+VALUE_TARGETS = ("point_differential", "pegging_differential")
+
+# Points scored by playing cards, as opposed to his heels, hands and cribs
+PEGGING_REASONS = ("fifteen", "pair", "run", "thirty-one", "go", "last card")
+
+
+class Positions(NamedTuple):
+    """Rows of positions, as stored (uint8 features) or as batches (scaled).
+
+    ``discard_ev`` holds the expected score of each of the 15 discards of the
+    dealt cards sorted by card id, in itertools.combinations order, and is NaN
+    for cards played. ``pegging_differential`` is the pegging points the
+    deciding player scores from this card to the end of the hand minus the
+    opponent's (what PeggingSolver.solve values), and is NaN for discards.
+    """
+
+    features: np.ndarray
+    discard_ev: np.ndarray
+    point_differential: np.ndarray
+    pegging_differential: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.point_differential)
+
+
+def view_features(view: PlayerView, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """The uint8 feature vector of what a player sees when deciding."""
+    if out is None:
+        out = np.zeros(NUM_FEATURES, dtype=np.uint8)
+
+    for card in view.hand:
+        out[HAND + card_to_id(card)] = 1
+    if view.starter is not None:
+        out[STARTER + card_to_id(view.starter)] = 1
+    for player, card in view.played:
+        block = OWN_PLAYED if player == view.player else OPPONENT_PLAYED
+        out[block + card_to_id(card)] = 1
+    for card in view.sequence:
+        out[SEQUENCE + card_to_id(card)] = 1
+
+    out[IS_DEALER] = view.dealer == view.player
+    out[OWN_POINTS_NEEDED] = min(
+        255, max(0, view.target_score - view.scores[view.player])
+    )
+    out[OPPONENT_POINTS_NEEDED] = min(
+        255, max(0, view.target_score - view.scores[1 - view.player])
+    )
+    out[COUNT] = view.count
+    out[DISCARDING] = len(view.hand) == 6 and not view.kept
+    return out
+
+
+def discard_values(hand_ids: Sequence[int], crib: bool, crib_mode: str) -> np.ndarray:
+    """Expected score of each discard of 6 cards, in sorted card id order."""
+    hand_ids = sorted(hand_ids)
+    options = DiscardAnalyzer.rank_discards(
+        Hand(ids_to_cards(hand_ids)), crib, crib_mode
+    )
+    values = {
+        tuple(sorted(card_to_id(card) for card in discard)): score
+        for discard, score in options
+    }
+    return np.array(
+        [
+            values[hand_ids[first], hand_ids[second]]
+            for first in range(6)
+            for second in range(first + 1, 6)
+        ],
+        dtype=np.float32,
+    )
+
+
+def game_positions(payload: bytes, crib_mode: str = "table") -> Positions:
+    """Every decision of an encoded game (see game_log) as a position."""
+    record = decode_game(payload)
+    engine = GameEngine([ReplayAgent(), ReplayAgent()], record.target_score)
+    decisions = [
+        index
+        for index, event in enumerate(record.events)
+        if event.kind in (DISCARD, PLAY)
+    ]
+    features = np.zeros((len(decisions), NUM_FEATURES), dtype=np.uint8)
+    discard_ev = np.full((len(decisions), NUM_OPTIONS), np.nan, dtype=np.float32)
+    players = np.empty(len(decisions), dtype=np.int8)
+    pegging_differential = np.full(len(decisions), np.nan, dtype=np.float32)
+    # Pegging points of each player so far in the game, when each card of the
+    # round was played
+    pegged = np.zeros(2, dtype=np.float32)
+    plays: List[Tuple[int, np.ndarray]] = []
+
+    def settle_plays():
+        for play_row, pegged_before in plays:
+            points = pegged - pegged_before
+            player = players[play_row]
+            pegging_differential[play_row] = points[player] - points[1 - player]
+        plays.clear()
+
+    row = 0
+    for index, event in enumerate(record.events):
+        if event.kind == SCORE and event.reason in PEGGING_REASONS:
+            pegged[event.player] += event.points
+        elif event.kind == ROUND_END:
+            settle_plays()
+        if event.kind in (DISCARD, PLAY):
+            view = engine.view(event.player)
+            view_features(view, features[row])
+            players[row] = event.player
+            if event.kind == DISCARD:
+                discard_ev[row] = discard_values(
+                    [card_to_id(card) for card in view.hand],
+                    view.dealer == view.player,
+                    crib_mode,
+                )
+            else:
+                plays.append((row, pegged.copy()))
+            row += 1
+        apply_event(engine, event)
+    # A game can end during the play
+    settle_plays()
+
+    scores = np.array(engine.scores, dtype=np.float32)
+    point_differential = scores[players] - scores[1 - players]
+    return Positions(features, discard_ev, point_differential, pegging_differential)
+
+
+def _concatenate(parts: Sequence[Positions]) -> Positions:
+    return Positions(
+        *(np.concatenate([getattr(part, name) for part in parts]) for name in ARRAYS)
+    )
+
+
+def _empty() -> Positions:
+    return Positions(
+        np.zeros((0, NUM_FEATURES), dtype=np.uint8),
+        np.zeros((0, NUM_OPTIONS), dtype=np.float32),
+        np.zeros(0, dtype=np.float32),
+        np.zeros(0, dtype=np.float32),
+    )
+
+
+def _chunk_positions(chunk: Tuple[List[bytes], str]) -> Positions:
+    payloads, crib_mode = chunk
+    return _concatenate([_empty()] + [game_positions(p, crib_mode) for p in payloads])
+
+
+def _shard_path(directory: str, name: str, shard: int) -> str:
+    return os.path.join(directory, f"{name}-{shard:05d}.npy")
+
+
+def _save_array(path: str, array: np.ndarray):
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary_path, path)
+
+
+def build_dataset(
+    log_paths: Iterable[str],
+    directory: str,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    crib_mode: str = "table",
+) -> "TrainingDataset":
+    """Turn game logs into a sharded dataset in ``directory``.
+
+    Games are read a chunk at a time and at most a few chunks are in flight,
+    so logs of any size fit in memory. Positions are written in game order;
+    shuffling happens when batches are read.
+    """
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    def chunks() -> Iterator[Tuple[List[bytes], str]]:
+        for path in log_paths:
+            frames = read_frames(path)
+            while True:
+                payloads = list(islice(frames, CHUNK_SIZE))
+                if not payloads:
+                    break
+                yield payloads, crib_mode
+
+    shard_sizes = []
+    pending: List[Positions] = []
+    pending_size = 0
+
+    def flush(size: int):
+        nonlocal pending, pending_size
+        rows = _concatenate(pending)
+        for name in ARRAYS:
+            path = _shard_path(directory, name, len(shard_sizes))
+            _save_array(path, getattr(rows, name)[:size])
+        shard_sizes.append(size)
+        rest = Positions(*(getattr(rows, name)[size:] for name in ARRAYS))
+        pending, pending_size = [rest], rest.size
+
+    def add(positions: Positions):
+        nonlocal pending_size
+        pending.append(positions)
+        pending_size += positions.size
+        while pending_size >= shard_size:
+            flush(shard_size)
+
+    if workers == 1:
+        for chunk in chunks():
+            add(_chunk_positions(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for chunk in chunks():
+                in_flight.append(executor.submit(_chunk_positions, chunk))
+                if len(in_flight) >= 2 * workers:
+                    add(in_flight.popleft().result())
+            while in_flight:
+                add(in_flight.popleft().result())
+    if pending_size:
+        flush(pending_size)
+
+    manifest = {
+        "num_features": NUM_FEATURES,
+        "num_options": NUM_OPTIONS,
+        "crib_mode": crib_mode,
+        "arrays": list(ARRAYS),
+        "shards": shard_sizes,
+    }
+    temporary_path = os.path.join(directory, MANIFEST + ".tmp")
+    with open(temporary_path, "w") as file:
+        json.dump(manifest, file, indent=2)
+        file.write("\n")
+    os.replace(temporary_path, os.path.join(directory, MANIFEST))
+    return TrainingDataset(directory)
+
+
+class TrainingDataset:
+    """The shards of a dataset, memory mapped, and mini-batches drawn from them."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, MANIFEST)) as file:
+            manifest = json.load(file)
+        if manifest["num_features"] != NUM_FEATURES:
+            raise ValueError(
+                f"Dataset has {manifest['num_features']} features, "
+                f"expected {NUM_FEATURES}"
+            )
+        if manifest.get("arrays") != list(ARRAYS):
+            raise ValueError(
+                f"Dataset in {directory} is from an older version, rebuild it"
+            )
+
+        self.directory = directory
+        self.shards = [
+            Positions(
+                *(
+                    np.load(_shard_path(directory, name, shard), mmap_mode="r")
+                    for name in ARRAYS
+                )
+            )
+            for shard in range(len(manifest["shards"]))
+        ]
+        # Index of the first position of each shard, and the total at the end
+        self.offsets = np.cumsum([0] + manifest["shards"])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def rows(self, indices: np.ndarray) -> Positions:
+        """The positions at these dataset indices, with features scaled."""
+        indices = np.sort(np.asarray(indices, dtype=np.int64))
+        shard_numbers = np.searchsorted(self.offsets, indices, side="right") - 1
+        parts = [_empty()]
+        for shard in np.unique(shard_numbers):
+            local = indices[shard_numbers == shard] - self.offsets[shard]
+            parts.append(
+                Positions(
+                    *(getattr(self.shards[shard], name)[local] for name in ARRAYS)
+                )
+            )
+        rows = _concatenate(parts)
+        return rows._replace(features=rows.features * FEATURE_SCALE)
+
+    def batches(
+        self, batch_size: int, seed: Optional[int] = None, drop_last: bool = False
+    ) -> Iterator[Positions]:
+        """One epoch of mini-batches in a shuffled order.
+
+        Only the batch being returned is read from disk. Rows within a batch
+        come in dataset order, which reads each shard's pages in sequence.
+        """
+        order = np.random.default_rng(seed).permutation(len(self))
+        for start in range(0, len(order), batch_size):
+            indices = order[start : start + batch_size]
+            if drop_last and len(indices) < batch_size:
+                return
+            yield self.rows(indices)
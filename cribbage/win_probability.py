@@ -0,0 +1,288 @@
+# Probability of winning from any board position, by (my score, opponent
+# score, who deals next). A round is modelled as the pegging, then the pone's
+# hand, then the dealer's hand and crib, with the points of each drawn from
+# distributions measured in self-play (RoundStats). Whoever reaches the target
+# first wins, so the order matters near the end: the pone counts first.
+#
+# Each round scores at least the last card, so every round moves the board
+# forward and the table is filled by dynamic programming from the highest
+# scores down. Agents use it to maximize the chance of winning rather than the
+# expected points.
+from cribbage.game_engine import WINNING_SCORE
+from cribbage.table_file import MappedTable
+from typing import BinaryIO, Optional, Sequence
+from numpy.lib.stride_tricks import sliding_window_view
+import mmap
+import struct
+import numpy as np
+
+# Sizes of the points distributions: a hand scores at most 29 and pegging
+# points per player per round are capped at PEGGING_SIZE - 1
+HAND_SIZE = 30
+SHOW_SIZE = 2 * HAND_SIZE - 1  # the dealer's hand and crib together
+PEGGING_SIZE = 64
+
+# Shapes of the RoundStats counts, in the order they are saved
+_COUNT_SHAPES = (
+    (PEGGING_SIZE, PEGGING_SIZE),
+    (HAND_SIZE,),
+    (HAND_SIZE,),
+    (HAND_SIZE,),
+    (SHOW_SIZE,),
+)
+_COUNTS_SIZE = sum(int(np.prod(shape)) for shape in _COUNT_SHAPES)
+
+
+def shift_distribution(distribution: np.ndarray, points: int) -> np.ndarray:
+    """Move a points distribution by whole points, piling mass up at the ends."""
+    size = len(distribution)
+    shifted = np.zeros(size)
+    indices = np.clip(np.arange(size) + points, 0, size - 1)
+    np.add.at(shifted, indices, distribution)
+    return shifted
+
+
+def _normalize(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    if not total:
+        raise ValueError("Round statistics need at least one round")
+    return counts / total
+
+
+class RoundStats:
+    """Counts of the points scored in each part of many rounds.
+
+    ``pegging`` is indexed by (pone points, dealer points) and includes the
+    dealer's 2 for his heels.
+    """
+
+    def __init__(
+        self,
+        pegging: Optional[np.ndarray] = None,
+        pone_hand: Optional[np.ndarray] = None,
+        dealer_hand: Optional[np.ndarray] = None,
+        crib: Optional[np.ndarray] = None,
+        dealer_show: Optional[np.ndarray] = None,
+    ):
+        def counts(array: Optional[np.ndarray], *shape: int) -> np.ndarray:
+            if array is None:
+                return np.zeros(shape, dtype=np.int64)
+            array = np.asarray(array, dtype=np.int64)
+            if array.shape != shape:
+                raise ValueError(f"Expected counts of shape {shape}: {array.shape}")
+            return array
+
+        self.pegging = counts(pegging, PEGGING_SIZE, PEGGING_SIZE)
+        self.pone_hand = counts(pone_hand, HAND_SIZE)
+        self.dealer_hand = counts(dealer_hand, HAND_SIZE)
+        self.crib = counts(crib, HAND_SIZE)
+        self.dealer_show = counts(dealer_show, SHOW_SIZE)
+
+    @property
+    def rounds(self) -> int:
+        return int(self.pone_hand.sum())
+
+    def record(
+        self,
+        pone_pegging: int,
+        dealer_pegging: int,
+        pone_hand: int,
+        dealer_hand: int,
+        crib: int,
+    ):
+        self.pegging[
+            min(pone_pegging, PEGGING_SIZE - 1), min(dealer_pegging, PEGGING_SIZE - 1)
+        ] += 1
+        self.pone_hand[pone_hand] += 1
+        self.dealer_hand[dealer_hand] += 1
+        self.crib[crib] += 1
+        self.dealer_show[dealer_hand + crib] += 1
+
+    def update(self, other: "RoundStats"):
+        self.pegging += other.pegging
+        self.pone_hand += other.pone_hand
+        self.dealer_hand += other.dealer_hand
+        self.crib += other.crib
+        self.dealer_show += other.dealer_show
+
+
+class WinProbabilityTable(MappedTable):
+    """Chances of winning from every score below the target.
+
+    ``start[p, d]`` is the chance that the pone wins from a round about to be
+    dealt with the pone on ``p`` and the dealer on ``d``. ``win[m, o, k]`` is
+    the same from one player's side: ``m`` their score, ``o`` the opponent's
+    and ``k`` 1 when they deal the next round. ``default()`` is None until
+    ``cribbage build-win-table`` has been run.
+    """
+
+    FILE_NAME = "win_probability.bin"
+    MAGIC = b"CRIBWP01"
+    HEADER = struct.Struct("<8sIQ")
+    DESCRIPTION = "win probability table"
+
+    def __init__(
+        self,
+        stats: RoundStats,
+        start: np.ndarray,
+        target_score: int = WINNING_SCORE,
+        source: Optional[mmap.mmap] = None,
+    ):
+        if start.shape != (target_score, target_score):
+            raise ValueError(
+                f"Expected a table of shape {(target_score, target_score)}: "
+                f"{start.shape}"
+            )
+        self.stats = stats
+        self.start = start
+        self.target_score = target_score
+        self.win = np.stack([start, 1 - start.T], axis=2)
+        self._source = source
+
+        self.pegging = _normalize(stats.pegging)
+        self.pone_hand = _normalize(stats.pone_hand)
+        self.crib = _normalize(stats.crib)
+        self.dealer_show = _normalize(stats.dealer_show)
+        self.mean_crib = float(self.crib @ np.arange(HAND_SIZE))
+
+        # 1 - start, padded with the pone's losses for dealer scores past the
+        # target, as used by round_win_probability
+        self._next_round = np.zeros((target_score + SHOW_SIZE, target_score))
+        self._next_round[:target_score] = 1 - start
+
+    @classmethod
+    def build(
+        cls, stats: RoundStats, target_score: int = WINNING_SCORE
+    ) -> "WinProbabilityTable":
+        """Fill the table by dynamic programming over the round distributions."""
+        if stats.pegging[0, 0]:
+            raise ValueError("Every round pegs at least a point for the last card")
+        pegging = _normalize(stats.pegging)
+        pone_hand = _normalize(stats.pone_hand)
+        dealer_show = _normalize(stats.dealer_show)
+        target = target_score
+
+        start = np.zeros((target, target))
+        # Chance that the pone wins from each stage of a round, with the pone's
+        # score first, padded with the results of reaching the target. The pone
+        # reaches it first when both could.
+        next_round = np.zeros((target + SHOW_SIZE, target))
+        before_dealer_show = np.zeros((target + HAND_SIZE, target))
+        before_dealer_show[target:] = 1
+        after_pegging = np.zeros((target + PEGGING_SIZE, target + PEGGING_SIZE))
+        after_pegging[target:] = 1
+
+        for total in range(2 * target - 2, -1, -1):
+            cells = [
+                (pone, total - pone)
+                for pone in range(
+                    max(0, total - target + 1), min(total, target - 1) + 1
+                )
+            ]
+            for pone, dealer in cells:
+                start[pone, dealer] = np.vdot(
+                    pegging,
+                    after_pegging[
+                        pone : pone + PEGGING_SIZE, dealer : dealer + PEGGING_SIZE
+                    ],
+                )
+                next_round[pone, dealer] = 1 - start[pone, dealer]
+            # The new pone is the old dealer, with the hand and crib counted
+            for pone, dealer in cells:
+                before_dealer_show[pone, dealer] = np.dot(
+                    dealer_show, next_round[dealer : dealer + SHOW_SIZE, pone]
+                )
+            for pone, dealer in cells:
+                after_pegging[pone, dealer] = np.dot(
+                    pone_hand, before_dealer_show[pone : pone + HAND_SIZE, dealer]
+                )
+
+        return cls(stats, start, target_score)
+
+    def _header_fields(self) -> Sequence[int]:
+        return (self.target_score, self.stats.rounds)
+
+    def _write_data(self, file: BinaryIO):
+        for counts in (
+            self.stats.pegging,
+            self.stats.pone_hand,
+            self.stats.dealer_hand,
+            self.stats.crib,
+            self.stats.dealer_show,
+        ):
+            file.write(counts.astype("<i8").tobytes())
+        file.write(self.start.astype("<f8").tobytes())
+
+    @classmethod
+    def _data_size(cls, target: int, rounds: int) -> Optional[int]:
+        return 8 * (_COUNTS_SIZE + target * target)
+
+    @classmethod
+    def _from_source(
+        cls, source: mmap.mmap, offset: int, target: int, rounds: int
+    ) -> "WinProbabilityTable":
+        counts = []
+        for shape in _COUNT_SHAPES:
+            count = int(np.prod(shape))
+            counts.append(
+                np.frombuffer(source, "<i8", count, offset).reshape(shape).copy()
+            )
+            offset += 8 * count
+        start = np.frombuffer(source, "<f8", target * target, offset)
+        return cls(RoundStats(*counts), start.reshape(target, target), target, source)
+
+    def _release(self):
+        self.start = None
+
+    def win_probability(
+        self, my_score: int, opponent_score: int, dealer: bool
+    ) -> float:
+        """Chance to win before a deal, ``dealer`` when it is the player's deal."""
+        if my_score >= self.target_score:
+            return 1.0
+        if opponent_score >= self.target_score:
+            return 0.0
+        return float(self.win[my_score, opponent_score, int(dealer)])
+
+    def round_win_probability(
+        self,
+        pone_score: int,
+        dealer_score: int,
+        pone_hand: Sequence[Sequence[float]],
+        dealer_show: Sequence[Sequence[float]],
+    ) -> np.ndarray:
+        """Chance that the pone wins, for each of N guesses at this round's hands.
+
+        ``pone_hand`` is (N, HAND_SIZE) distributions of the pone's hand score
+        and ``dealer_show`` (N, SHOW_SIZE) of the dealer's hand and crib, e.g.
+        one row per way to discard. Pegging follows the measured distribution.
+        """
+        target = self.target_score
+        pone_hand = np.atleast_2d(pone_hand)
+        dealer_show = np.atleast_2d(dealer_show)
+        rows = max(len(pone_hand), len(dealer_show))
+        pone_hand = np.broadcast_to(pone_hand, (rows, HAND_SIZE))
+        dealer_show = np.broadcast_to(dealer_show, (rows, SHOW_SIZE))
+        # Only scores from the current ones up can be reached
+        pones = target - pone_score
+        dealers = target - dealer_score
+
+        # before_dealer_show[n, a, b], for the pone on pone_score + a
+        next_round = sliding_window_view(
+            self._next_round[dealer_score:, pone_score:], SHOW_SIZE, axis=0
+        )[:dealers]
+        before_dealer_show = np.ones((rows, pones + HAND_SIZE, dealers))
+        before_dealer_show[:, :pones] = np.tensordot(
+            dealer_show, next_round, axes=([1], [2])
+        ).transpose(0, 2, 1)
+
+        after_pegging = np.zeros((rows, pones + PEGGING_SIZE, dealers + PEGGING_SIZE))
+        after_pegging[:, pones:] = 1
+        after_pegging[:, :pones, :dealers] = np.einsum(
+            "nabh,nh->nab",
+            sliding_window_view(before_dealer_show, HAND_SIZE, axis=1)[:, :pones],
+            pone_hand,
+        )
+        return np.einsum(
+            "nxy,xy->n", after_pegging[:, :PEGGING_SIZE, :PEGGING_SIZE], self.pegging
+        )
@@ -0,0 +1,75 @@
+import json
+import pytest
+from benchmarks import run
+
+
+def results(**values):
+    return {
+        "metrics": {
+            name: {"value": value, "unit": "", "higher_is_better": name != "latency"}
+            for name, value in values.items()
+        }
+    }
+
+
+class TestCompare:
+    def test_flags_drops_past_the_threshold(self):
+        baseline = results(throughput=100.0, latency=10.0)
+        assert run.compare(results(throughput=90.0, latency=11.0), baseline, 0.15) == []
+
+        regressions = run.compare(
+            results(throughput=80.0, latency=12.0), baseline, 0.15
+        )
+        assert [regression.name for regression in regressions] == [
+            "throughput",
+            "latency",
+        ]
+        assert regressions[0].change == pytest.approx(-0.2)
+
+    def test_improvements_pass(self):
+        baseline = results(throughput=100.0, latency=10.0)
+        assert run.compare(results(throughput=500.0, latency=1.0), baseline) == []
+
+    def test_skips_metrics_missing_from_the_baseline(self):
+        assert run.compare(results(throughput=1.0), results(latency=1.0)) == []
+
+
+class TestRunner:
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        assert run.percentile(samples, 0.5) == 50
+        assert run.percentile(samples, 0.99) == 99
+        assert run.percentile([3.0], 0.9) == 3.0
+
+    def test_main_writes_results_and_compares(self, tmp_path, capsys):
+        output = tmp_path / "results.json"
+        baseline = tmp_path / "baseline.json"
+        arguments = ["score_hand", "pegging", "--scale", "0.05", "--repeat", "1"]
+        arguments += ["--output", str(output), "--baseline", str(baseline)]
+
+        assert run.main(arguments + ["--save-baseline"]) == 0
+        saved = json.loads(baseline.read_text())
+        assert set(saved["metrics"]) == {
+            "score_hand.ops_per_second",
+            "pegging.playouts_per_second",
+            "pegging.batch_playouts_per_second",
+        }
+
+        # A baseline nothing can reach makes every metric a regression
+        for metric in saved["metrics"].values():
+            metric["value"] *= 1000
+        baseline.write_text(json.dumps(saved))
+        assert run.main(arguments) == 1
+        assert "REGRESSION score_hand.ops_per_second" in capsys.readouterr().out
+        assert json.loads(output.read_text())["metrics"]
+
+    def test_missing_baseline(self, tmp_path):
+        arguments = ["score_hand", "--scale", "0.05", "--repeat", "1"]
+        arguments += ["--output", str(tmp_path / "results.json")]
+        arguments += ["--baseline", str(tmp_path / "missing.json")]
+        assert run.main(arguments) == 0
+        assert run.main(arguments + ["--require-baseline"]) == 1
+
+    def test_unknown_benchmark(self):
+        with pytest.raises(SystemExit):
+            run.main(["sorting"])
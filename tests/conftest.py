@@ -0,0 +1,37 @@
+import pytest
+from cribbage.crib_ev import CribEVTable
+from cribbage.discard_analyzer import DiscardTable
+from cribbage.pegging_table import PeggingTable
+from cribbage.table_file import CACHE_DIRECTORY_VARIABLE
+from cribbage.table_hand_scorer import TableHandScorer
+from cribbage.win_probability import WinProbabilityTable
+
+TABLES = (TableHandScorer, CribEVTable, DiscardTable, PeggingTable, WinProbabilityTable)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def table_cache(tmp_path_factory):
+    """Fixture that keeps tests away from the tables in the user's cache.
+
+    Default tables are read from and built into a temporary directory, shared
+    by the session so that the hand and crib tables are only built once. It
+    is session scoped so that it is in place before any module fixtures run.
+    """
+    directory = str(tmp_path_factory.mktemp("cache"))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv(CACHE_DIRECTORY_VARIABLE, directory)
+        for table in TABLES:
+            table.reset_default()
+        yield directory
+        for table in TABLES:
+            table.reset_default()
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables(table_cache):
+    """Fixture that resets every shared table around each test."""
+    for table in TABLES:
+        table.reset_default()
+    yield
+    for table in TABLES:
+        table.reset_default()
@@ -0,0 +1,222 @@
+import random
+import sys
+import pytest
+from cribbage.agents import HeuristicAgent, RandomAgent
+from cribbage.batch_evaluation import (
+    EvaluationScheduler,
+    NetworkLeafEvaluator,
+    PlayoutLeafEvaluator,
+    SolverLeafEvaluator,
+    game_task,
+    leaf_features,
+    play_games,
+)
+from cribbage.game_engine import GameEngine
+from cribbage.mcts import ISMCTSAgent, PeggingLeaf
+from cribbage.network import PolicyValueNetwork
+from cribbage.pegging import PeggingState, card_rank
+from cribbage.pegging_solver import PeggingSolver
+from cribbage.training_data import view_features
+
+
+def counter(limit):
+    """A task that asks for the double of 0..limit-1 and returns their sum."""
+    total = 0
+    for number in range(limit):
+        total += yield number
+    return total
+
+
+def doubled(leaves):
+    return [2 * leaf for leaf in leaves]
+
+
+def ismcts_engine(seed, leaf_solver=None):
+    rng = random.Random(seed)
+    agents = [
+        ISMCTSAgent(iterations=40, rng=random.Random(seed), leaf_solver=leaf_solver),
+        HeuristicAgent(rng=random.Random(seed + 1)),
+    ]
+    return GameEngine(agents, target_score=31, rng=rng)
+
+
+class TestEvaluationScheduler:
+    def test_runs_every_task(self):
+        scheduler = EvaluationScheduler(doubled)
+        results = scheduler.run(counter(limit) for limit in range(10))
+        assert results == [limit * (limit - 1) for limit in range(10)]
+
+        stats = scheduler.stats()
+        assert stats.leaves == sum(range(10))
+        # Every waiting task is valued in the same batch
+        assert stats.batches == 9 and stats.max_batch_size == 9
+
+    def test_limits(self):
+        scheduler = EvaluationScheduler(doubled, max_batch_size=4)
+        results = scheduler.run((counter(5) for _ in range(10)), max_active=6)
+        assert results == [20] * 10
+        stats = scheduler.stats()
+        assert stats.max_batch_size == 4
+        assert stats.leaves == 50
+
+    def test_many_tasks_that_never_yield(self):
+        """Test that tasks finishing without a leaf do not nest calls."""
+        count = sys.getrecursionlimit() + 100
+        scheduler = EvaluationScheduler(doubled)
+        assert scheduler.run(counter(0) for _ in range(count)) == [0] * count
+
+        # Each finished task starts the whole run of empty ones after it
+        tasks = [counter(1)] + [counter(0) for _ in range(count)] + [counter(2)]
+        results = scheduler.run(iter(tasks), max_active=1)
+        assert results == [0] * (count + 1) + [2]
+
+    def test_searches_match_select_play(self):
+        """Test that batched searches pick what each agent picks on its own."""
+        solver = PeggingSolver()
+        views = []
+        for seed in range(12):
+            engine = ismcts_engine(seed)
+            engine.dealer = 0
+            decisions = engine.decisions()
+            decision = next(decisions)
+            while decision.playable is None or len(decision.playable) < 2:
+                agent = engine.agents[decision.player]
+                if decision.playable is None:
+                    answer = agent.select_discards(decision.view)
+                else:
+                    answer = decision.playable[0]
+                decision = decisions.send(answer)
+            views.append(decision)
+
+        expected = [
+            ISMCTSAgent(
+                iterations=60, rng=random.Random(seed), leaf_solver=solver
+            ).select_play(decision.view, decision.playable)
+            for seed, decision in enumerate(views)
+        ]
+        scheduler = EvaluationScheduler(SolverLeafEvaluator(solver))
+        searches = [
+            ISMCTSAgent(iterations=60, rng=random.Random(seed)).search(
+                decision.view, decision.playable
+            )
+            for seed, decision in enumerate(views)
+        ]
+        assert scheduler.run(searches) == expected
+        assert scheduler.stats().mean_batch_size > 5
+
+
+class TestGames:
+    def test_batched_games_match_playing_them_one_by_one(self):
+        solver = PeggingSolver()
+        one_by_one = [ismcts_engine(seed, solver) for seed in range(6)]
+        winners = [engine.play_game() for engine in one_by_one]
+
+        engines = [ismcts_engine(seed) for seed in range(6)]
+        scheduler = EvaluationScheduler(SolverLeafEvaluator(solver))
+        assert play_games(engines, scheduler) == winners
+        assert [engine.scores for engine in engines] == [
+            engine.scores for engine in one_by_one
+        ]
+
+    def test_playout_leaves(self):
+        scheduler = EvaluationScheduler(PlayoutLeafEvaluator(seed=0))
+        engines = [ismcts_engine(seed) for seed in range(6)]
+        winners = play_games(engines, scheduler)
+        assert all(winner in (0, 1) for winner in winners)
+        assert scheduler.stats().mean_batch_size > 2
+
+    def test_playout_leaf_values(self):
+        """Test that leaves with only one way to finish get the solver's value."""
+        solver = PeggingSolver()
+        states = [
+            PeggingState(
+                [[4], [9]], turn=1, count=6, sequence=[5], last=0, scores=(2, 0)
+            ),
+            PeggingState([[12, 12], [11]]),
+            PeggingState([[3], [3]], turn=1, count=4, sequence=[3], last=0),
+        ]
+        leaves = [PeggingLeaf(None, (), state) for state in states]
+        values = PlayoutLeafEvaluator(seed=0)(leaves)
+        assert values == [solver.solve(state) for state in states]
+
+    def test_network_leaves(self):
+        network = PolicyValueNetwork.random(
+            hidden_sizes=(32,), seed=0, value_target="pegging_differential"
+        )
+        scheduler = EvaluationScheduler(NetworkLeafEvaluator(network))
+        engines = [ismcts_engine(seed) for seed in range(8)]
+        winners = play_games(engines, scheduler, max_active=8)
+        assert all(winner in (0, 1) for winner in winners)
+        assert network.stats().calls == scheduler.stats().batches
+        assert scheduler.stats().mean_batch_size > 2
+
+    def test_network_value_target(self, tmp_path):
+        """Test that only networks valuing the rest of the pegging are used."""
+        network = PolicyValueNetwork.random(hidden_sizes=(8,), seed=1)
+        with pytest.raises(ValueError):
+            NetworkLeafEvaluator(network)
+
+        pegging = PolicyValueNetwork.random(
+            hidden_sizes=(8,), seed=1, value_target="pegging_differential"
+        )
+        path = str(tmp_path / "pegging.npz")
+        pegging.save(path)
+        NetworkLeafEvaluator(PolicyValueNetwork.load(path))
+
+    def test_agents_without_search(self):
+        engine = GameEngine(
+            [RandomAgent(random.Random(1)), RandomAgent(random.Random(2))],
+            target_score=31,
+            rng=random.Random(3),
+        )
+        task = game_task(engine)
+        try:
+            next(task)
+            raise AssertionError("a game without searches never yields")
+        except StopIteration as stop:
+            assert stop.value == engine.winner
+
+
+class TestLeafFeatures:
+    def test_leaves_match_real_positions(self):
+        """Test that a leaf's row is the view_features row of the real game.
+
+        The search is rooted at a real play decision and dealt the opponent's
+        real cards, and both then play the same cards to the end of the hand.
+        """
+        compared = 0
+        for seed in range(10):
+            engine = GameEngine(
+                [RandomAgent(random.Random(seed)), RandomAgent(random.Random(seed))],
+                rng=random.Random(seed),
+            )
+            decisions = engine.decisions()
+            decision = next(decisions)
+            while decision.playable is None:
+                decision = decisions.send(list(decision.view.hand[:2]))
+            # Root some searches after the first card of the hand
+            for _ in range(seed % 3):
+                decision = decisions.send(decision.playable[0])
+
+            root = decision.view
+            opponent_hand = tuple(engine.hands[1 - root.player])
+            last = None
+            if root.sequence:
+                last = 0 if root.played[-1][0] == root.player else 1
+            state = PeggingState.from_cards(
+                [root.hand, opponent_hand], 0, root.count, root.sequence, last
+            )
+            while decision.playable is not None and not state.is_over():
+                leaf = PeggingLeaf(root, opponent_hand, state)
+                # The opponent's discards are unknown to the search
+                assert leaf.view()._replace(discards=()) == decision.view._replace(
+                    discards=()
+                )
+                row = leaf_features([leaf])[0]
+                assert row.tolist() == view_features(decision.view).tolist()
+                compared += 1
+
+                card = decision.playable[0]
+                state.apply(card_rank(card))
+                decision = decisions.send(card)
+        assert compared > 20
@@ -0,0 +1,116 @@
+import pytest
+from cribbage.cards import Card, Deck
+from cribbage.hand import Hand
+from cribbage.card_encoding import (
+    CARD_RANK,
+    CARD_SUIT,
+    CARD_VALUE,
+    HandMask,
+    NUM_CARDS,
+    card_id,
+    card_to_id,
+    cards_to_ids,
+    id_to_card,
+    ids_to_cards,
+)
+
+
+@pytest.fixture
+def sample_hand():
+    """Fixture that provides a hand with specific cards for testing encoding."""
+    return Hand([Card("5", "H"), Card("J", "S"), Card("A", "C"), Card("10", "D")])
+
+
+class TestCardIds:
+    def test_ids_follow_deck_order(self):
+        """Test that card ids match the order of a freshly reset deck."""
+        deck = Deck()
+        assert [card_to_id(card) for card in deck.deck] == list(range(NUM_CARDS))
+
+    def test_round_trip_every_card(self):
+        """Test that every card converts to an id and back without loss."""
+        for card in Deck().deck:
+            assert id_to_card(card_to_id(card)) == card
+
+    def test_id_to_card_is_interned(self):
+        """Test that the same Card object is returned for an id."""
+        assert id_to_card(10) is id_to_card(10)
+
+    def test_lookup_tables(self):
+        """Test rank, value and suit tables against the string representation."""
+        king_of_clubs = card_id("K", "C")
+        assert CARD_RANK[king_of_clubs] == 13
+        assert CARD_VALUE[king_of_clubs] == 10
+        assert Deck.SUITS[CARD_SUIT[king_of_clubs]] == "C"
+
+        ace_of_hearts = card_id("A", "H")
+        assert CARD_RANK[ace_of_hearts] == 1
+        assert CARD_VALUE[ace_of_hearts] == 1
+
+        ten_of_spades = card_id("10", "S")
+        assert CARD_RANK[ten_of_spades] == 10
+        assert CARD_VALUE[ten_of_spades] == 10
+
+    def test_cards_to_ids_keeps_order(self, sample_hand):
+        """Test that list conversion preserves the card order."""
+        card_ids = cards_to_ids(sample_hand.cards)
+        assert ids_to_cards(card_ids) == sample_hand.cards
+
+
+class TestHandMask:
+    def test_round_trip_hand(self, sample_hand):
+        """Test that a hand converts to a mask and back with the same cards."""
+        mask = HandMask.from_hand(sample_hand)
+        cards = mask.to_hand().cards
+
+        assert len(mask) == 4
+        assert sorted(map(str, cards)) == sorted(map(str, sample_hand.cards))
+
+    def test_membership(self, sample_hand):
+        """Test that contained card ids are reported correctly."""
+        mask = HandMask.from_hand(sample_hand)
+        assert card_id("J", "S") in mask
+        assert card_id("J", "H") not in mask
+
+    def test_add_and_remove(self, sample_hand):
+        """Test that add and remove return new masks and leave the original."""
+        mask = HandMask.from_hand(sample_hand)
+        queen = card_id("Q", "H")
+
+        bigger = mask.add(queen)
+        assert len(bigger) == 5
+        assert len(mask) == 4
+        assert bigger.remove(queen) == mask
+
+    def test_set_operations(self):
+        """Test union, intersection and difference of masks."""
+        first = HandMask.from_ids([0, 1, 2])
+        second = HandMask.from_ids([2, 3])
+
+        assert (first | second).ids() == [0, 1, 2, 3]
+        assert (first & second).ids() == [2]
+        assert (first - second).ids() == [0, 1]
+
+    def test_iterates_in_id_order(self):
+        """Test that iteration yields card ids in ascending order."""
+        assert list(HandMask.from_ids([51, 0, 13])) == [0, 13, 51]
+
+    def test_suit_counts(self, sample_hand):
+        """Test counting cards per suit in H, D, S, C order."""
+        mask = HandMask.from_hand(sample_hand).add(card_id("2", "H"))
+        assert mask.suit_counts() == [2, 1, 1, 1]
+
+    def test_hashable(self, sample_hand):
+        """Test that equal masks hash the same so they can key dictionaries."""
+        cache = {HandMask.from_hand(sample_hand): 1}
+        assert cache[HandMask.from_cards(reversed(sample_hand.cards))] == 1
+
+    def test_duplicate_card_rejected(self):
+        """Test that duplicate cards cannot be encoded."""
+        with pytest.raises(ValueError):
+            HandMask.from_cards([Card("5", "H"), Card("5", "H")])
+
+    def test_out_of_range_mask_rejected(self):
+        """Test that masks with bits past the last card are rejected."""
+        with pytest.raises(ValueError):
+            HandMask(1 << NUM_CARDS)
@@ -25,6 +25,13 @@ class TestCard:
         assert card1 != card2
         assert card1 == card3
 
+    def test_card_hash(self):
+        """Test that equal cards hash alike, so cards can key sets and dicts."""
+        assert hash(Card("Q", "H")) == hash(Card("Q", "H"))
+        assert len({Card("Q", "H"), Card("Q", "H"), Card("Q", "S")}) == 2
+        assert {Card("5", "D"): 5}[Card("5", "D")] == 5
+        assert Card("Q", "H") != "QH"
+
 
 class TestDeck:
     def test_deck_initialization(self):
@@ -81,6 +88,15 @@ class TestDeck:
         # Verify that random.shuffle was called with the deck
         mock_shuffle.assert_called_once_with(deck.deck)
 
+    def test_shuffle_with_seeded_rng(self):
+        deck1 = Deck()
+        deck2 = Deck()
+        deck1.shuffle(random.Random(42))
+        deck2.shuffle(random.Random(42))
+
+        assert [str(card) for card in deck1.deck] == [str(card) for card in deck2.deck]
+        assert [str(card) for card in deck1.deck] != [str(card) for card in Deck().deck]
+
     def test_shuffle_randomizes_order(self):
         # This test may occasionally fail due to the nature of randomness
         # but the probability is extremely low
@@ -100,4 +116,3 @@ class TestDeck:
         # The probability of shuffling and getting the same order is 1/52!,
         # which is effectively zero for practical purposes
         assert cards1 != cards2
-
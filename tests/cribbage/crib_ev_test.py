@@ -0,0 +1,122 @@
+import pytest
+from itertools import combinations
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage.card_encoding import card_id, id_to_card
+from cribbage.crib_ev import CribEVTable, discard_index, expected_crib_scores
+
+
+@pytest.fixture(scope="module")
+def crib_table():
+    """Fixture that builds the uniform crib EV table once for the module."""
+    return CribEVTable.build()
+
+
+@pytest.fixture
+def small_unseen():
+    """Fixture with a few unseen cards, including jacks and a run of hearts."""
+    return [
+        card_id(rank, suit)
+        for rank, suit in [
+            ("J", "H"),
+            ("J", "S"),
+            ("5", "H"),
+            ("6", "H"),
+            ("7", "D"),
+            ("10", "C"),
+            ("Q", "H"),
+            ("A", "S"),
+        ]
+    ]
+
+
+def brute_force_crib(unseen, discard, weight=lambda a, b: 1.0):
+    """Score every opponent discard and cut with HandScorer."""
+    total = 0.0
+    total_weight = 0.0
+    for opponent in combinations(unseen, 2):
+        cuts = [cut for cut in unseen if cut not in opponent]
+        for cut in cuts:
+            crib = Hand([id_to_card(card) for card in list(discard) + list(opponent)])
+            probability = weight(*opponent) / len(cuts)
+            total += probability * HandScorer.score_hand(crib, id_to_card(cut), True)
+        total_weight += weight(*opponent)
+    return total / total_weight
+
+
+class TestExpectedCribScores:
+    def test_matches_brute_force(self, small_unseen):
+        """Test flushes, nobs and rank scoring against scoring every crib."""
+        discards = [
+            (card_id("4", "H"), card_id("8", "H")),
+            (card_id("J", "D"), card_id("5", "S")),
+            (card_id("J", "C"), card_id("J", "D")),
+            (card_id("9", "S"), card_id("K", "C")),
+        ]
+        scores = expected_crib_scores(small_unseen, discards)
+        for discard, score in zip(discards, scores):
+            assert score == pytest.approx(brute_force_crib(small_unseen, discard))
+
+    def test_opponent_model_weights_discards(self, small_unseen):
+        """Test that an opponent model reweights the opponent's discards."""
+
+        jacks = {card_id("J", "H"), card_id("J", "S")}
+
+        def likes_jacks(first, second, opponent_is_dealer):
+            held = (first in jacks) + (second in jacks)
+            return 1.0 + 3.0 * held if opponent_is_dealer else 1.0
+
+        discard = (card_id("5", "D"), card_id("Q", "S"))
+        weighted = expected_crib_scores(small_unseen, [discard], True, likes_jacks)
+        uniform = expected_crib_scores(small_unseen, [discard], False, likes_jacks)
+
+        assert weighted[0] == pytest.approx(
+            brute_force_crib(
+                small_unseen, discard, lambda a, b: likes_jacks(a, b, True)
+            )
+        )
+        assert uniform[0] == pytest.approx(brute_force_crib(small_unseen, discard))
+
+
+class TestCribEVTable:
+    def test_matches_exact_over_fifty_cards(self, crib_table):
+        """Test table entries against the exact engine with 50 unseen cards."""
+        for discard in [
+            (card_id("5", "H"), card_id("5", "S")),
+            (card_id("J", "D"), card_id("4", "D")),
+            (card_id("K", "C"), card_id("9", "H")),
+        ]:
+            unseen = [card for card in range(52) if card not in discard]
+            expected = expected_crib_scores(unseen, [discard])[0]
+            assert crib_table.expected_score(*discard, dealer=True) == pytest.approx(
+                expected
+            )
+
+    def test_pair_of_fives_beats_king_nine(self, crib_table):
+        """Test that the table ranks well known discards sensibly."""
+        fives = crib_table.expected_score(card_id("5", "H"), card_id("5", "S"), True)
+        king_nine = crib_table.expected_score(
+            card_id("K", "H"), card_id("9", "S"), True
+        )
+        assert fives > 8 > 4 > king_nine
+
+    def test_discard_index_is_order_free(self):
+        """Test that both orders of a pair share one table slot."""
+        assert discard_index(3, 40) == discard_index(40, 3)
+        indices = {discard_index(a, b) for a, b in combinations(range(52), 2)}
+        assert indices == set(range(1326))
+
+    def test_save_and_load(self, crib_table, tmp_path):
+        """Test that a saved table loads back through mmap unchanged."""
+        path = str(tmp_path / "crib_ev.bin")
+        crib_table.save(path)
+
+        loaded = CribEVTable.load(path)
+        assert (loaded.values == crib_table.values).all()
+
+    def test_load_rejects_other_files(self, tmp_path):
+        """Test that a file without the table header is rejected."""
+        path = tmp_path / "not_a_table.bin"
+        path.write_bytes(b"\x00" * 64)
+        with pytest.raises(ValueError):
+            CribEVTable.load(str(path))
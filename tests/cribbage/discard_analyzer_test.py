@@ -1,8 +1,18 @@
+import os
 import pytest
+import random
+import numpy as np
 from unittest.mock import patch, MagicMock
 from cribbage.cards import Card, Deck
 from cribbage.hand import Hand
-from cribbage.discard_analyzer import DiscardAnalyzer
+from cribbage.hand_scorer import HandScorer
+from cribbage import discard_analyzer
+from cribbage.table_file import CACHE_DIRECTORY_VARIABLE
+from cribbage.discard_analyzer import DiscardAnalyzer, DiscardTable
+from cribbage.card_encoding import NUM_CARDS, card_to_id, cards_to_ids, ids_to_cards
+from cribbage.suit_isomorphism import canonical_suits, relabel
+from cribbage.crib_ev import CribEVTable, expected_crib_scores
+from itertools import combinations
 
 
 @pytest.fixture
@@ -20,6 +30,18 @@ def sample_hand():
     return hand
 
 
+def brute_force_expected_score(hand, discards, crib):
+    """Score every cut one at a time with HandScorer, like the original evaluate."""
+    keep = Hand([card for card in hand.cards if card not in discards])
+    cuts = DiscardAnalyzer._calculate_missing_cards(hand)
+    total = 0
+    for cut_card in cuts:
+        discard_score = HandScorer.score_hand(Hand(list(discards)), cut_card)
+        total += HandScorer.score_hand(keep, cut_card)
+        total += discard_score if crib else -discard_score
+    return total / len(cuts)
+
+
 class TestDiscardAnalyzer:
     def test_calculate_missing_cards(self, sample_hand):
         """Test that missing cards are correctly identified."""
@@ -519,3 +541,174 @@ class TestDiscardAnalyzer:
         discard_opp, score_opp = DiscardAnalyzer.evaluate(hand, crib=False)
         assert discard_own == expected_discard_my_crib
         assert discard_opp == expected_discared_opp_crib
+
+    def test_rank_discards_lists_every_option(self, sample_hand):
+        """Test that all 15 discard options are returned, best first."""
+        ranked = DiscardAnalyzer.rank_discards(sample_hand, crib=True)
+
+        assert len(ranked) == 15
+        scores = [score for _, score in ranked]
+        assert scores == sorted(scores, reverse=True)
+        assert ranked[0] == DiscardAnalyzer.evaluate(sample_hand, crib=True)
+
+        discards = {tuple(map(str, discard)) for discard, _ in ranked}
+        expected = {
+            tuple(map(str, pair)) for pair in combinations(sample_hand.cards, 2)
+        }
+        assert discards == expected
+
+    def test_rank_discards_matches_scoring_every_cut(self):
+        """Test the expected scores against scoring each cut with HandScorer."""
+        hands = [
+            # Flush with a jack for nobs, pairs, a double run and fives
+            [("4", "H"), ("6", "H"), ("9", "H"), ("J", "H"), ("5", "D"), ("K", "S")],
+            [("7", "H"), ("7", "S"), ("8", "D"), ("8", "C"), ("9", "H"), ("9", "S")],
+            [("5", "H"), ("5", "S"), ("5", "D"), ("J", "C"), ("A", "H"), ("K", "S")],
+            [("J", "H"), ("J", "S"), ("J", "D"), ("Q", "C"), ("10", "H"), ("A", "S")],
+        ]
+        for cards in hands:
+            hand = Hand([Card(rank, suit) for rank, suit in cards])
+            for crib in (True, False):
+                for discards, score in DiscardAnalyzer.rank_discards(hand, crib):
+                    assert score == pytest.approx(
+                        brute_force_expected_score(hand, discards, crib)
+                    )
+
+    def test_exact_crib_mode_adds_expected_crib(self, sample_hand):
+        """Test that exact mode values discards by the full expected crib."""
+        unseen = [
+            card_to_id(card)
+            for card in DiscardAnalyzer._calculate_missing_cards(sample_hand)
+        ]
+        for crib in (True, False):
+            ranked = DiscardAnalyzer.rank_discards(sample_hand, crib, "exact")
+            assert len(ranked) == 15
+            for discard, score in ranked:
+                discard_ids = [card_to_id(card) for card in discard]
+                crib_score = expected_crib_scores(unseen, [discard_ids])[0]
+                assert score == pytest.approx(
+                    self._keep_score(sample_hand, discard)
+                    + (crib_score if crib else -crib_score)
+                )
+
+    def test_table_crib_mode_uses_crib_table(self, sample_hand, monkeypatch):
+        """Test that table mode reads the crib value from CribEVTable."""
+        table = CribEVTable(np.full((2, 1326), 4.0))
+        monkeypatch.setattr(CribEVTable, "_default", table)
+
+        for discard, score in DiscardAnalyzer.rank_discards(sample_hand, True, "table"):
+            assert score == pytest.approx(self._keep_score(sample_hand, discard) + 4.0)
+
+    def test_crib_modes_need_six_cards(self):
+        """Test that crib modes reject hands that do not discard two cards."""
+        hand = Hand([Card("5", "H"), Card("6", "S"), Card("7", "D"), Card("8", "C")])
+        hand.draw(Card("9", "H"))
+        with pytest.raises(ValueError):
+            DiscardAnalyzer.rank_discards(hand, crib=True, crib_mode="exact")
+
+    def test_unknown_crib_mode(self, sample_hand):
+        """Test that an unknown crib mode is rejected."""
+        with pytest.raises(ValueError):
+            DiscardAnalyzer.evaluate(sample_hand, crib_mode="guess")
+
+    @staticmethod
+    def _keep_score(hand, discards):
+        keep = Hand([card for card in hand.cards if card not in discards])
+        cuts = DiscardAnalyzer._calculate_missing_cards(hand)
+        return sum(HandScorer.score_hand(keep, cut) for cut in cuts) / len(cuts)
+
+
+def random_deals(count, seed=5):
+    rng = random.Random(seed)
+    return [rng.sample(range(NUM_CARDS), 6) for _ in range(count)]
+
+
+@pytest.fixture(scope="module")
+def small_table(tmp_path_factory):
+    """Fixture with a discard table of a few deals and their suit relabellings."""
+    deals = random_deals(6)
+    keys = {canonical_suits(deal)[0] for deal in deals}
+    path = str(tmp_path_factory.mktemp("discards") / "discard_table.bin")
+    table = DiscardTable.build(path, workers=1, keys=keys)
+    yield table, deals
+    table.close()
+
+
+class TestDiscardTable:
+    def test_lookup_matches_deal_values(self, small_table):
+        """Test lookups of deals whose suits differ from the canonical ones."""
+        table, deals = small_table
+        assert len(table) == len(deals)
+        for deal in deals:
+            for suit_map in [(0, 1, 2, 3), (3, 1, 0, 2), (2, 3, 1, 0)]:
+                card_ids = [relabel(card, suit_map) for card in deal]
+                keep, discard, crib_scores = DiscardAnalyzer.deal_values(card_ids)
+                found_keep, found_discard, found_crib = table.lookup(card_ids)
+                assert (list(found_keep), list(found_discard)) == (keep, discard)
+                assert found_crib == pytest.approx(crib_scores)
+
+    def test_lookup_of_missing_deal(self, small_table):
+        table, _ = small_table
+        assert table.lookup(random_deals(1, seed=6)[0]) is None
+
+    @pytest.mark.parametrize("crib_mode", ["cut", "table", "exact"])
+    def test_rank_discards_from_table(self, small_table, monkeypatch, crib_mode):
+        """Test that looked up rankings match computing them live."""
+        table, deals = small_table
+        for deal in deals:
+            hand = Hand(ids_to_cards(deal))
+            for crib in (False, True):
+                monkeypatch.setattr(DiscardTable, "_default", None)
+                live = DiscardAnalyzer.rank_discards(hand, crib, crib_mode)
+                monkeypatch.setattr(DiscardTable, "_default", table)
+                looked_up = DiscardAnalyzer.rank_discards(hand, crib, crib_mode)
+                if crib_mode == "cut":
+                    assert looked_up == live
+                else:
+                    assert dict(
+                        (tuple(cards_to_ids(discard)), score)
+                        for discard, score in looked_up
+                    ) == pytest.approx(
+                        dict(
+                            (tuple(cards_to_ids(discard)), score)
+                            for discard, score in live
+                        )
+                    )
+
+    def test_build_resumes_from_parts(self, tmp_path, monkeypatch):
+        """Test that chunks saved by an interrupted build are not computed again."""
+        monkeypatch.setattr(discard_analyzer, "CHUNK_SIZE", 1)
+        keys = sorted(canonical_suits(deal)[0] for deal in random_deals(3, seed=7))
+        path = str(tmp_path / "discard_table.bin")
+        parts_directory = f"{path}.parts"
+        tmp_path.joinpath("discard_table.bin.parts").mkdir()
+        discard_analyzer._build_chunk(([keys[0]], f"{parts_directory}/{0:08d}.npy"))
+
+        built = []
+        build_chunk = discard_analyzer._build_chunk
+        monkeypatch.setattr(
+            discard_analyzer,
+            "_build_chunk",
+            lambda chunk: built.append(chunk[0]) or build_chunk(chunk),
+        )
+        progress = []
+        table = DiscardTable.build(
+            path, workers=1, keys=keys, progress=lambda *done: progress.append(done)
+        )
+        assert built == [[keys[1]], [keys[2]]]
+        assert progress == [(2, 3), (3, 3)]
+        assert table.keys.tolist() == keys
+        assert not os.path.exists(parts_directory)
+        table.close()
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "discard_table.bin"
+        path.write_bytes(b"CRIBHT01" + bytes(64))
+        with pytest.raises(ValueError):
+            DiscardTable.load(str(path))
+
+    def test_default_is_none_until_built(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+        monkeypatch.setattr(DiscardTable, "_default_loaded", False)
+        monkeypatch.setattr(DiscardTable, "_default", None)
+        assert DiscardTable.default() is None
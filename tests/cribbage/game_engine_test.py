@@ -0,0 +1,151 @@
+import pytest
+import random
+from cribbage.cards import Card
+from cribbage.agents import HeuristicAgent, RandomAgent
+from cribbage.game_engine import (
+    GO,
+    PLAY,
+    ROUND_END,
+    SCORE,
+    SHOW,
+    Agent,
+    GameEngine,
+    score_play,
+)
+
+
+class FirstCardAgent(Agent):
+    """Discards the first two cards and always plays the first playable card."""
+
+    def select_discards(self, view):
+        return list(view.hand[:2])
+
+    def select_play(self, view, playable):
+        return playable[0]
+
+
+def cards(*names):
+    return [Card(name[:-1], name[-1]) for name in names]
+
+
+def play_out(dealer_hand, pone_hand):
+    """Run the play phase for fixed hands with the dealer as player 0."""
+    engine = GameEngine([FirstCardAgent(), FirstCardAgent()], dealer=0)
+    engine.hands = [cards(*dealer_hand), cards(*pone_hand)]
+    events = []
+    engine.subscribe(events.append)
+    engine._play_phase()
+    return engine, events
+
+
+class TestScorePlay:
+    def test_fifteen(self):
+        assert score_play(cards("5H", "KS"), 15) == [("fifteen", 2)]
+
+    def test_pairs_royal(self):
+        assert score_play(cards("7H", "7S", "7D"), 21) == [("pair", 6)]
+        assert score_play(cards("2H", "2S", "2D", "2C"), 8) == [("pair", 12)]
+
+    def test_run_out_of_order(self):
+        assert score_play(cards("3H", "5S", "4D"), 12) == [("run", 3)]
+
+    def test_broken_run(self):
+        assert score_play(cards("4H", "5S", "6D", "6C"), 21) == [("pair", 2)]
+
+
+class TestPlayPhase:
+    def test_go_point_to_last_player(self):
+        """Test that the go goes to the last player when neither can play."""
+        engine, events = play_out(["10H", "9H", "8H", "3H"], ["KS", "QS", "5S", "4S"])
+
+        assert [event.player for event in events if event.kind == GO] == [0]
+        scores = [(e.player, e.reason, e.points) for e in events if e.kind == SCORE]
+        assert scores == [(1, "go", 1), (0, "last card", 1)]
+        assert engine.scores == [1, 1]
+
+    def test_thirty_one_after_go(self):
+        """Test that the other player keeps playing after a go, up to 31."""
+        engine, events = play_out(["10H", "9H", "8H", "2H"], ["KS", "QS", "JS", "AS"])
+
+        assert [event.player for event in events if event.kind == GO] == [0]
+        scores = [(e.player, e.reason, e.points) for e in events if e.kind == SCORE]
+        assert scores == [(1, "thirty-one", 2), (0, "last card", 1)]
+
+    def test_rejects_unplayable_card(self):
+        """Test that an agent cannot play a card that takes the count over 31."""
+
+        class Cheater(FirstCardAgent):
+            def select_play(self, view, playable):
+                return view.hand[-1]
+
+        engine = GameEngine([Cheater(), Cheater()], dealer=0)
+        engine.hands = [cards("AH", "KH"), cards("AS", "KS")]
+        engine.count = 25
+        with pytest.raises(ValueError):
+            engine._play_phase()
+
+
+class TestGameEngine:
+    def test_requires_two_agents(self):
+        with pytest.raises(ValueError):
+            GameEngine([RandomAgent()])
+
+    def test_agents_must_decide_everything(self):
+        class PlayOnly(Agent):
+            def select_play(self, view, playable):
+                return playable[0]
+
+        with pytest.raises(TypeError):
+            PlayOnly()
+
+    def test_rejects_bad_discard(self):
+        """Test that an agent has to discard exactly 2 of its own cards."""
+
+        class OneDiscard(FirstCardAgent):
+            def select_discards(self, view):
+                return list(view.hand[:1])
+
+        engine = GameEngine([OneDiscard(), OneDiscard()], rng=random.Random(1))
+        with pytest.raises(ValueError):
+            engine.play_game()
+
+    def test_random_game_is_consistent(self):
+        """Test a seeded game of random agents from start to finish."""
+        engine = GameEngine(
+            [RandomAgent(random.Random(1)), RandomAgent(random.Random(2))],
+            rng=random.Random(3),
+        )
+        events = []
+        engine.subscribe(events.append)
+        winner = engine.play_game()
+
+        assert engine.scores[winner] >= 121
+        assert engine.scores[1 - winner] < 121
+
+        totals = [0, 0]
+        for event in events:
+            if event.kind == SCORE:
+                totals[event.player] += event.points
+                assert event.total == totals[event.player]
+        assert totals == engine.scores
+
+        # Every completed round plays all 8 cards and shows 3 hands
+        rounds = sum(event.kind == ROUND_END for event in events)
+        assert sum(event.kind == PLAY for event in events) >= 8 * rounds
+        assert sum(event.kind == SHOW for event in events) >= 3 * rounds
+
+    def test_seeded_games_repeat(self):
+        """Test that the same seeds replay the same game."""
+
+        def play(seed):
+            engine = GameEngine(
+                [HeuristicAgent(), RandomAgent(random.Random(seed))],
+                target_score=61,
+                rng=random.Random(seed),
+            )
+            events = []
+            engine.subscribe(events.append)
+            engine.play_game()
+            return events
+
+        assert play(7) == play(7)
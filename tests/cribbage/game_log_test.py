@@ -0,0 +1,165 @@
+import io
+import json
+import pytest
+from cribbage.game_log import (
+    INDEX_TRAILER,
+    MAGIC,
+    GameLog,
+    GameLogWriter,
+    GameRecord,
+    GameRecorder,
+    decode_game,
+    encode_game,
+    read_frames,
+    read_games,
+    read_header,
+    write_games,
+)
+from cribbage.simulate import play_game, simulate
+
+
+def recorded_game(game_index, target_score=121):
+    recorder = GameRecorder()
+    play_game(["random", "random"], 1, game_index, target_score, recorder)
+    return recorder.record(game_index, target_score)
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        """Test that decoding gives back every event, counts and totals included."""
+        for game_index in range(5):
+            record = recorded_game(game_index)
+            assert decode_game(encode_game(record)) == record
+
+    def test_compact(self):
+        """Test that a game takes a small fraction of its JSON lines size."""
+        record = recorded_game(0)
+        json_size = sum(
+            len(
+                json.dumps(
+                    event._replace(cards=[str(c) for c in event.cards])._asdict()
+                )
+            )
+            + 1
+            for event in record.events
+        )
+        assert len(encode_game(record)) * 10 < json_size
+
+    def test_large_game_ids(self):
+        record = GameRecord(1_204_551, 61, recorded_game(0, 61).events)
+        assert decode_game(encode_game(record)).game_id == 1_204_551
+
+    def test_round_snapshots(self):
+        """Test that each round's snapshot holds the scores and dealer it began with."""
+        record = recorded_game(1)
+        header = read_header(encode_game(record))
+        deals = [
+            index
+            for index, event in enumerate(record.events)
+            if event.kind == "deal" and record.events[index - 1].kind != "deal"
+        ]
+        assert [snapshot.event_index for snapshot in header.snapshots] == deals
+        assert [snapshot.round_number for snapshot in header.snapshots] == list(
+            range(1, len(deals) + 1)
+        )
+
+        scores = [0, 0]
+        for snapshot in header.snapshots:
+            events = record.events[: snapshot.event_index]
+            for event in events:
+                if event.kind == "score":
+                    scores[event.player] = event.total
+            assert snapshot.scores == tuple(scores)
+            assert snapshot.dealer == 1 - record.events[snapshot.event_index].player
+
+
+def write_log(path, game_ids, index_interval):
+    record = recorded_game(0, 31)
+    with GameLogWriter(str(path), index_interval) as writer:
+        for game_id in game_ids:
+            writer.write(record._replace(game_id=game_id))
+
+
+class TestGameLog:
+    @pytest.mark.parametrize("index_interval", [1, 4, 1024])
+    def test_find_games(self, tmp_path, index_interval):
+        path = tmp_path / "games.log"
+        game_ids = [3 * game_id for game_id in range(30)] + [1_204_551]
+        write_log(path, game_ids, index_interval)
+
+        with GameLog(str(path)) as log:
+            for game_id in [0, 42, 87, 1_204_551, 33, 3]:
+                assert log.game(game_id).game_id == game_id
+            for missing in [1, 88, 2_000_000]:
+                with pytest.raises(KeyError):
+                    log.payload(missing)
+
+    def test_logs_without_an_index(self, tmp_path):
+        """Test that unordered ids and a missing trailer fall back to a scan."""
+        unordered = tmp_path / "unordered.log"
+        write_log(unordered, [5, 2, 9, 1], index_interval=2)
+        with GameLog(str(unordered)) as log:
+            assert not log.index_ids
+            assert [log.game(game_id).game_id for game_id in (1, 9, 2)] == [1, 9, 2]
+
+        killed = tmp_path / "killed.log"
+        write_log(killed, range(10), index_interval=2)
+        killed.write_bytes(killed.read_bytes()[: -INDEX_TRAILER.size - 1 - 5 * 16])
+        with GameLog(str(killed)) as log:
+            assert not log.index_ids
+            assert log.game(7).game_id == 7
+        assert len(list(read_games(str(killed)))) == 10
+
+
+class TestLogFiles:
+    def test_stream_through_a_file(self, tmp_path):
+        path = str(tmp_path / "games.log")
+        records = [recorded_game(game_index, 61) for game_index in range(4)]
+        assert write_games(path, (record for record in records)) == 4
+
+        games = read_games(path)
+        assert next(games) == records[0]
+        assert list(games) == records[1:]
+
+    def test_rejects_other_files(self):
+        with pytest.raises(ValueError):
+            list(read_frames(io.BytesIO(b"not a log")))
+
+    def test_rejects_truncated_logs(self, tmp_path):
+        path = tmp_path / "games.log"
+        write_games(str(path), [recorded_game(0, 61)])
+        data = path.read_bytes()
+        with pytest.raises(ValueError):
+            list(read_frames(io.BytesIO(data[: len(MAGIC) + 40])))
+
+
+class TestSimulationRecording:
+    def test_simulate_records_every_game_in_order(self, tmp_path):
+        """Test that recorded logs match across worker counts and replay the wins."""
+        serial_path = tmp_path / "serial.log"
+        parallel_path = tmp_path / "parallel.log"
+        result = simulate(
+            ["heuristic", "random"],
+            6,
+            seed=2,
+            workers=1,
+            target_score=61,
+            chunk_size=4,
+            record_path=str(serial_path),
+        )
+        simulate(
+            ["heuristic", "random"],
+            6,
+            seed=2,
+            workers=2,
+            target_score=61,
+            chunk_size=4,
+            record_path=str(parallel_path),
+        )
+        assert serial_path.read_bytes() == parallel_path.read_bytes()
+
+        games = list(read_games(str(serial_path)))
+        assert [game.game_id for game in games] == list(range(6))
+        assert [
+            sum(game.winner == player for game in games) for player in (0, 1)
+        ] == list(result.wins)
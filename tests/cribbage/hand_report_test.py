@@ -0,0 +1,104 @@
+from itertools import combinations, islice
+import numpy as np
+import pytest
+from cribbage import hand_report as hand_report_module
+from cribbage.card_encoding import NUM_CARDS, id_to_card, ids_to_cards
+from cribbage.cli import main
+from cribbage.hand import Hand
+from cribbage.hand_report import NUM_CASES, NUM_SCORES, hand_report
+from cribbage.hand_scorer import BREAKDOWN_CATEGORIES, HandScorer
+from cribbage.suit_isomorphism import canonical_hand_and_cut_batch
+
+# The published frequency of each hand score over all 12,994,800 hands and cuts
+PUBLISHED_HISTOGRAM = [
+    1009008, 99792, 2813796, 505008, 2855676, 697508, 1800268, 751324, 1137236,
+    361224, 388740, 51680, 317340, 19656, 90100, 9168, 58248, 11196, 2708, 0,
+    8068, 2496, 444, 356, 3680, 0, 0, 0, 76, 4,
+]  # fmt: skip
+
+
+def reference_report(hands, crib):
+    histogram = np.zeros(NUM_SCORES, dtype=np.int64)
+    breakdown = np.zeros((len(BREAKDOWN_CATEGORIES), NUM_SCORES), dtype=np.int64)
+    for hand_ids in islice(combinations(range(NUM_CARDS), 4), hands):
+        hand = Hand(ids_to_cards(hand_ids))
+        for cut_id in range(NUM_CARDS):
+            if cut_id in hand_ids:
+                continue
+            points = HandScorer.score_breakdown(hand, id_to_card(cut_id), crib)
+            histogram[sum(points.values())] += 1
+            for row, category in enumerate(BREAKDOWN_CATEGORIES):
+                breakdown[row, points[category]] += 1
+    return histogram, breakdown
+
+
+class TestHandReport:
+    @pytest.mark.parametrize("crib", [False, True])
+    def test_matches_reference_scorer(self, crib):
+        report = hand_report(crib, workers=1, hands=60)
+        histogram, breakdown = reference_report(60, crib)
+        assert report.cases == 60 * 48
+        assert report.mismatches == 0
+        assert report.reference_mismatches == 0
+        assert report.histogram.tolist() == histogram.tolist()
+        assert report.breakdown.tolist() == breakdown.tolist()
+
+    def test_one_reference_case_per_class(self):
+        hands = np.array(list(combinations(range(NUM_CARDS), 4))[:300])
+        hands = np.repeat(hands, NUM_CARDS, axis=0)
+        cut_ids = np.tile(np.arange(NUM_CARDS), 300)
+        dealt = (hands != cut_ids[:, None]).all(axis=1)
+        hands, cut_ids = hands[dealt], cut_ids[dealt]
+
+        canonical = hand_report_module._canonical_cases(hands, cut_ids)
+        keys, _ = canonical_hand_and_cut_batch(hands, cut_ids)
+        assert 0 < len(canonical) < len(hands)
+        assert len(canonical) == len(set(keys[canonical].tolist()))
+
+    def test_reports_reference_mismatches(self, monkeypatch):
+        score_hand = HandScorer.score_hand
+        monkeypatch.setattr(
+            HandScorer,
+            "score_hand",
+            lambda hand, cut, crib=False: score_hand(hand, cut, crib) + 1,
+        )
+        report = hand_report(workers=1, hands=30)
+        assert report.reference_cases > 0
+        assert report.reference_mismatches == report.reference_cases
+        assert report.mismatches == 0
+
+    def test_chunks_and_workers(self, monkeypatch):
+        monkeypatch.setattr(hand_report_module, "CHUNK_SIZE", 40)
+        calls = []
+        serial = hand_report(workers=1, hands=100)
+        parallel = hand_report(
+            workers=2, hands=100, progress=lambda *args: calls.append(args)
+        )
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+        assert parallel.histogram.tolist() == serial.histogram.tolist()
+        assert parallel.breakdown.tolist() == serial.breakdown.tolist()
+
+    def test_summaries(self):
+        report = hand_report(workers=1, hands=50)
+        assert report.mean() == pytest.approx(sum(report.category_means().values()))
+        assert report.cases_per_second > 0
+        # The first hands all hold four or three aces, so no low scores
+        assert report.impossible_scores()[:5] == [0, 1, 2, 3, 4]
+
+    @pytest.mark.slow
+    def test_every_hand_matches_published_histogram(self):
+        report = hand_report()
+        assert report.cases == NUM_CASES == 12994800
+        assert report.mismatches == 0
+        assert report.reference_cases == 652353
+        assert report.reference_mismatches == 0
+        assert report.histogram.tolist() == PUBLISHED_HISTOGRAM
+        assert report.impossible_scores() == [19, 25, 26, 27]
+
+    def test_cli(self, capsys):
+        main(["hand-report", "--hands", "20", "--workers", "1"])
+        output = capsys.readouterr().out
+        assert "960 hands with their cuts" in output
+        assert "impossible scores:" in output
+        assert "disagree on 0 cases" in output
+        assert "HandScorer.score_hand disagrees on 0 of" in output
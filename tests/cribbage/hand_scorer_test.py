@@ -1,7 +1,11 @@
 import pytest
+import random
+import numpy as np
 from cribbage.cards import Card, Deck
 from cribbage.hand import Hand
-from cribbage.hand_scorer import HandScorer
+from cribbage.hand_scorer import HandScorer, count_fifteens, count_fifteens_batch
+from itertools import combinations
+from cribbage.card_encoding import card_id, id_to_card, ids_to_cards
 
 
 @pytest.fixture
@@ -422,3 +426,164 @@ class TestHandScorer:
             # Should have 5 for flush and 4 for other combinations
             assert hand_scorer.score_hand(hand, cut_card, crib=True) == 9
 
+        def test_score_breakdown(self, hand_scorer, sample_hand):
+            """Test that the breakdown itemises score_hand."""
+            cut_card = Card("5", "C")
+            breakdown = hand_scorer.score_breakdown(sample_hand, cut_card)
+
+            assert breakdown == {
+                "fifteens": 16,
+                "pairs": 12,
+                "runs": 0,
+                "flush": 0,
+                "nobs": 1,
+            }
+            assert sum(breakdown.values()) == hand_scorer.score_hand(
+                sample_hand, cut_card
+            )
+
+    class TestBatchScoring:
+        """Tests for scoring many hands at once with score_batch."""
+
+        def test_matches_score_hand(self, hand_scorer):
+            """Test a seeded sample of hands against score_hand, as hand and crib."""
+            rng = random.Random(42)
+            rows = []
+            for _ in range(3000):
+                if rng.random() < 0.2:
+                    # Single suit hands so flushes show up in the sample
+                    suit = rng.randrange(4)
+                    hand_ids = rng.sample(range(suit * 13, suit * 13 + 13), 4)
+                    cut_id = rng.choice([i for i in range(52) if i not in hand_ids])
+                    rows.append(hand_ids + [cut_id])
+                else:
+                    rows.append(rng.sample(range(52), 5))
+
+            cards = np.array(rows)
+            for crib in (False, True):
+                scores = hand_scorer.score_batch(cards[:, :4], cards[:, 4], crib)
+                for row, score in zip(rows, scores):
+                    hand = Hand(ids_to_cards(row[:4]))
+                    assert score == hand_scorer.score_hand(
+                        hand, id_to_card(row[4]), crib
+                    )
+
+        def test_known_hands(self, hand_scorer):
+            """Test the 29 hand, a double double run and a flush with nobs."""
+            hands = [
+                [card_id(rank, suit) for rank, suit in cards]
+                for cards in (
+                    [("5", "H"), ("5", "D"), ("5", "C"), ("J", "S")],
+                    [("A", "H"), ("A", "S"), ("2", "D"), ("2", "C")],
+                    [("10", "H"), ("J", "H"), ("Q", "H"), ("K", "H")],
+                )
+            ]
+            cuts = [card_id("5", "S"), card_id("3", "C"), card_id("A", "H")]
+            assert list(hand_scorer.score_batch(hands, cuts)) == [29, 16, 10]
+
+        def test_rejects_bad_shapes(self, hand_scorer):
+            """Test that hands must be (N, 4) with one cut per hand."""
+            with pytest.raises(ValueError):
+                hand_scorer.score_batch(np.zeros((3, 5), dtype=int), np.zeros(3))
+            with pytest.raises(ValueError):
+                hand_scorer.score_batch(np.zeros((3, 4), dtype=int), np.zeros(2))
+
+        def test_suit_points(self, hand_scorer):
+            """Test that score_batch_suits is the flush and nobs of the breakdown."""
+            hands, cuts = hand_scorer.batch_arrays(
+                [[card_id(rank, "H") for rank in ("10", "J", "Q", "K")]] * 2,
+                [card_id("A", "H"), card_id("A", "S")],
+            )
+            assert hands.dtype == np.intp and hands.shape == (2, 4)
+            for crib in (False, True):
+                breakdown = hand_scorer.score_breakdown_batch(hands, cuts, crib)
+                suits = hand_scorer.score_batch_suits(hands, cuts, crib)
+                assert suits.tolist() == breakdown[:, 3:].sum(axis=1).tolist()
+            assert hand_scorer.score_batch_suits(hands, cuts).tolist() == [6, 4]
+
+    class TestCache:
+        @pytest.fixture(autouse=True)
+        def cache(self):
+            """Fixture that turns the cache on for one test and off after it."""
+            HandScorer.enable_cache(maxsize=64)
+            yield
+            HandScorer.disable_cache()
+
+        def test_matches_uncached_scores(self):
+            rng = random.Random(7)
+            for _ in range(300):
+                *hand_ids, cut_id = rng.sample(range(52), 5)
+                hand = Hand(ids_to_cards(hand_ids))
+                cut_card = id_to_card(cut_id)
+                for crib in (False, True):
+                    assert HandScorer.score_hand(
+                        hand, cut_card, crib
+                    ) == HandScorer._score_hand(hand, cut_card, crib)
+
+            info = HandScorer.cache_info()
+            assert info.size == info.maxsize == 64
+            assert info.evictions == info.misses - 64
+
+        def test_suit_relabelled_hands_hit(self):
+            """Test that hands differing only by suits share an entry."""
+            first = Hand(
+                [Card("5", "H"), Card("5", "S"), Card("J", "D"), Card("K", "C")]
+            )
+            second = Hand(
+                [Card("5", "C"), Card("5", "D"), Card("J", "S"), Card("K", "H")]
+            )
+            assert HandScorer.score_hand(first, Card("4", "D")) == 11
+            assert HandScorer.score_hand(second, Card("4", "S")) == 11
+            # Nobs depends on the cut matching the jack's suit
+            assert HandScorer.score_hand(second, Card("4", "D")) == 10
+            assert HandScorer.score_hand(first, Card("4", "D"), crib=True) == 11
+
+            info = HandScorer.cache_info()
+            assert (info.hits, info.misses, info.evictions) == (1, 3, 0)
+            assert info.hit_rate == pytest.approx(0.25)
+
+        def test_repeated_cards_bypass_the_cache(self):
+            hand = Hand([Card("5", "H")] * 4)
+            assert HandScorer.score_hand(
+                hand, Card("5", "S")
+            ) == HandScorer._score_hand(hand, Card("5", "S"))
+            assert HandScorer.cache_info().misses == 0
+
+        def test_disable(self):
+            HandScorer.disable_cache()
+            assert HandScorer.cache_info() is None
+
+
+class TestCountFifteens:
+    @staticmethod
+    def brute_force(values):
+        return sum(
+            sum(combo) == 15
+            for size in range(len(values) + 1)
+            for combo in combinations(values, size)
+        )
+
+    def test_matches_enumerating_subsets(self):
+        """Test hands of every size up to 12 cards, including many fives."""
+        rng = random.Random(8)
+        for _ in range(300):
+            values = [
+                rng.choice([5, 5, 10, *range(1, 11)]) for _ in range(rng.randint(0, 12))
+            ]
+            assert count_fifteens(values) == self.brute_force(values)
+        assert count_fifteens([5] * 6) == 20
+        assert count_fifteens([]) == 0
+
+    @pytest.mark.parametrize("size", [1, 5, 7])
+    def test_batch_matches_one_at_a_time(self, size):
+        rng = np.random.default_rng(size)
+        values = np.minimum(rng.integers(1, 14, size=(2000, size)), 10)
+        values[:50] = 5
+        assert count_fifteens_batch(values).tolist() == [
+            count_fifteens(row) for row in values.tolist()
+        ]
+
+    def test_score_larger_sets(self):
+        """Test that scoring takes what-if sets of more than 5 cards."""
+        cards = [Card(rank, "H") for rank in ("5", "5", "5", "10", "J", "Q")]
+        assert HandScorer._score_15s(cards) == 2 * (3 * 3 + 1)
@@ -0,0 +1,37 @@
+import pytest
+from cribbage.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        # Reading "a" makes "b" the least recently used
+        assert cache.get_or_compute("a", lambda: -1) == 1
+        cache.get_or_compute("c", lambda: 3)
+
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert len(cache) == 2
+        assert cache.info() == (1, 3, 1, 2, 2)
+
+    def test_computes_only_on_a_miss(self):
+        cache = LRUCache(4)
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_compute(1, lambda: calls.append(1) or "one") == "one"
+        assert calls == [1]
+        assert cache.info().hit_rate == pytest.approx(2 / 3)
+
+    def test_clear(self):
+        cache = LRUCache(1)
+        cache.get_or_compute(1, lambda: 1)
+        cache.get_or_compute(2, lambda: 2)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.info() == (0, 0, 0, 0, 1)
+        assert cache.info().hit_rate == 0.0
+
+    def test_size_must_be_positive(self):
+        with pytest.raises(ValueError):
+            LRUCache(0)
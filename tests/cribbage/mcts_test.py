@@ -0,0 +1,92 @@
+import random
+import time
+from cribbage.card_encoding import CARD_VALUE
+from cribbage.cards import Card, Deck
+from cribbage.agents import RandomAgent
+from cribbage.game_engine import GameEngine, PlayerView
+from cribbage.mcts import ISMCTSAgent
+
+
+def cards(*names):
+    return tuple(Card(name[:-1], name[-1]) for name in names)
+
+
+def make_view(hand, played, count, sequence, opponent_cards_left):
+    """A pegging view for player 0, the pone, holding the given cards."""
+    kept = hand + tuple(card for player, card in played if player == 0)
+    return PlayerView(
+        player=0,
+        dealer=1,
+        scores=(0, 0),
+        target_score=121,
+        hand=hand,
+        kept=kept,
+        discards=cards("KC", "QC"),
+        starter=Card("2", "D"),
+        count=count,
+        sequence=sequence,
+        played=played,
+        opponent_cards_left=opponent_cards_left,
+    )
+
+
+class TestISMCTSAgent:
+    def test_takes_thirty_one(self):
+        """Test that the search finds the 2 points for 31."""
+        agent = ISMCTSAgent(iterations=300, rng=random.Random(1))
+        played = ((0, Card("J", "H")), (1, Card("A", "S")), (0, Card("10", "S")))
+        view = make_view(cards("KH", "2H"), played, 21, cards("JH", "AS", "10S"), 3)
+        assert agent.select_play(view, list(view.hand)) == Card("K", "H")
+
+    def test_opponent_pool_respects_go(self):
+        """Test that cards the opponent would have played are not dealt to them."""
+        played = (
+            (0, Card("10", "H")),
+            (1, Card("9", "S")),
+            (0, Card("5", "H")),
+            (0, Card("A", "C")),
+        )
+        view = make_view(cards("7H", "3D"), played, 25, tuple(c for _, c in played), 3)
+
+        # We played twice in a row from 24, so the opponent holds nothing under 8
+        pool = ISMCTSAgent._opponent_pool(view)
+        assert len(pool) > 3
+        assert min(CARD_VALUE[card_id] for card_id in pool) >= 8
+
+    def test_reuses_tree_within_a_hand(self):
+        """Test that the next search starts from the subtree already explored."""
+        agent = ISMCTSAgent(iterations=200, rng=random.Random(2))
+        view = make_view(cards("5H", "6H", "8D", "KS"), (), 0, (), 4)
+        first = agent.select_play(view, list(view.hand))
+        old_root = agent._root
+
+        played = ((0, first), (1, Card("7", "C")))
+        hand = tuple(card for card in view.hand if card != first)
+        count = min(Deck.RANKS.index(first.rank) + 1, 10) + 7
+        view = view._replace(
+            hand=hand,
+            played=played,
+            count=count,
+            sequence=(first, Card("7", "C")),
+            opponent_cards_left=3,
+        )
+        agent.select_play(view, list(hand))
+
+        reused = old_root.children[Deck.RANKS.index(first.rank)].children.get(6)
+        assert reused is not None and agent._root is reused
+
+    def test_time_limit(self):
+        agent = ISMCTSAgent(iterations=0, time_limit=0.05, rng=random.Random(3))
+        view = make_view(cards("5H", "6H", "8D", "KS"), (), 0, (), 4)
+        started = time.perf_counter()
+        agent.select_play(view, list(view.hand))
+        assert time.perf_counter() - started < 1.0
+        assert sum(child.visits for child in agent._root.children.values()) > 0
+
+    def test_plays_a_game(self):
+        engine = GameEngine(
+            [ISMCTSAgent(iterations=30, rng=random.Random(5)), RandomAgent()],
+            target_score=31,
+            rng=random.Random(6),
+        )
+        assert engine.play_game() in (0, 1)
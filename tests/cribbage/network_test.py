@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from cribbage.cards import Card
+from cribbage.game_engine import PlayerView
+from cribbage.network import (
+    DISCARD_POLICY,
+    PLAY_POLICY,
+    POLICY_SIZE,
+    PolicyValueNetwork,
+    discard_options,
+    legal_mask,
+)
+from cribbage.training_data import FEATURE_SCALE, NUM_FEATURES
+
+
+def random_features(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((count, NUM_FEATURES)) < 0.1).astype(np.uint8)
+
+
+def reference_forward(network, features):
+    """One position at a time in float64, for comparison."""
+    activations = features.astype(np.float64) * FEATURE_SCALE
+    for weights, biases in network.hidden:
+        activations = np.maximum(activations @ weights + biases, 0)
+    logits = activations @ network.policy[0] + network.policy[1]
+    policy = np.exp(logits - logits.max())
+    value = activations @ network.value[0] + network.value[1]
+    return policy / policy.sum(), value[0]
+
+
+def view(hand, kept=(), count=0):
+    return PlayerView(
+        player=0,
+        dealer=1,
+        scores=(100, 90),
+        target_score=121,
+        hand=tuple(hand),
+        kept=tuple(kept),
+        discards=(),
+        starter=None,
+        count=count,
+        sequence=(),
+        played=(),
+        opponent_cards_left=4,
+    )
+
+
+class TestPolicyValueNetwork:
+    def test_batch_matches_single_positions(self):
+        network = PolicyValueNetwork.random(seed=1)
+        features = random_features(50)
+        policy, value = network.evaluate_batch(features)
+        assert policy.shape == (50, POLICY_SIZE)
+        assert value.shape == (50,)
+        for row in range(50):
+            expected_policy, expected_value = reference_forward(network, features[row])
+            assert policy[row] == pytest.approx(expected_policy, rel=1e-4, abs=1e-7)
+            assert value[row] == pytest.approx(expected_value, rel=1e-4, abs=1e-4)
+
+    def test_scaled_features(self):
+        network = PolicyValueNetwork.random(seed=2)
+        features = random_features(8)
+        raw = network.evaluate_batch(features)
+        scaled = network.evaluate_batch(features * FEATURE_SCALE)
+        assert np.allclose(raw[0], scaled[0]) and np.allclose(raw[1], scaled[1])
+
+    def test_legal_mask(self):
+        network = PolicyValueNetwork.random(seed=3)
+        hand = [Card("5", "H"), Card("K", "S"), Card("2", "D"), Card("9", "C")]
+        pegging = view(hand, kept=hand, count=27)
+        mask = legal_mask(pegging)
+        assert mask.sum() == 1 and mask[PLAY_POLICY].sum() == 1
+
+        policy, value = network.evaluate(pegging)
+        assert policy[mask] == pytest.approx([1.0])
+        assert isinstance(value, float)
+
+        dealt = hand + [Card("A", "H"), Card("J", "D")]
+        discarding = legal_mask(view(dealt))
+        assert discarding[DISCARD_POLICY].all() and not discarding[PLAY_POLICY].any()
+        assert len(discard_options([card for card in range(6)])) == 15
+
+    def test_save_and_load(self, tmp_path):
+        network = PolicyValueNetwork.random(hidden_sizes=(32, 16, 8), seed=4)
+        path = str(tmp_path / "network.npz")
+        network.save(path)
+        loaded = PolicyValueNetwork.load(path)
+        assert len(loaded.hidden) == 3
+        assert loaded.value_target == "point_differential"
+        features = random_features(5)
+        assert np.array_equal(
+            loaded.evaluate_batch(features)[0], network.evaluate_batch(features)[0]
+        )
+
+    def test_rejects_bad_shapes(self, tmp_path):
+        network = PolicyValueNetwork.random(hidden_sizes=(16,), seed=5)
+        with pytest.raises(ValueError):
+            PolicyValueNetwork(
+                network.hidden, network.policy, (np.zeros((8, 1)), np.zeros(1))
+            )
+        with pytest.raises(ValueError):
+            PolicyValueNetwork(
+                [(np.zeros((10, 16)), np.zeros(16))], network.policy, network.value
+            )
+        with pytest.raises(ValueError):
+            network.evaluate_batch(np.zeros((3, 10), dtype=np.uint8))
+
+        with pytest.raises(ValueError):
+            PolicyValueNetwork.random(hidden_sizes=(16,), value_target="winner")
+
+        path = tmp_path / "other.npz"
+        np.savez(path, weights=np.zeros(3))
+        with pytest.raises(ValueError):
+            PolicyValueNetwork.load(str(path))
+
+    def test_stats(self):
+        network = PolicyValueNetwork.random(hidden_sizes=(16,), seed=6)
+        for size in (1, 10, 100):
+            network.evaluate_batch(random_features(size))
+        stats = network.stats()
+        assert (stats.calls, stats.positions, stats.max_batch_size) == (3, 111, 100)
+        assert stats.mean_batch_size == 37
+        assert 0 < stats.p50_ms <= stats.p99_ms
+        assert stats.positions_per_second > 0
+
+        network.reset_stats()
+        assert network.stats().calls == 0
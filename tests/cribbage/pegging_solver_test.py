@@ -0,0 +1,79 @@
+import random
+from cribbage.pegging import PeggingState
+from cribbage.pegging_solver import PeggingSolver, canonical_key
+from cribbage.mcts import ISMCTSAgent
+from cribbage.agents import RandomAgent
+from cribbage.game_engine import GameEngine
+
+
+def random_state(rng, cards_each=4):
+    ranks = rng.sample([rank for rank in range(13) for _ in range(4)], 2 * cards_each)
+    return PeggingState([ranks[:cards_each], ranks[cards_each:]])
+
+
+def plain_minimax(state):
+    """Minimax without a table, for comparison."""
+    if state.is_over():
+        return 0
+    player = state.turn
+    best = None
+    for rank in state.legal_moves():
+        before = state.scores[player] - state.scores[1 - player]
+        state.apply(rank)
+        value = state.scores[player] - state.scores[1 - player] - before
+        if not state.is_over():
+            future = plain_minimax(state)
+            value += future if state.turn == player else -future
+        state.undo()
+        best = value if best is None else max(best, value)
+    return best
+
+
+class TestPeggingSolver:
+    def test_matches_plain_minimax(self):
+        """Test the memoized values against a search with no table."""
+        rng = random.Random(1)
+        solver = PeggingSolver()
+        for _ in range(40):
+            state = random_state(rng, 3)
+            assert solver.solve(state) == plain_minimax(state.copy())
+        assert solver.hits > 0
+
+    def test_canonical_key_drops_dead_cards(self):
+        """Test that cards no run can reach back to are not part of the key."""
+        # Both sequences count 16 and end 5 4 3 after a repeated rank
+        first = PeggingState([[12], [11]], count=16, sequence=[3, 4, 3, 2], last=1)
+        second = PeggingState([[12], [11]], count=16, sequence=[0, 2, 4, 3, 2], last=1)
+        assert first != second
+        assert canonical_key(first) == canonical_key(second)
+
+        third = PeggingState([[12], [11]], count=16, sequence=[5, 4, 3, 2], last=1)
+        assert canonical_key(first) != canonical_key(third)
+
+    def test_move_values(self):
+        """Test that 31 is worth more than playing under it."""
+        solver = PeggingSolver()
+        state = PeggingState([[12, 1], [0]], count=21, sequence=[9, 10], last=1)
+        values = solver.move_values(state)
+        assert solver.best_move(state) == 12
+        assert values[12] > values[1]
+
+    def test_solve_keeps_state(self):
+        state = random_state(random.Random(2))
+        key = state.key()
+        PeggingSolver().solve(state)
+        assert state.key() == key and state.scores == [0, 0]
+
+    def test_leaf_solver_in_search(self):
+        """Test that ISMCTS accepts the solver as its leaf evaluator."""
+        engine = GameEngine(
+            [
+                ISMCTSAgent(
+                    iterations=20, rng=random.Random(3), leaf_solver=PeggingSolver()
+                ),
+                RandomAgent(random.Random(4)),
+            ],
+            target_score=31,
+            rng=random.Random(5),
+        )
+        assert engine.play_game() in (0, 1)
@@ -0,0 +1,144 @@
+import random
+import numpy as np
+import pytest
+from cribbage import pegging_table
+from cribbage.agents import HeuristicAgent, PeggingAwareAgent
+from cribbage.card_encoding import ids_to_cards
+from cribbage.game_engine import GameEngine, PlayerView
+from cribbage.pegging import PeggingState, card_rank
+from cribbage.pegging_solver import PeggingSolver
+from cribbage.table_file import CACHE_DIRECTORY_VARIABLE
+from cribbage.pegging_table import HANDS, NUM_HANDS, PeggingTable, hand_index
+
+
+@pytest.fixture(scope="module")
+def playout_table():
+    return PeggingTable.build(samples=2, method="playout", workers=1)
+
+
+def deal_view(card_ids, dealer=0, player=0):
+    return PlayerView(
+        player=player,
+        hand=tuple(ids_to_cards(card_ids)),
+        kept=(),
+        discards=(),
+        starter=None,
+        played=(),
+        sequence=(),
+        count=0,
+        scores=(0, 0),
+        dealer=dealer,
+        target_score=121,
+        opponent_cards_left=6,
+    )
+
+
+class TestPeggingTable:
+    def test_hands(self):
+        assert NUM_HANDS == 1820
+        assert len(set(HANDS)) == NUM_HANDS
+        assert all(list(hand) == sorted(hand) for hand in HANDS)
+
+    def test_hand_index_ignores_order(self):
+        assert hand_index([9, 4, 4, 10]) == hand_index([4, 4, 9, 10])
+        assert HANDS[hand_index([12, 0, 5, 5])] == (0, 5, 5, 12)
+
+    def test_build(self, playout_table):
+        assert playout_table.values.shape == (2, NUM_HANDS)
+        assert playout_table.samples == 2
+        assert np.isfinite(playout_table.values).all()
+
+    def test_build_is_seeded(self):
+        """Test that values only depend on the seed, not on the workers."""
+        first = pegging_table._build_chunk((range(5), 3, "playout", 7))
+        second = pegging_table._build_chunk((range(5), 3, "playout", 7))
+        assert first.shape == (2, 5)
+        assert (first == second).all()
+
+    def test_solver_values(self):
+        """Test the solver values against solving the sampled deals directly."""
+        hand = HANDS[hand_index([2, 3, 4, 4])]
+        dealer, pone = pegging_table._hand_values(hand, 3, "solver", 0)
+
+        rng = random.Random(f"0/{hand}")
+        deck = [rank for rank in range(13) for _ in range(4)]
+        for rank in hand:
+            deck.remove(rank)
+        solver = PeggingSolver()
+        dealer_total = pone_total = 0
+        for _ in range(3):
+            opponent = rng.sample(deck, 4)
+            pone_total += solver.solve(PeggingState([hand, opponent]))
+            dealer_total -= solver.solve(PeggingState([opponent, hand]))
+        assert (dealer, pone) == (dealer_total / 3, pone_total / 3)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            PeggingTable.build(samples=1, method="guess")
+
+    def test_save_and_load(self, playout_table, tmp_path):
+        path = str(tmp_path / "tables" / "pegging_table.bin")
+        playout_table.save(path)
+        loaded = PeggingTable.load(path)
+        assert loaded.samples == playout_table.samples
+        assert (loaded.values == playout_table.values).all()
+        assert loaded.value([4, 4, 9, 10], True) == playout_table.value(
+            [10, 9, 4, 4], True
+        )
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "pegging_table.bin"
+        path.write_bytes(b"CRIBEV01" + bytes(100))
+        with pytest.raises(ValueError):
+            PeggingTable.load(str(path))
+
+    def test_missing_default(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+        monkeypatch.setattr(PeggingTable, "_default_loaded", False)
+        monkeypatch.setattr(PeggingTable, "_default", None)
+        assert PeggingTable.default() is None
+
+
+class TestPeggingAwareAgent:
+    def test_discards_two_dealt_cards(self, playout_table):
+        agent = PeggingAwareAgent(table=playout_table)
+        rng = random.Random(3)
+        for _ in range(20):
+            card_ids = rng.sample(range(52), 6)
+            view = deal_view(card_ids, dealer=rng.randrange(2))
+            discards = agent.select_discards(view)
+            assert len(discards) == 2
+            assert set(discards) <= set(view.hand)
+
+    def test_pegging_value_changes_discard(self):
+        """Test that a large enough pegging value decides the discard."""
+        view = deal_view([0, 14, 28, 3, 17, 31], dealer=0)
+        baseline = HeuristicAgent(crib_mode="table").select_discards(view)
+
+        values = np.zeros((2, NUM_HANDS))
+        # Keep the cards the heuristic threw away, with two it kept
+        wanted = (
+            list(baseline) + [card for card in view.hand if card not in baseline][:2]
+        )
+        values[0, hand_index(card_rank(card) for card in wanted)] = 100
+        agent = PeggingAwareAgent(table=PeggingTable(values, 1))
+
+        discards = agent.select_discards(view)
+        kept = [card for card in view.hand if card not in discards]
+        assert sorted(map(card_rank, kept)) == sorted(map(card_rank, wanted))
+
+    def test_without_table(self, monkeypatch):
+        monkeypatch.setattr(PeggingTable, "_default_loaded", True)
+        monkeypatch.setattr(PeggingTable, "_default", None)
+        view = deal_view([0, 14, 28, 3, 17, 31])
+        assert PeggingAwareAgent().select_discards(view) == HeuristicAgent(
+            crib_mode="table"
+        ).select_discards(view)
+
+    def test_plays_a_game(self, playout_table):
+        agents = [
+            PeggingAwareAgent(rng=random.Random(1), table=playout_table),
+            HeuristicAgent(rng=random.Random(2)),
+        ]
+        engine = GameEngine(agents, target_score=61, rng=random.Random(0))
+        assert engine.play_game() in (0, 1)
@@ -0,0 +1,208 @@
+import pytest
+import random
+from collections import Counter
+import numpy as np
+from cribbage.cards import Deck
+from cribbage.game_engine import Agent, GameEngine
+from cribbage.pegging import (
+    PeggingState,
+    card_rank,
+    pack_hand,
+    playout_batch,
+    trailing_run,
+    unpack_hand,
+)
+
+
+class ChoiceAgent(Agent):
+    """Plays the n-th lowest playable rank, with n taken from a shared list."""
+
+    def __init__(self, choices):
+        self.choices = choices
+
+    def select_discards(self, view):
+        return list(view.hand[:2])
+
+    def select_play(self, view, playable):
+        ranks = sorted({card_rank(card) for card in playable})
+        rank = ranks[self.choices.pop(0) % len(ranks)]
+        return next(card for card in playable if card_rank(card) == rank)
+
+
+def random_deal(rng):
+    deck = Deck()
+    deck.shuffle(rng)
+    return [deck.deck[:4], deck.deck[4:8]]
+
+
+def random_states(rng, size):
+    """Random deals, some with cards already played."""
+    ranks = [rank for rank in range(13) for _ in range(4)]
+    states = []
+    for _ in range(size):
+        dealt = rng.sample(ranks, 8)
+        state = PeggingState([dealt[:4], dealt[4:]])
+        for _ in range(rng.randrange(4)):
+            state.apply(rng.choice(state.legal_moves()))
+        states.append(state.copy())
+    return states
+
+
+def outcomes(state, chance=1.0, found=None):
+    """The chance of each final score when every play is uniformly random."""
+    found = Counter() if found is None else found
+    if state.is_over():
+        found[tuple(state.scores)] += chance
+        return found
+    moves = state.legal_moves()
+    for rank in moves:
+        state.apply(rank)
+        outcomes(state, chance / len(moves), found)
+        state.undo()
+    return found
+
+
+class TestHelpers:
+    def test_pack_round_trip(self):
+        ranks = [0, 0, 4, 12]
+        assert unpack_hand(pack_hand(ranks)) == ranks
+
+    def test_trailing_run(self):
+        assert trailing_run([2, 4, 3]) == 3
+        assert trailing_run([9, 2, 4, 3, 5]) == 4
+        assert trailing_run([6, 2, 4, 3, 5]) == 5
+        assert trailing_run([2, 4, 3, 3]) == 0
+        assert trailing_run([1, 2]) == 0
+        assert trailing_run([3, 4, 5, 9]) == 0
+
+    def test_trailing_run_matches_sorting_windows(self):
+        """Test the linear walk against sorting every trailing window."""
+        rng = random.Random(4)
+        for _ in range(5000):
+            ranks = [rng.randrange(13) for _ in range(rng.randint(1, 8))]
+            expected = 0
+            for length in range(len(ranks), 2, -1):
+                window = sorted(ranks[-length:])
+                if all(window[i] + 1 == window[i + 1] for i in range(length - 1)):
+                    expected = length
+                    break
+            assert trailing_run(ranks) == expected
+
+
+class TestPeggingState:
+    def test_scores_match_engine(self):
+        """Test random play of whole hands against the game engine."""
+        rng = random.Random(1)
+        for _ in range(300):
+            hands = random_deal(rng)
+            choices = [rng.randrange(4) for _ in range(8)]
+
+            engine = GameEngine(
+                [ChoiceAgent(list(choices)), ChoiceAgent(list(choices))], dealer=1
+            )
+            engine.agents[1].choices = engine.agents[0].choices
+            engine.hands = [list(hand) for hand in hands]
+            engine._play_phase()
+
+            state = PeggingState.from_cards(hands)
+            while not state.is_over():
+                moves = state.legal_moves()
+                state.apply(moves[choices.pop(0) % len(moves)])
+
+            assert state.scores == engine.scores
+
+    def test_undo_restores_every_position(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            state = PeggingState.from_cards(random_deal(rng))
+            positions = []
+            while not state.is_over():
+                positions.append((state.key(), list(state.scores), state.streak))
+                moves = state.legal_moves()
+                state.apply(rng.choice(moves))
+
+            for key, scores, streak in reversed(positions):
+                state.undo()
+                assert (state.key(), state.scores, state.streak) == (
+                    key,
+                    scores,
+                    streak,
+                )
+
+    def test_incremental_points(self):
+        """Test fifteens, pairs royal, runs and the go as cards are played."""
+        state = PeggingState([[4, 4, 9, 2], [4, 3, 1, 12]])
+        assert state.apply(4) == 0  # 5, count 5
+        assert state.apply(4) == 2  # 5 5, count 10
+        assert state.apply(4) == 2 + 6  # 15 and three fives
+        assert state.apply(3) == 0  # 4, count 19
+        assert state.apply(2) == 3  # 5 4 3 is a run, count 22
+        assert state.apply(1) == 4  # 5 4 3 2, count 24
+        # Neither ten card fits, so player 1 takes the go and the count resets
+        assert state.scores == [11, 7]
+        assert state.count == 0 and state.streak == 0
+
+    def test_go_and_last_card(self):
+        """Test that the go passes the turn and scores for the last player."""
+        # Player 0 leads a king, player 1 plays a queen; at 20 only player 0
+        # has a card that fits, then nobody can play
+        state = PeggingState([[12, 9], [11, 12]])
+        state.apply(12)
+        state.apply(11)
+        assert state.turn == 0 and state.legal_moves() == [9]
+        state.apply(9)
+        # 30: go to player 0 and a new count with player 1 to lead
+        assert state.scores == [1, 0]
+        assert state.count == 0 and state.turn == 1
+        state.apply(12)
+        assert state.is_over() and state.scores == [1, 1]
+
+    def test_equal_states_hash_alike(self):
+        first = PeggingState([[1, 2], [3, 4]])
+        second = PeggingState([[2, 1], [4, 3]], scores=(5, 0))
+        assert first == second and hash(first) == hash(second)
+        assert first != PeggingState([[1, 2], [3, 5]])
+        with pytest.raises(AttributeError):
+            first.anything = 1
+
+    def test_playout_plays_like_apply(self):
+        for seed, state in enumerate(random_states(random.Random(3), 200)):
+            played = state.copy()
+            rng = random.Random(seed)
+            while not played.is_over():
+                moves = played.legal_moves()
+                played.apply(moves[int(rng.random() * len(moves))])
+            copy = state.copy()
+            assert copy.playout(random.Random(seed)) == tuple(played.scores)
+            assert copy == played
+
+    def test_count_needs_last_player(self):
+        with pytest.raises(ValueError):
+            PeggingState([[1], [2]], count=10, sequence=[9])
+        state = PeggingState([[12], [11]], count=30, sequence=[9, 9, 9], last=0)
+        # Nobody can play on 30, so the go goes to the last player
+        assert state.scores == [1, 0]
+
+
+class TestPlayoutBatch:
+    def test_matches_outcome_chances(self):
+        """Test each position's batch of playouts against its exact outcomes."""
+        for seed, state in enumerate(random_states(random.Random(4), 6)):
+            chances = outcomes(state.copy())
+            results = playout_batch([state] * 4000, np.random.default_rng(seed))
+            found = Counter(map(tuple, results.tolist()))
+            assert set(found) <= set(chances)
+            for scores, chance in chances.items():
+                assert found[scores] / 4000 == pytest.approx(chance, abs=0.03)
+
+    def test_mixed_positions(self):
+        states = random_states(random.Random(5), 50)
+        states.append(PeggingState([[], []], scores=(3, 2)))
+        keys = [state.key() for state in states]
+        results = playout_batch(states, np.random.default_rng(0))
+        assert results.shape == (51, 2)
+        assert [state.key() for state in states] == keys
+        # A finished hand keeps its scores
+        assert results[-1].tolist() == [3, 2]
+        for state, scores in zip(states, results.tolist()):
+            assert tuple(scores) in outcomes(state.copy())
@@ -0,0 +1,90 @@
+import random
+import pytest
+from cribbage.agents import HeuristicAgent, RandomAgent
+from cribbage.game_engine import Agent, GameEngine
+from cribbage.game_log import GameRecorder, encode_game, read_header
+from cribbage.replay import replay
+
+STATE = ("scores", "dealer", "round_number", "winner", "hands", "kept", "discards")
+ROUND_STATE = ("crib", "starter", "count", "sequence", "played")
+
+
+class WatchedAgent(Agent):
+    """Records the event index and view of every decision it makes."""
+
+    def __init__(self, agent, recorder, decisions):
+        self.agent = agent
+        self.recorder = recorder
+        self.decisions = decisions
+
+    def select_discards(self, view):
+        self.decisions.append((len(self.recorder.events), view))
+        return self.agent.select_discards(view)
+
+    def select_play(self, view, playable):
+        self.decisions.append((len(self.recorder.events), view))
+        return self.agent.select_play(view, playable)
+
+
+def watched_game(seed, target_score=121):
+    rng = random.Random(seed)
+    recorder = GameRecorder()
+    decisions = []
+    agents = [
+        WatchedAgent(HeuristicAgent(rng=rng), recorder, decisions),
+        WatchedAgent(RandomAgent(rng), recorder, decisions),
+    ]
+    engine = GameEngine(agents, target_score, rng=rng)
+    engine.subscribe(recorder)
+    engine.play_game()
+    return engine, recorder.record(seed, target_score), decisions
+
+
+def state(engine):
+    return [getattr(engine, name) for name in STATE + ROUND_STATE]
+
+
+class TestReplay:
+    def test_every_decision(self):
+        """Test that replaying to each decision shows the player what they saw."""
+        for seed in range(3):
+            _, record, decisions = watched_game(seed)
+            payload = encode_game(record)
+            for index, view in decisions:
+                assert replay(record, index).view(view.player) == view
+                assert replay(payload, index).view(view.player) == view
+
+    def test_final_state(self):
+        engine, record, _ = watched_game(4)
+        for game in (record, encode_game(record)):
+            assert state(replay(game, len(record.events))) == state(engine)
+
+    def test_snapshots_match_a_full_replay(self):
+        """Test that starting from a round snapshot gives the same state."""
+        _, record, _ = watched_game(5, target_score=61)
+        payload = encode_game(record)
+        assert len(read_header(payload).snapshots) > 1
+        for index in range(len(record.events) + 1):
+            assert state(replay(payload, index)) == state(replay(record, index))
+
+    def test_agents_can_decide_again(self):
+        _, record, decisions = watched_game(6, target_score=31)
+        index, view = decisions[-1]
+        agent = HeuristicAgent(rng=random.Random(0))
+        engine = replay(record, index, agents=[agent, agent])
+        assert engine.agents[view.player] is agent
+        assert engine.view(view.player) == view
+
+    def test_index_outside_the_game(self):
+        _, record, _ = watched_game(7, target_score=31)
+        for game in (record, encode_game(record)):
+            with pytest.raises(IndexError):
+                replay(game, len(record.events) + 1)
+            with pytest.raises(IndexError):
+                replay(game, -1)
+
+    def test_default_agents_decide_nothing(self):
+        _, record, decisions = watched_game(7, target_score=31)
+        engine = replay(record, decisions[0][0])
+        with pytest.raises(RuntimeError):
+            engine.agents[0].select_discards(decisions[0][1])
@@ -0,0 +1,128 @@
+import random
+from itertools import combinations
+import numpy as np
+import pytest
+from cribbage.card_encoding import NUM_CARDS, id_to_card, ids_to_cards
+from cribbage.crib_ev import expected_crib_scores
+from cribbage.discard_analyzer import DiscardAnalyzer
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage.score_distribution import (
+    NUM_SCORES,
+    ScoreDistribution,
+    expected_score,
+    probability_at_least,
+    score_variance,
+)
+from cribbage.suit_isomorphism import relabel
+
+
+def reference_distribution(hands_and_cuts, crib):
+    """Score distribution of (hand ids, cut id) cases with the reference scorer."""
+    counts = np.zeros(NUM_SCORES)
+    for hand_ids, cut_id in hands_and_cuts:
+        counts[
+            HandScorer.score_hand(
+                Hand(ids_to_cards(hand_ids)), id_to_card(cut_id), crib
+            )
+        ] += 1
+    return counts / counts.sum()
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    ScoreDistribution.clear_cache()
+    yield
+    ScoreDistribution.clear_cache()
+
+
+class TestHandDistribution:
+    @pytest.mark.parametrize("crib", [False, True])
+    def test_matches_reference_scorer(self, crib):
+        rng = random.Random(1)
+        for hand_ids in [[4, 17, 30, 10], [0, 1, 2, 3], [9, 22, 35, 48]]:
+            seen = rng.sample([i for i in range(NUM_CARDS) if i not in hand_ids], 2)
+            cuts = [i for i in range(NUM_CARDS) if i not in hand_ids + seen]
+            expected = reference_distribution([(hand_ids, cut) for cut in cuts], crib)
+            assert ScoreDistribution.hand(hand_ids, seen, crib) == pytest.approx(
+                expected
+            )
+
+    def test_means_match_discard_analyzer(self):
+        """Test the kept hand means against the totals DiscardAnalyzer ranks by."""
+        deal = random.Random(2).sample(range(NUM_CARDS), 6)
+        keep_totals, _, _ = DiscardAnalyzer.deal_values(deal)
+        for total, discards in zip(keep_totals, combinations(deal, 2)):
+            kept = [card_id for card_id in deal if card_id not in discards]
+            distribution = ScoreDistribution.hand(kept, discards)
+            assert expected_score(distribution) == pytest.approx(total / 46)
+
+    def test_twenty_nine(self):
+        # Three fives and the jack of the fourth five's suit
+        distribution = ScoreDistribution.hand([4, 17, 30, 49])
+        assert distribution[29] == pytest.approx(1 / 48)
+        assert distribution[19] == 0
+
+    def test_suits_share_a_cache_entry(self):
+        hand, seen = [4, 17, 30, 10], [0, 51]
+        first = ScoreDistribution.hand(hand, seen)
+        suit_map = (2, 0, 3, 1)
+        second = ScoreDistribution.hand(
+            [relabel(card_id, suit_map) for card_id in hand],
+            [relabel(card_id, suit_map) for card_id in seen],
+        )
+        assert (first == second).all()
+        hand_info, _ = ScoreDistribution.cache_info()
+        assert (hand_info.hits, hand_info.misses) == (1, 1)
+
+    def test_rejects_bad_hands(self):
+        with pytest.raises(ValueError):
+            ScoreDistribution.hand([1, 2, 3])
+        with pytest.raises(ValueError):
+            ScoreDistribution.hand([1, 2, 3, 4], [4])
+
+
+class TestCribDistribution:
+    def test_matches_reference_scorer(self):
+        """Test a crib with most of the deck seen, so that few cribs are left."""
+        rng = random.Random(3)
+        discards = [10, 23]
+        seen = rng.sample([i for i in range(NUM_CARDS) if i not in discards], 34)
+        unseen = [i for i in range(NUM_CARDS) if i not in discards + seen]
+        cases = [
+            (discards + list(pair), cut)
+            for pair in combinations(unseen, 2)
+            for cut in unseen
+            if cut not in pair
+        ]
+        distribution = ScoreDistribution.crib(discards, seen)
+        assert distribution == pytest.approx(reference_distribution(cases, True))
+
+    def test_mean_matches_expected_crib(self):
+        deal = random.Random(4).sample(range(NUM_CARDS), 6)
+        discards, kept = deal[:2], deal[2:]
+        unseen = [i for i in range(NUM_CARDS) if i not in deal]
+        distribution = ScoreDistribution.crib(discards, kept)
+        assert expected_score(distribution) == pytest.approx(
+            expected_crib_scores(unseen, [tuple(discards)])[0]
+        )
+
+    def test_is_cached(self):
+        first = ScoreDistribution.crib([0, 13], [1, 2, 3, 4])
+        second = ScoreDistribution.crib([13, 0], [4, 3, 2, 1])
+        assert first is second
+        with pytest.raises(ValueError):
+            first[0] = 1
+
+
+class TestSummaries:
+    def test_summaries(self):
+        distribution = np.zeros(NUM_SCORES)
+        distribution[[2, 4, 12]] = [0.5, 0.25, 0.25]
+        assert expected_score(distribution) == 5.0
+        assert score_variance(distribution) == pytest.approx(
+            0.5 * 9 + 0.25 * 1 + 0.25 * 49
+        )
+        assert probability_at_least(distribution, 4) == 0.5
+        assert probability_at_least(distribution, 0) == 1.0
+        assert probability_at_least(distribution, 13) == 0.0
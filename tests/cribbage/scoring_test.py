@@ -0,0 +1,130 @@
+import random
+import pytest
+import numpy as np
+from itertools import combinations, combinations_with_replacement
+from cribbage import scoring
+from cribbage.cards import Card
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage.card_encoding import NUM_CARDS
+from cribbage.table_hand_scorer import TableHandScorer
+
+REFERENCE = scoring.ReferenceBackend()
+
+
+@pytest.fixture(scope="module")
+def table_scorer():
+    """Fixture that builds the lookup table once for the whole module."""
+    return TableHandScorer.build()
+
+
+@pytest.fixture(params=sorted(scoring.BACKENDS))
+def backend(request, table_scorer):
+    """Fixture that provides each scoring backend in turn."""
+    if request.param == "table":
+        return scoring.TableBackend(table_scorer)
+    return scoring.BACKENDS[request.param]()
+
+
+def random_deals(count, seed=1234):
+    """Seeded (hands, cuts) arrays, a fifth of them single suit hands."""
+    rng = random.Random(seed)
+    hands, cuts = [], []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            suit = rng.randrange(4)
+            ids = rng.sample(range(suit * 13, suit * 13 + 13), 4)
+            cut_id = rng.choice([i for i in range(NUM_CARDS) if i not in ids])
+        else:
+            *ids, cut_id = rng.sample(range(NUM_CARDS), 5)
+        hands.append(ids)
+        cuts.append(cut_id)
+    return np.array(hands), np.array(cuts)
+
+
+def rank_multiset_deals():
+    """One deal for every distinct set of five ranks, with each card as the cut."""
+    hands, cuts = [], []
+    for ranks in combinations_with_replacement(range(13), 5):
+        if any(ranks.count(rank) > 4 for rank in ranks):
+            continue
+        card_ids = tuple(
+            ranks[:index].count(rank) * 13 + rank for index, rank in enumerate(ranks)
+        )
+        for cut_index in range(5):
+            hands.append(card_ids[:cut_index] + card_ids[cut_index + 1 :])
+            cuts.append(card_ids[cut_index])
+    return np.array(hands), np.array(cuts)
+
+
+def assert_agrees_with_reference(backend, hands, cuts, crib):
+    expected = [REFERENCE.score_ids(hand, cut, crib) for hand, cut in zip(hands, cuts)]
+    assert [
+        backend.score_ids(hand, cut, crib) for hand, cut in zip(hands, cuts)
+    ] == expected
+    assert backend.score_batch(hands, cuts, crib).tolist() == expected
+
+
+class TestBackends:
+    @pytest.mark.parametrize("crib", [False, True])
+    def test_random_hands(self, backend, crib):
+        """Test each backend, one at a time and batched, on a seeded sample."""
+        hands, cuts = random_deals(3000)
+        assert_agrees_with_reference(backend, hands, cuts, crib)
+
+    def test_every_rank_multiset(self, backend):
+        """Test all 6,175 sets of five ranks with each card as the cut."""
+        hands, cuts = rank_multiset_deals()
+        assert len(hands) == 5 * 6175
+        expected = [REFERENCE.score_ids(hand, cut) for hand, cut in zip(hands, cuts)]
+        assert backend.score_batch(hands, cuts).tolist() == expected
+
+    def test_batch_rejects_bad_shapes(self, backend):
+        with pytest.raises(ValueError):
+            backend.score_batch(np.zeros((3, 5), dtype=int), np.zeros(3, dtype=int))
+
+    @pytest.mark.slow
+    def test_every_hand_and_cut(self, table_scorer):
+        """Test every backend on all 270,725 hands with each of their 48 cuts."""
+        backends = [scoring.TableBackend(table_scorer), scoring.NumpyBackend()]
+        for hand_ids in combinations(range(NUM_CARDS), 4):
+            cuts = np.array([card for card in range(NUM_CARDS) if card not in hand_ids])
+            hands = np.tile(hand_ids, (len(cuts), 1))
+            for crib in (False, True):
+                expected = [
+                    REFERENCE.score_ids(hand_ids, cut, crib) for cut in cuts.tolist()
+                ]
+                for backend in backends:
+                    assert backend.score_batch(hands, cuts, crib).tolist() == expected
+
+
+class TestScoreHand:
+    def test_uses_named_backend(self):
+        hand = Hand([Card("5", "H"), Card("5", "D"), Card("5", "C"), Card("J", "S")])
+        for name in scoring.BACKENDS:
+            assert scoring.score_hand(hand, Card("5", "S"), backend=name) == 29
+
+    def test_other_hand_sizes_use_reference(self):
+        hand = Hand([Card("5", "H"), Card("10", "S")])
+        cut_card = Card("5", "D")
+        assert scoring.score_hand(hand, cut_card) == HandScorer.score_hand(
+            hand, cut_card
+        )
+
+    def test_default_backend(self, monkeypatch):
+        monkeypatch.setattr(scoring, "_default_name", scoring.DEFAULT_BACKEND)
+        scoring.set_default_backend("reference")
+        assert isinstance(scoring.get_backend(), scoring.ReferenceBackend)
+        assert scoring.get_backend("numpy") is scoring.get_backend("numpy")
+
+        with pytest.raises(ValueError):
+            scoring.set_default_backend("abacus")
+        with pytest.raises(ValueError):
+            scoring.get_backend("abacus")
+
+    def test_backends_must_score_ids(self):
+        class Unfinished(scoring.ScoringBackend):
+            name = "unfinished"
+
+        with pytest.raises(TypeError):
+            Unfinished()
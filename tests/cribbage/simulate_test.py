@@ -0,0 +1,68 @@
+import pytest
+from cribbage.cli import main
+from cribbage.simulate import play_game, round_stats, simulate, wilson_interval
+
+
+class TestWilsonInterval:
+    def test_known_values(self):
+        low, high = wilson_interval(50, 100)
+        assert low == pytest.approx(0.4038, abs=1e-4)
+        assert high == pytest.approx(0.5962, abs=1e-4)
+
+    def test_bounds(self):
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+        low, high = wilson_interval(10, 10)
+        assert 0.6 < low < high == 1.0
+
+
+class TestSimulate:
+    def test_results_do_not_depend_on_workers(self):
+        """Test that splitting games across processes gives the same wins."""
+        serial = simulate(["random", "random"], 12, seed=3, workers=1, chunk_size=5)
+        parallel = simulate(["random", "random"], 12, seed=3, workers=2, chunk_size=5)
+        assert serial.wins == parallel.wins
+        assert sum(serial.wins) == serial.games == 12
+
+    def test_game_replays_from_seed_and_index(self):
+        """Test that a single game can be replayed event for event."""
+        first, second = [], []
+        winner = play_game(["heuristic", "random"], 5, 17, 61, first.append)
+        assert play_game(["heuristic", "random"], 5, 17, 61, second.append) == winner
+        assert first == second
+
+        other = []
+        play_game(["heuristic", "random"], 5, 18, 61, other.append)
+        assert other != first
+
+    def test_rejects_unknown_agent(self):
+        with pytest.raises(ValueError):
+            simulate(["random", "genius"], 1)
+
+    def test_cli_reports_win_rates(self, capsys):
+        main(["simulate", "--games", "4", "--workers", "1", "--target-score", "31"])
+        output = capsys.readouterr().out
+        assert "4 games" in output
+        assert "95% CI" in output
+
+
+class TestRoundStats:
+    def test_results_do_not_depend_on_workers(self):
+        serial = round_stats(
+            ["random", "heuristic"], 12, seed=2, workers=1, chunk_size=5
+        )
+        parallel = round_stats(
+            ["random", "heuristic"], 12, seed=2, workers=2, chunk_size=5
+        )
+        assert serial.rounds == 12
+        for name in ("pegging", "pone_hand", "dealer_hand", "crib", "dealer_show"):
+            assert (getattr(serial, name) == getattr(parallel, name)).all()
+
+    def test_every_round_is_counted(self):
+        stats = round_stats(["heuristic", "heuristic"], 20, workers=1)
+        assert stats.pegging.sum() == stats.crib.sum() == stats.dealer_show.sum() == 20
+        # The last card always scores
+        assert stats.pegging[0, 0] == 0
+
+    def test_rejects_unknown_agent(self):
+        with pytest.raises(ValueError):
+            round_stats(["random", "genius"], 1)
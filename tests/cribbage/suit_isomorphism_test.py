@@ -0,0 +1,147 @@
+import random
+import numpy as np
+from itertools import combinations, permutations
+from cribbage.cards import Card
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage.card_encoding import (
+    NUM_CARDS,
+    card_id,
+    id_to_card,
+    ids_to_cards,
+    mask_to_ids,
+)
+from cribbage.suit_isomorphism import (
+    CUT_SHIFT,
+    canonical_hand,
+    canonical_hand_and_cut,
+    canonical_hand_and_cut_batch,
+    canonical_sets,
+    canonical_suits,
+    canonical_suits_batch,
+    invert,
+    relabel,
+    restore,
+)
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def random_hands_and_cuts(count, seed=3):
+    rng = random.Random(seed)
+    deals = [rng.sample(range(NUM_CARDS), 5) for _ in range(count)]
+    # Plenty of flushes, so the cut's suit matters
+    for deal in deals[::4]:
+        deal[:4] = rng.sample(range(13), 4)
+        deal[4] = rng.choice([13 * rng.randrange(4) + rank for rank in range(13)])
+        while deal[4] in deal[:4]:
+            deal[4] = rng.randrange(NUM_CARDS)
+    return [(deal[:4], deal[4]) for deal in deals]
+
+
+class TestCanonicalSuits:
+    def test_relabelled_sets_share_a_key(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            card_ids = rng.sample(range(NUM_CARDS), 6)
+            key, _ = canonical_suits(card_ids)
+            for suit_map in SUIT_PERMUTATIONS:
+                relabelled = [relabel(card, suit_map) for card in card_ids]
+                assert canonical_suits(relabelled)[0] == key
+
+    def test_suit_map_gives_the_canonical_cards(self):
+        card_ids = [
+            card_id(rank, suit)
+            for rank, suit in [("5", "H"), ("5", "S"), ("J", "D"), ("K", "C")]
+        ]
+        key, suit_map = canonical_suits(card_ids)
+        assert sorted(relabel(card, suit_map) for card in card_ids) == mask_to_ids(key)
+        assert sorted(restore(mask_to_ids(key), suit_map)) == sorted(card_ids)
+
+    def test_canonical_sets(self):
+        """Test the enumeration against canonicalizing every set of 3 cards."""
+        expected = {
+            canonical_suits(cards)[0] for cards in combinations(range(NUM_CARDS), 3)
+        }
+        assert canonical_sets(3) == sorted(expected)
+        # Counts of 2 and 4 card sets up to suits, by Burnside's lemma
+        assert len(canonical_sets(2)) == 169
+        assert len(canonical_sets(4)) == 16432
+
+    def test_invert(self):
+        for suit_map in SUIT_PERMUTATIONS:
+            inverse = invert(suit_map)
+            assert all(
+                relabel(relabel(card, suit_map), inverse) == card
+                for card in range(NUM_CARDS)
+            )
+
+
+class TestCanonicalHandAndCut:
+    def test_relabelled_hands_share_a_key_and_score(self):
+        for hand_ids, cut_id in random_hands_and_cuts(300):
+            key, suit_map = canonical_hand_and_cut(hand_ids, cut_id)
+            canonical_hand_ids = mask_to_ids(key & ((1 << CUT_SHIFT) - 1))
+            canonical_cut = key >> CUT_SHIFT
+            assert canonical_hand_ids == sorted(
+                relabel(card, suit_map) for card in hand_ids
+            )
+            assert canonical_cut == relabel(cut_id, suit_map)
+
+            for crib in (False, True):
+                assert HandScorer.score_hand(
+                    Hand(ids_to_cards(hand_ids)), id_to_card(cut_id), crib
+                ) == HandScorer.score_hand(
+                    Hand(ids_to_cards(canonical_hand_ids)),
+                    id_to_card(canonical_cut),
+                    crib,
+                )
+
+            for other_map in SUIT_PERMUTATIONS[::5]:
+                assert (
+                    canonical_hand_and_cut(
+                        [relabel(card, other_map) for card in hand_ids],
+                        relabel(cut_id, other_map),
+                    )[0]
+                    == key
+                )
+
+    def test_cut_suit_is_kept_apart(self):
+        """Test that a flush hand is told apart by whether the cut matches it."""
+        hand_ids = [card_id(rank, "H") for rank in ("2", "5", "9", "Q")]
+        matching = canonical_hand_and_cut(hand_ids, card_id("K", "H"))[0]
+        other = canonical_hand_and_cut(hand_ids, card_id("K", "S"))[0]
+        assert matching != other
+        assert other == canonical_hand_and_cut(hand_ids, card_id("K", "C"))[0]
+
+    def test_cards(self):
+        first = Hand([Card("5", "H"), Card("5", "S"), Card("J", "D"), Card("K", "C")])
+        second = Hand([Card("5", "C"), Card("5", "D"), Card("J", "S"), Card("K", "H")])
+        assert canonical_hand(first)[0] == canonical_hand(second)[0]
+        assert (
+            canonical_hand(first, Card("4", "D"))[0]
+            == canonical_hand(second, Card("4", "S"))[0]
+        )
+        assert (
+            canonical_hand(first, Card("4", "D"))[0]
+            != canonical_hand(second, Card("4", "D"))[0]
+        )
+
+
+class TestBatch:
+    def test_batch_matches_one_at_a_time(self):
+        deals = random_hands_and_cuts(2000, seed=4)
+        hands = np.array([hand for hand, _ in deals])
+        cuts = np.array([cut for _, cut in deals])
+
+        keys, suit_maps = canonical_suits_batch(hands)
+        assert [
+            (key, tuple(suit_map))
+            for key, suit_map in zip(keys.tolist(), suit_maps.tolist())
+        ] == [canonical_suits(hand) for hand, _ in deals]
+
+        keys, suit_maps = canonical_hand_and_cut_batch(hands, cuts)
+        assert [
+            (key, tuple(suit_map))
+            for key, suit_map in zip(keys.tolist(), suit_maps.tolist())
+        ] == [canonical_hand_and_cut(hand, cut) for hand, cut in deals]
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+import pytest
+from cribbage import discard_analyzer
+from cribbage.crib_ev import CribEVTable
+from cribbage.discard_analyzer import DiscardTable
+from cribbage.pegging_table import NUM_HANDS, PeggingTable
+from cribbage.table_file import (
+    CACHE_DIRECTORY_VARIABLE,
+    MappedTable,
+    atomic_write,
+    cache_directory,
+)
+from cribbage.table_hand_scorer import TableHandScorer
+from cribbage.win_probability import RoundStats, WinProbabilityTable
+
+
+def small_tables():
+    """One small instance of every table class."""
+    stats = RoundStats()
+    stats.record(3, 4, 8, 6, 5)
+    return [
+        TableHandScorer.build(),
+        CribEVTable(np.arange(2 * 1326, dtype=float).reshape(2, 1326)),
+        DiscardTable(
+            np.array([1, 5], dtype="<u8"),
+            np.zeros(2, dtype=discard_analyzer._RECORD),
+        ),
+        PeggingTable(np.ones((2, NUM_HANDS)), 7),
+        WinProbabilityTable.build(stats, target_score=11),
+    ]
+
+
+class TestMappedTable:
+    @pytest.mark.parametrize("table", small_tables(), ids=lambda t: type(t).__name__)
+    def test_save_load_and_close(self, table, tmp_path):
+        path = str(tmp_path / "nested" / table.FILE_NAME)
+        table.save(path)
+        assert not os.path.exists(f"{path}.tmp")
+
+        with type(table).load(path) as loaded:
+            assert loaded._source is not None
+            with open(path, "rb") as file:
+                saved = file.read()
+            other = str(tmp_path / "again.bin")
+            loaded.save(other)
+            with open(other, "rb") as file:
+                assert file.read() == saved
+        assert loaded._source is None
+        loaded.close()
+
+    @pytest.mark.parametrize(
+        "table_class",
+        [TableHandScorer, CribEVTable, DiscardTable, PeggingTable, WinProbabilityTable],
+    )
+    def test_load_rejects_other_files(self, table_class, tmp_path):
+        for contents in (b"", b"CRIB", b"CRIBXX01" + bytes(64)):
+            path = tmp_path / "other.bin"
+            path.write_bytes(contents)
+            with pytest.raises(ValueError):
+                table_class.load(str(path))
+
+    def test_truncated_file(self, tmp_path):
+        path = str(tmp_path / "pegging.bin")
+        PeggingTable(np.ones((2, NUM_HANDS)), 7).save(path)
+        with open(path, "r+b") as file:
+            file.truncate(100)
+        with pytest.raises(ValueError):
+            PeggingTable.load(path)
+
+    def test_failed_write_keeps_the_old_file(self, tmp_path):
+        path = str(tmp_path / "table.bin")
+        with atomic_write(path) as file:
+            file.write(b"old")
+        with pytest.raises(RuntimeError):
+            with atomic_write(path) as file:
+                file.write(b"new")
+                raise RuntimeError
+        with open(path, "rb") as file:
+            assert file.read() == b"old"
+        assert os.listdir(tmp_path) == ["table.bin"]
+
+    def test_tables_must_implement_the_hooks(self):
+        class NoLoad(MappedTable):
+            def _write_data(self, file):
+                pass
+
+        with pytest.raises(TypeError):
+            NoLoad()
+
+    def test_cache_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+        assert cache_directory() == str(tmp_path)
+        assert PeggingTable.default_path() == str(tmp_path / "pegging_table.bin")
+        monkeypatch.delenv(CACHE_DIRECTORY_VARIABLE)
+        assert cache_directory() == os.path.join(
+            os.path.expanduser("~"), ".cache", "cribbage"
+        )
+
+    def test_default(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+        PeggingTable.reset_default()
+        try:
+            assert PeggingTable.default() is None
+            PeggingTable(np.ones((2, NUM_HANDS)), 7).save(PeggingTable.default_path())
+            # A missing table is not looked for again until the default is reset
+            assert PeggingTable.default() is None
+            PeggingTable.reset_default()
+            table = PeggingTable.default()
+            assert table.samples == 7 and PeggingTable.default() is table
+
+            PeggingTable.reset_default()
+            assert table._source is None
+        finally:
+            PeggingTable.reset_default()
+
+    def test_default_built_on_demand(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+        TableHandScorer.reset_default()
+        try:
+            scorer = TableHandScorer.default()
+            assert os.path.exists(tmp_path / TableHandScorer.FILE_NAME)
+            TableHandScorer.reset_default()
+            loaded = TableHandScorer.default()
+            assert loaded._source is not None
+            assert bytes(loaded.table) == bytes(scorer.table)
+        finally:
+            TableHandScorer.reset_default()
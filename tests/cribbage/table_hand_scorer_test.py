@@ -0,0 +1,158 @@
+import os
+import random
+import pytest
+from itertools import combinations, combinations_with_replacement
+from cribbage.cards import Card
+from cribbage.hand import Hand
+from cribbage.hand_scorer import HandScorer
+from cribbage import hand_report
+from cribbage.card_encoding import NUM_CARDS, id_to_card
+from cribbage.hand_report import NUM_HANDS
+from cribbage.table_hand_scorer import TableHandScorer
+
+
+@pytest.fixture(scope="module")
+def table_scorer():
+    """Fixture that builds the lookup table once for the whole module."""
+    return TableHandScorer.build()
+
+
+def reference_score(hand_ids, cut_id, crib):
+    hand = Hand([id_to_card(card_id) for card_id in hand_ids])
+    return HandScorer.score_hand(hand, id_to_card(cut_id), crib)
+
+
+class TestTableHandScorer:
+    def test_known_hands(self, table_scorer):
+        """Test a few well known hands against their published scores."""
+        hand = Hand([Card("5", "H"), Card("5", "D"), Card("5", "C"), Card("J", "S")])
+        assert table_scorer.score_hand(hand, Card("5", "S")) == 29
+
+        hand = Hand([Card("10", "H"), Card("J", "H"), Card("Q", "H"), Card("K", "H")])
+        assert table_scorer.score_hand(hand, Card("A", "H")) == 10
+
+        hand = Hand([Card("A", "H"), Card("A", "S"), Card("2", "D"), Card("2", "C")])
+        assert table_scorer.score_hand(hand, Card("3", "C")) == 16
+
+    def test_crib_flush_rules(self, table_scorer):
+        """Test that a 4 card flush only counts in the crib with a matching cut."""
+        hand = Hand([Card("2", "H"), Card("5", "H"), Card("9", "H"), Card("K", "H")])
+        assert table_scorer.score_hand(hand, Card("A", "S")) == 4 + 4
+        assert table_scorer.score_hand(hand, Card("A", "S"), crib=True) == 4
+        assert table_scorer.score_hand(hand, Card("A", "H"), crib=True) == 5 + 4
+
+    def test_falls_back_for_other_hand_sizes(self, table_scorer):
+        """Test that hands that are not 4 cards are scored by HandScorer."""
+        hand = Hand([Card("5", "H"), Card("10", "S")])
+        cut_card = Card("5", "D")
+        assert table_scorer.score_hand(hand, cut_card) == HandScorer.score_hand(
+            hand, cut_card
+        )
+
+    def test_every_rank_multiset(self, table_scorer):
+        """Test every distinct set of five ranks against the reference scorer."""
+        checked = 0
+        for ranks in combinations_with_replacement(range(13), 5):
+            if any(ranks.count(rank) > 4 for rank in ranks):
+                continue
+            # Give repeated ranks different suits so the cards are distinct
+            hand_ids = tuple(
+                ranks[:index].count(rank) * 13 + rank
+                for index, rank in enumerate(ranks)
+            )
+            for cut_index in range(5):
+                cut_id = hand_ids[cut_index]
+                kept = hand_ids[:cut_index] + hand_ids[cut_index + 1 :]
+                assert table_scorer.score_ids(kept, cut_id) == reference_score(
+                    kept, cut_id, False
+                )
+            checked += 1
+
+        assert checked == 6175
+
+    def test_random_hands_agree_with_reference(self, table_scorer):
+        """Test a seeded sample of hands, including flushes and nobs."""
+        rng = random.Random(1234)
+        for _ in range(20000):
+            if rng.random() < 0.2:
+                # Force single suit hands so flushes are well covered
+                suit = rng.randrange(4)
+                ids = rng.sample(range(suit * 13, suit * 13 + 13), 4)
+                cut_id = rng.choice([i for i in range(NUM_CARDS) if i not in ids])
+            else:
+                *ids, cut_id = rng.sample(range(NUM_CARDS), 5)
+            for crib in (False, True):
+                assert table_scorer.score_ids(ids, cut_id, crib) == reference_score(
+                    ids, cut_id, crib
+                )
+
+    def test_save_and_load_with_mmap(self, table_scorer, tmp_path):
+        """Test that a saved table loads back with identical contents."""
+        path = str(tmp_path / "hand_table.bin")
+        table_scorer.save(path)
+
+        loaded = TableHandScorer.load(path)
+        try:
+            assert bytes(loaded.table) == bytes(table_scorer.table)
+            hand = Hand(
+                [Card("5", "H"), Card("5", "D"), Card("5", "C"), Card("J", "S")]
+            )
+            assert loaded.score_hand(hand, Card("5", "S")) == 29
+        finally:
+            loaded.close()
+
+    def test_load_rejects_other_files(self, tmp_path):
+        """Test that a file without the table header is rejected."""
+        path = tmp_path / "not_a_table.bin"
+        path.write_bytes(b"\x00" * 128)
+        with pytest.raises(ValueError):
+            TableHandScorer.load(str(path))
+
+    def test_load_or_build_persists_table(self, tmp_path):
+        """Test that the table is written on first use and reused afterwards."""
+        path = str(tmp_path / "cache" / "hand_table.bin")
+        built = TableHandScorer.load_or_build(path)
+        assert os.path.exists(path)
+
+        loaded = TableHandScorer.load_or_build(path)
+        try:
+            assert bytes(loaded.table) == bytes(built.table)
+        finally:
+            loaded.close()
+
+    def test_spread_of_hands_agrees_with_reference(self, table_scorer):
+        """Test 8 slices of 1000 hands spread over all of them, as hand and crib.
+
+        Every case is checked against HandScorer.score_breakdown_batch, and
+        against HandScorer.score_hand once per suit symmetry class, as in the
+        hand report. Later slices hold no class's canonical case, so every
+        50th hand of each slice is also checked with every cut.
+        """
+        hands = list(combinations(range(NUM_CARDS), 4))
+        reference_cases = 0
+        for start in range(0, NUM_HANDS, NUM_HANDS // 8)[:8]:
+            for crib in (False, True):
+                _, _, mismatches, cases, reference_mismatches = (
+                    hand_report._chunk_report((start, start + 1000, crib))
+                )
+                assert mismatches == 0 and reference_mismatches == 0
+                reference_cases += cases
+
+                for hand_ids in hands[start : start + 1000 : 50]:
+                    for cut_id in set(range(NUM_CARDS)) - set(hand_ids):
+                        assert table_scorer.score_ids(
+                            hand_ids, cut_id, crib
+                        ) == reference_score(hand_ids, cut_id, crib)
+        assert reference_cases > 0
+
+    @pytest.mark.slow
+    def test_every_hand_and_cut_agrees_with_reference(self, table_scorer):
+        """Test all 270,725 hands with each of their 48 cuts, as hand and crib."""
+        for hand_ids in combinations(range(NUM_CARDS), 4):
+            for cut_id in range(NUM_CARDS):
+                if cut_id in hand_ids:
+                    continue
+                for crib in (False, True):
+                    assert table_scorer.score_ids(
+                        hand_ids, cut_id, crib
+                    ) == reference_score(hand_ids, cut_id, crib)
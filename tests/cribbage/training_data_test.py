@@ -0,0 +1,175 @@
+import json
+import os
+import numpy as np
+import pytest
+from itertools import combinations
+from cribbage.card_encoding import card_to_id
+from cribbage.discard_analyzer import DiscardAnalyzer
+from cribbage.game_log import read_frames, read_games
+from cribbage.hand import Hand
+from cribbage.replay import replay
+from cribbage.simulate import simulate
+from cribbage.training_data import (
+    COUNT,
+    DISCARDING,
+    FEATURE_SCALE,
+    HAND,
+    IS_DEALER,
+    MANIFEST,
+    NUM_FEATURES,
+    OWN_POINTS_NEEDED,
+    PEGGING_REASONS,
+    SEQUENCE,
+    TrainingDataset,
+    build_dataset,
+    game_positions,
+    view_features,
+)
+
+
+@pytest.fixture(scope="module")
+def game_log(tmp_path_factory):
+    """Fixture that records a few short games."""
+    path = str(tmp_path_factory.mktemp("logs") / "games.log")
+    simulate(
+        ["heuristic", "random"], 4, seed=3, workers=1, target_score=61, record_path=path
+    )
+    return path
+
+
+@pytest.fixture(scope="module")
+def dataset(game_log, tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("dataset"))
+    return build_dataset([game_log], directory, workers=1, shard_size=100)
+
+
+class TestGamePositions:
+    def test_one_position_per_decision(self, game_log):
+        payload = next(read_frames(game_log))
+        record = next(read_games(game_log))
+        positions = game_positions(payload)
+
+        decisions = [
+            index
+            for index, event in enumerate(record.events)
+            if event.kind in ("discard", "play")
+        ]
+        assert positions.features.shape == (len(decisions), NUM_FEATURES)
+        for row, index in enumerate(decisions):
+            event = record.events[index]
+            view = replay(record, index).view(event.player)
+            assert np.array_equal(positions.features[row], view_features(view))
+            assert positions.features[row, DISCARDING] == (event.kind == "discard")
+
+            winner_side = 1 if event.player == record.winner else -1
+            assert np.sign(positions.point_differential[row]) == winner_side
+
+    def test_discard_ev(self, game_log):
+        """Test that each discard's values are rank_discards' in sorted card order."""
+        record = next(read_games(game_log))
+        positions = game_positions(next(read_frames(game_log)))
+        discards = positions.features[:, DISCARDING] == 1
+        assert np.isnan(positions.discard_ev[~discards]).all()
+
+        index = next(
+            i for i, event in enumerate(record.events) if event.kind == "discard"
+        )
+        view = replay(record, index).view(record.events[index].player)
+        cards = sorted(view.hand, key=card_to_id)
+        expected = dict(
+            (tuple(map(card_to_id, discard)), score)
+            for discard, score in DiscardAnalyzer.rank_discards(
+                Hand(cards), view.dealer == view.player, "table"
+            )
+        )
+        assert positions.discard_ev[0].tolist() == pytest.approx(
+            [
+                expected[tuple(sorted(map(card_to_id, discard)))]
+                for discard in combinations(cards, 2)
+            ]
+        )
+
+    def test_pegging_differential(self, game_log):
+        """Test it against the pegging points scored between each play and the
+        end of its round."""
+        for payload, record in zip(read_frames(game_log), read_games(game_log)):
+            positions = game_positions(payload)
+            decisions = [
+                index
+                for index, event in enumerate(record.events)
+                if event.kind in ("discard", "play")
+            ]
+            for row, index in enumerate(decisions):
+                event = record.events[index]
+                if event.kind == "discard":
+                    assert np.isnan(positions.pegging_differential[row])
+                    continue
+                expected = 0
+                for later in record.events[index:]:
+                    if later.kind == "round_end":
+                        break
+                    if later.kind == "score" and later.reason in PEGGING_REASONS:
+                        sign = 1 if later.player == event.player else -1
+                        expected += sign * later.points
+                assert positions.pegging_differential[row] == expected
+
+    def test_view_features(self, game_log):
+        record = next(read_games(game_log))
+        index = max(i for i, event in enumerate(record.events) if event.kind == "play")
+        view = replay(record, index).view(record.events[index].player)
+        features = view_features(view)
+
+        assert features[HAND : HAND + 52].sum() == len(view.hand)
+        assert features[SEQUENCE : SEQUENCE + 52].sum() == len(view.sequence)
+        assert features[IS_DEALER] == (view.dealer == view.player)
+        assert features[OWN_POINTS_NEEDED] == 61 - view.scores[view.player]
+        assert features[COUNT] == view.count
+
+
+class TestTrainingDataset:
+    def test_shards(self, game_log, dataset):
+        expected = sum(
+            game_positions(payload).size for payload in read_frames(game_log)
+        )
+        assert len(dataset) == expected
+        assert [shard.size for shard in dataset.shards[:-1]] == [100] * (
+            len(dataset.shards) - 1
+        )
+        assert isinstance(dataset.shards[0].features, np.memmap)
+
+    def test_rejects_older_datasets(self, dataset, tmp_path):
+        with open(os.path.join(dataset.directory, MANIFEST)) as file:
+            manifest = json.load(file)
+        del manifest["arrays"]
+        with open(tmp_path / MANIFEST, "w") as file:
+            json.dump(manifest, file)
+        with pytest.raises(ValueError):
+            TrainingDataset(str(tmp_path))
+
+    def test_batches_cover_an_epoch(self, dataset):
+        batches = list(dataset.batches(64, seed=1))
+        assert all(batch.size == 64 for batch in batches[:-1])
+        assert sum(batch.size for batch in batches) == len(dataset)
+
+        everything = dataset.rows(np.arange(len(dataset)))
+        seen = np.concatenate([batch.features for batch in batches])
+        assert sorted(map(bytes, seen)) == sorted(map(bytes, everything.features))
+        assert everything.features.dtype == np.float32
+        assert everything.features.max() <= 1
+
+    def test_batches_are_shuffled_by_seed(self, dataset):
+        first = [batch.point_differential for batch in dataset.batches(32, seed=5)]
+        again = [batch.point_differential for batch in dataset.batches(32, seed=5)]
+        other = [batch.point_differential for batch in dataset.batches(32, seed=6)]
+        assert all(np.array_equal(a, b) for a, b in zip(first, again))
+        assert not all(np.array_equal(a, b) for a, b in zip(first, other))
+        assert len(list(dataset.batches(64, drop_last=True))) == len(dataset) // 64
+
+    def test_rows_are_scaled(self, dataset):
+        stored = dataset.shards[1].features[:5]
+        rows = dataset.rows(np.arange(100, 105))
+        assert np.allclose(rows.features, stored * FEATURE_SCALE)
+
+    def test_reopen(self, dataset):
+        reopened = TrainingDataset(dataset.directory)
+        assert len(reopened) == len(dataset)
@@ -0,0 +1,209 @@
+import random
+from functools import lru_cache
+import numpy as np
+import pytest
+from cribbage.agents import HeuristicAgent, WinProbabilityAgent
+from cribbage.card_encoding import ids_to_cards
+from cribbage.game_engine import GameEngine, PlayerView
+from cribbage.simulate import round_stats
+from cribbage.win_probability import (
+    HAND_SIZE,
+    PEGGING_SIZE,
+    SHOW_SIZE,
+    RoundStats,
+    WinProbabilityTable,
+    shift_distribution,
+)
+
+
+def small_stats(seed=0, rounds=300):
+    """Made up round statistics with a few outcomes each."""
+    rng = np.random.default_rng(seed)
+    stats = RoundStats()
+    for _ in range(rounds):
+        stats.record(
+            int(rng.integers(0, 4)),
+            int(rng.integers(1, 5)),
+            int(rng.choice([0, 2, 4, 7])),
+            int(rng.choice([0, 3, 6])),
+            int(rng.choice([0, 2, 5])),
+        )
+    return stats
+
+
+def reference_start(stats, target):
+    """The chance that the pone wins, by recursion over the rules."""
+    pegging = stats.pegging / stats.pegging.sum()
+    pone_hand = stats.pone_hand / stats.pone_hand.sum()
+    dealer_show = stats.dealer_show / stats.dealer_show.sum()
+
+    @lru_cache(maxsize=None)
+    def start(pone, dealer):
+        chance = 0.0
+        for (x, y), peg in np.ndenumerate(pegging):
+            if not peg:
+                continue
+            if pone + x >= target:
+                chance += peg
+                continue
+            if dealer + y >= target:
+                continue
+            for hand, hand_chance in enumerate(pone_hand):
+                if not hand_chance:
+                    continue
+                if pone + x + hand >= target:
+                    chance += peg * hand_chance
+                    continue
+                for show, show_chance in enumerate(dealer_show):
+                    if show_chance and dealer + y + show < target:
+                        next_start = start(dealer + y + show, pone + x + hand)
+                        chance += peg * hand_chance * show_chance * (1 - next_start)
+        return chance
+
+    return start
+
+
+@pytest.fixture(scope="module")
+def table_31():
+    return WinProbabilityTable.build(
+        round_stats(["heuristic", "heuristic"], 300, workers=1), 31
+    )
+
+
+def deal_view(card_ids, scores, dealer=0, target_score=31):
+    return PlayerView(
+        player=0,
+        dealer=dealer,
+        scores=scores,
+        target_score=target_score,
+        hand=tuple(ids_to_cards(card_ids)),
+        kept=(),
+        discards=(),
+        starter=None,
+        count=0,
+        sequence=(),
+        played=(),
+        opponent_cards_left=6,
+    )
+
+
+class TestRoundStats:
+    def test_record(self):
+        stats = RoundStats()
+        stats.record(3, 100, 12, 20, 29)
+        assert stats.rounds == 1
+        assert stats.pegging[3, PEGGING_SIZE - 1] == 1
+        assert stats.dealer_show[49] == 1
+
+    def test_update(self):
+        stats = small_stats(1, 10)
+        stats.update(small_stats(2, 15))
+        assert stats.rounds == 25
+        assert stats.pegging.sum() == stats.dealer_show.sum() == 25
+
+    def test_rejects_wrong_shapes(self):
+        with pytest.raises(ValueError):
+            RoundStats(pone_hand=np.zeros(HAND_SIZE + 1))
+
+
+class TestWinProbabilityTable:
+    def test_matches_recursion(self):
+        stats = small_stats()
+        table = WinProbabilityTable.build(stats, 25)
+        start = reference_start(stats, 25)
+        for pone, dealer in [(0, 0), (10, 3), (20, 20), (24, 0), (0, 24), (18, 22)]:
+            assert table.start[pone, dealer] == pytest.approx(start(pone, dealer))
+
+    def test_deterministic_rounds(self):
+        """Test a game where every round scores the same, worked out by hand."""
+        stats = RoundStats()
+        stats.record(1, 1, 2, 3, 0)
+        table = WinProbabilityTable.build(stats, 10)
+        # 0-0, 3-4, 7-7 and the first pone counts out in the third round
+        assert table.win_probability(0, 0, False) == 1
+        # The dealer pegs out first from 8-9
+        assert table.start[8, 9] == 0
+        assert table.start[9, 9] == 1
+
+    def test_sides_agree(self):
+        table = WinProbabilityTable.build(small_stats(), 25)
+        for mine, theirs in [(0, 0), (5, 17), (24, 23)]:
+            assert table.win_probability(mine, theirs, True) == pytest.approx(
+                1 - table.win_probability(theirs, mine, False)
+            )
+        assert table.win_probability(25, 3, False) == 1.0
+        assert table.win_probability(3, 30, True) == 0.0
+
+    def test_round_from_measured_distributions(self):
+        table = WinProbabilityTable.build(small_stats(), 25)
+        for pone, dealer in [(0, 0), (12, 19), (24, 24)]:
+            chances = table.round_win_probability(
+                pone, dealer, table.pone_hand, [table.dealer_show] * 3
+            )
+            assert chances == pytest.approx([table.start[pone, dealer]] * 3)
+
+    def test_rejects_a_round_without_points(self):
+        stats = small_stats()
+        stats.record(0, 0, 0, 0, 0)
+        with pytest.raises(ValueError):
+            WinProbabilityTable.build(stats, 25)
+
+    def test_save_and_load(self, tmp_path):
+        table = WinProbabilityTable.build(small_stats(), 25)
+        path = str(tmp_path / "tables" / "win_probability.bin")
+        table.save(path)
+        loaded = WinProbabilityTable.load(path)
+        assert loaded.target_score == 25
+        assert (loaded.start == table.start).all()
+        assert (loaded.stats.dealer_show == table.stats.dealer_show).all()
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "win_probability.bin"
+        path.write_bytes(b"CRIBPG01" + bytes(100))
+        with pytest.raises(ValueError):
+            WinProbabilityTable.load(str(path))
+
+    def test_shift_distribution(self):
+        distribution = np.array([0.5, 0.25, 0.25, 0.0])
+        assert shift_distribution(distribution, 1).tolist() == [0, 0.5, 0.25, 0.25]
+        assert shift_distribution(distribution, -1).tolist() == [0.75, 0.25, 0, 0]
+        assert len(shift_distribution(np.ones(SHOW_SIZE), 3)) == SHOW_SIZE
+
+
+class TestWinProbabilityAgent:
+    def test_discards_two_dealt_cards(self, table_31):
+        agent = WinProbabilityAgent(table=table_31)
+        rng = random.Random(4)
+        for _ in range(10):
+            view = deal_view(
+                rng.sample(range(52), 6),
+                (rng.randrange(31), rng.randrange(31)),
+                dealer=rng.randrange(2),
+            )
+            discards = agent.select_discards(view)
+            assert len(discards) == 2
+            assert set(discards) <= set(view.hand)
+
+    def test_takes_the_winning_peg(self, table_31):
+        # A ten makes fifteen for 2, but the 4 completes a run of 3
+        two, three, four, ten = ids_to_cards([1, 2, 16, 22])
+        view = deal_view([], (28, 0))._replace(
+            hand=(four, ten), count=5, sequence=(two, three)
+        )
+        assert HeuristicAgent().select_play(view, [four, ten]) == ten
+        agent = WinProbabilityAgent(table=table_31)
+        assert agent.select_play(view, [four, ten]) == four
+
+    def test_other_targets_play_like_heuristic(self, table_31):
+        view = deal_view([0, 14, 28, 3, 17, 31], (0, 0), target_score=121)
+        assert WinProbabilityAgent(table=table_31).select_discards(
+            view
+        ) == HeuristicAgent(crib_mode="table").select_discards(view)
+
+    def test_plays_a_game(self, table_31):
+        agents = [
+            WinProbabilityAgent(rng=random.Random(1), table=table_31),
+            HeuristicAgent(rng=random.Random(2)),
+        ]
+        engine = GameEngine(agents, target_score=31, rng=random.Random(0))
+        assert engine.play_game() in (0, 1)